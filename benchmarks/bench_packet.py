@@ -0,0 +1,411 @@
+"""MQTTパケット処理のマイクロベンチマーク.
+
+works.mqtt.packet のビルダーとパーサー、および MQTTClient._message_loop
+で行うJSONデコードを、記録済みの通知コーパスを使って計測します。
+結果は ops/sec、1パケットあたりのns、1パケットあたりの割り当て数と
+一時的なピークメモリで表示し、保存したベースラインと比較できます。
+
+使い方:
+    python -m benchmarks.bench_packet
+    python -m benchmarks.bench_packet --save benchmarks/baseline.json
+    python -m benchmarks.bench_packet --compare benchmarks/baseline.json
+
+ベースラインは計測したマシンに依存するため、リポジトリには含めません。
+比較する前に同じマシンで --save を実行して作成してください。
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import (
+    build_frames,
+    coalesce_frames,
+    load_corpus,
+    split_frame,
+)
+from works.mqtt.notification import Notification
+from works.mqtt.packet import (
+    PacketDecoder,
+    build_connect_packet,
+    build_puback_packet,
+    build_publish_packet,
+    build_subscribe_packet,
+    parse_packet,
+    parse_publish,
+    parse_publish_view,
+)
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+# (名前, 1回の呼び出しで処理する関数, 1回あたりのパケット数)
+Case = Tuple[str, Callable[[], Any], int]
+
+
+@dataclass
+class BenchResult:
+    """1ケースの計測結果."""
+
+    name: str
+    ops_per_sec: float
+    ns_per_packet: float
+    allocs_per_packet: float
+    peak_bytes_per_packet: float
+
+
+@dataclass
+class _Inputs:
+    """ベンチマークの入力データ."""
+
+    frames: List[bytes]
+    coalesced: bytes
+    chunks: List[bytes]
+    publish_args: List[Tuple[str, bytes]]
+    topics: List[str]
+    decoder: PacketDecoder
+
+    @property
+    def count(self) -> int:
+        """1回の呼び出しで処理するパケット数."""
+        return len(self.frames)
+
+
+def build_cases(records: List[Dict[str, Any]]) -> List[Case]:
+    """コーパスからベンチマークケースを生成する.
+
+    Args:
+        records: 通知コーパスのレコード
+
+    Returns:
+        List[Case]: ベンチマークケースのリスト
+    """
+    frames = build_frames(records)
+    inputs = _Inputs(
+        frames=frames,
+        coalesced=coalesce_frames(frames),
+        chunks=[chunk for f in frames for chunk in split_frame(f, 512)],
+        publish_args=[
+            (
+                r["topic"],
+                json.dumps(
+                    r["payload"], ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8"),
+            )
+            for r in records
+        ],
+        topics=sorted({r["topic"] for r in records}),
+        decoder=PacketDecoder(),
+    )
+    return _build_cases(inputs) + _decode_cases(inputs) + _json_cases(inputs)
+
+
+def _build_cases(inputs: _Inputs) -> List[Case]:
+    """パケット生成のケース."""
+
+    def build_publish() -> List[bytes]:
+        return [
+            build_publish_packet(t, p, qos=1, message_id=i).packet
+            for i, (t, p) in enumerate(inputs.publish_args, start=1)
+        ]
+
+    return [
+        (
+            "build.connect",
+            lambda: build_connect_packet(
+                "web-beejs_0123456789ab", "dummy", None, 50
+            ).packet,
+            1,
+        ),
+        (
+            "build.subscribe",
+            lambda: build_subscribe_packet(inputs.topics, 1),
+            1,
+        ),
+        ("build.puback", lambda: build_puback_packet(1).packet, 1),
+        ("build.publish", build_publish, inputs.count),
+    ]
+
+
+def _decode_cases(inputs: _Inputs) -> List[Case]:
+    """フレームの分割とPUBLISHの解析のケース."""
+    frames, decoder = inputs.frames, inputs.decoder
+
+    def decode_each() -> List[Any]:
+        return [decoder.feed(f) for f in frames]
+
+    def decode_coalesced() -> List[Any]:
+        return decoder.feed(inputs.coalesced)
+
+    def decode_split() -> List[Any]:
+        return [decoder.feed(c) for c in inputs.chunks]
+
+    def publish_copy() -> List[Any]:
+        return [parse_publish(decoder.feed(f)[0]) for f in frames]
+
+    def publish_view() -> List[Any]:
+        return [parse_publish_view(decoder.feed(f)[0]) for f in frames]
+
+    count = inputs.count
+    return [
+        ("parse.packet", lambda: [parse_packet(f) for f in frames], count),
+        ("decode.frame", decode_each, count),
+        ("decode.coalesced", decode_coalesced, count),
+        ("decode.split", decode_split, count),
+        ("publish.copy", publish_copy, count),
+        ("publish.view", publish_view, count),
+    ]
+
+
+def _json_cases(inputs: _Inputs) -> List[Case]:
+    """通知のJSONデコードのケース."""
+    frames, decoder = inputs.frames, inputs.decoder
+
+    def json_legacy() -> List[Any]:
+        # 変更前の _message_loop と同じ手順(スライス→str→json.loads)
+        results = []
+        for f in frames:
+            packet = parse_packet(f)
+            if packet is None:
+                continue
+            _, payload, _ = parse_publish(packet)
+            results.append(
+                json.loads(payload.decode("utf-8", errors="replace").strip())
+            )
+        return results
+
+    def json_view() -> List[Any]:
+        return [parse_publish_view(decoder.feed(f)[0]).json() for f in frames]
+
+    def notification_fields() -> List[Any]:
+        # example.py と同じくnType・chNo・loc-args1だけを読む
+        results = []
+        for f in frames:
+            view = parse_publish_view(decoder.feed(f)[0])
+            notification = Notification(view.payload, view.topic)
+            results.append(
+                (
+                    notification.n_type,
+                    notification.channel_no,
+                    notification.content,
+                )
+            )
+        return results
+
+    count = inputs.count
+    return [
+        ("json.legacy", json_legacy, count),
+        ("json.view", json_view, count),
+        ("notification.fields", notification_fields, count),
+    ]
+
+
+def _measure_time(
+    func: Callable[[], Any], min_time: float, repeat: int
+) -> float:
+    """1回の呼び出しにかかる最短時間(ns)を計測する."""
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9 / repeat:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter_ns() - start) / loops)
+    return best
+
+
+def _measure_allocations(
+    func: Callable[[], Any], calls: int = 200
+) -> Tuple[float, float]:
+    """1回の呼び出しあたりの割り当てブロック数とピークバイト数を計測する.
+
+    割り当て数は結果を保持したまま増えたブロック数、ピークバイト数は
+    呼び出し中に一時的に確保されたメモリ(コピーを含む)の最大値です。
+    """
+    func()  # キャッシュなどの初期化分を除外
+    tracemalloc.start()
+    try:
+        keep = []
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            keep.append(func())
+        after = tracemalloc.take_snapshot()
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        blocks = sum(
+            stat.count_diff
+            for stat in after.filter_traces(ignore).compare_to(
+                before.filter_traces(ignore), "filename"
+            )
+            if stat.count_diff > 0
+        )
+        del keep
+
+        peak_total = 0
+        for _ in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            peak_total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return blocks / calls, peak_total / calls
+
+
+def run(
+    cases: List[Case], min_time: float = 0.2, repeat: int = 5
+) -> List[BenchResult]:
+    """全ケースを計測する.
+
+    Args:
+        cases: ベンチマークケース
+        min_time: 1ケースあたりの最小計測時間(秒)
+        repeat: 計測の繰り返し回数(最短値を採用)
+
+    Returns:
+        List[BenchResult]: 計測結果
+    """
+    results = []
+    for name, func, packets in cases:
+        ns_per_call = _measure_time(func, min_time, repeat)
+        allocs, peak = _measure_allocations(func)
+        results.append(
+            BenchResult(
+                name=name,
+                ops_per_sec=packets * 1e9 / ns_per_call,
+                ns_per_packet=ns_per_call / packets,
+                allocs_per_packet=allocs / packets,
+                peak_bytes_per_packet=peak / packets,
+            )
+        )
+    return results
+
+
+def compare(
+    results: List[BenchResult],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """ベースラインと比較し、性能が低下したケース名を返す.
+
+    Args:
+        results: 今回の計測結果
+        baseline: 保存済みのベースライン(ケース名→計測値)
+        threshold: 許容する低下率(0.1で10%)
+
+    Returns:
+        List[str]: ns/packetまたは割り当て数が閾値を超えて増えたケース
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        slower = result.ns_per_packet > base["ns_per_packet"] * (
+            1 + threshold
+        )
+        more_allocs = (
+            result.allocs_per_packet
+            > base["allocs_per_packet"] * (1 + threshold) + 0.5
+        )
+        if slower or more_allocs:
+            regressions.append(result.name)
+    return regressions
+
+
+def format_table(
+    results: List[BenchResult],
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+) -> str:
+    """計測結果を表形式の文字列にする."""
+    lines = [
+        f"{'case':<22}{'ops/sec':>14}{'ns/pkt':>12}"
+        f"{'allocs/pkt':>12}{'peak B/pkt':>12}{'vs base':>10}"
+    ]
+    for r in results:
+        delta = ""
+        if baseline and r.name in baseline:
+            base_ns = baseline[r.name]["ns_per_packet"]
+            delta = f"{(r.ns_per_packet - base_ns) / base_ns:+.1%}"
+        lines.append(
+            f"{r.name:<22}{r.ops_per_sec:>14,.0f}{r.ns_per_packet:>12,.0f}"
+            f"{r.allocs_per_packet:>12.1f}"
+            f"{r.peak_bytes_per_packet:>12,.0f}{delta:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """コマンドラインからベンチマークを実行する.
+
+    Returns:
+        int: 終了コード(ベースラインより低下したケースがあれば1、
+        ベースラインが見つからなければ2)
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", type=Path, help="結果を保存するパス")
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="比較するベースライン",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="許容する低下率"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="1ケースの計測時間"
+    )
+    parser.add_argument("--filter", default="", help="ケース名の前方一致")
+    args = parser.parse_args(argv)
+
+    if args.compare and not args.compare.is_file():
+        sys.stderr.write(
+            f"baseline not found: {args.compare}\n"
+            "create one on this machine first with "
+            f"--save {args.compare}\n"
+        )
+        return 2
+
+    cases = [
+        case
+        for case in build_cases(load_corpus())
+        if case[0].startswith(args.filter)
+    ]
+    results = run(cases, min_time=args.min_time)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    sys.stdout.write(format_table(results, baseline) + "\n")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({r.name: asdict(r) for r in results}, f, indent=4)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.stdout.write(f"regressions: {', '.join(regressions)}\n")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""ベンチマーク用の通知コーパス.
+
+data/notifications.jsonl に記録した実際の通知(memo.txt の REV_MSG など)
+から、受信時と同じ形式のPUBLISHフレームを生成します。
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from works.mqtt.packet import build_publish_packet
+
+CORPUS_PATH = Path(__file__).parent / "data" / "notifications.jsonl"
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> List[Dict[str, Any]]:
+    """通知コーパスを読み込む.
+
+    Args:
+        path: JSON Lines形式のコーパスファイル
+
+    Returns:
+        List[Dict[str, Any]]: topic, qos, payloadを持つレコードのリスト
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_frames(records: List[Dict[str, Any]]) -> List[bytes]:
+    """レコードからPUBLISHフレームを生成する.
+
+    Args:
+        records: load_corpusで読み込んだレコード
+
+    Returns:
+        List[bytes]: 1フレーム1パケットのPUBLISHフレーム
+    """
+    frames = []
+    for message_id, record in enumerate(records, start=1):
+        payload = json.dumps(
+            record["payload"], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        packet = build_publish_packet(
+            record["topic"],
+            payload,
+            qos=record.get("qos", 0),
+            message_id=message_id,
+        )
+        frames.append(packet.packet)
+    return frames
+
+
+def coalesce_frames(frames: List[bytes]) -> bytes:
+    """ブローカーがまとめて送る場合を模して全フレームを連結する.
+
+    Args:
+        frames: PUBLISHフレームのリスト
+
+    Returns:
+        bytes: 連結したフレーム
+    """
+    return b"".join(frames)
+
+
+def split_frame(frame: bytes, chunk_size: int) -> List[bytes]:
+    """1つのパケットが複数フレームに分割される場合を模して分割する.
+
+    Args:
+        frame: 分割するフレーム
+        chunk_size: 1フレームあたりのバイト数
+
+    Returns:
+        List[bytes]: 分割されたフレーム
+    """
+    return [
+        frame[i : i + chunk_size] for i in range(0, len(frame), chunk_size)
+    ]
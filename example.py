@@ -10,7 +10,8 @@ from typing import Optional
 from dotenv import load_dotenv
 
 from works.client import Works
-from works.constants import Logging
+from works.constants import Logging, MessageType
+from works.mqtt import Notification
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -110,13 +111,66 @@ async def main() -> None:
         logger.error("必要な環境変数が設定されていません")
         return
 
-    # Worksクライアントのインスタンス化
-    client = Works(
+    # Worksクライアントのインスタンス化(ログインはイベントループを止めない)
+    client = await Works.create(
         input_id=str(input_id),
         password=str(password),
         cookie_path=COOKIE_DIR / "cookie.json",
     )
 
+    # 終了時に送信キューを処理し終えてから接続を閉じる
+    async with client:
+        await receive_loop(client)
+
+
+async def handle_message(client: Works, payload: Notification) -> None:
+    """通常のメッセージのコマンドに応答する.
+
+    Args:
+        client: ログイン済みのWorksクライアント
+        payload: 受信した通知
+    """
+    # メッセージタイプの確認(通常のメッセージ以外はスキップ)
+    try:
+        if payload.message_type != MessageType.TEXT or not payload.channel_no:
+            return
+    except ValueError:
+        # JSONとして不正な通知は読み飛ばす
+        logger.warning(f"不正な通知を受信しました: {payload.topic}")
+        return
+
+    # メッセージ内容とチャンネル番号を取得
+    content = payload.content  # メッセージ内容
+    channel_no = str(payload.channel_no)  # チャンネル番号
+
+    # コマンド処理
+    try:
+        if content == "!test":
+            await client.async_send_message(
+                channel_no,
+                "Hi!!",
+                domain_id=str(domain_id),
+                user_no=str(user_no),
+                temp_message_id=str(temp_message_id),
+            )
+        elif content == "!sendall":
+            await send_all_messages(
+                client,
+                channel_no,
+                str(domain_id),
+                str(user_no),
+                str(temp_message_id),
+            )
+    except Exception as e:
+        logger.error(f"コマンドの処理に失敗しました: {str(e)}")
+
+
+async def receive_loop(client: Works) -> None:
+    """メッセージを受信してコマンドに応答する.
+
+    Args:
+        client: ログイン済みのWorksクライアント
+    """
     retry_count = 0
     max_retries = 3
     retry_delay = 5
@@ -133,45 +187,10 @@ async def main() -> None:
                     continue
 
                 success, payload = message
-                if not success or not payload:
-                    continue
-
-                # メッセージタイプの確認
-                n_type = payload.get("nType")
-                if n_type != 1:  # 通常のメッセージ以外はスキップ
-                    continue
-
-                # メッセージ内容とチャンネル番号を取得
-                content = payload.get("loc-args1", "")  # メッセージ内容
-                channel_no = payload.get("chNo")  # チャンネル番号
-
-                if not channel_no:
+                if not success or payload is None:
                     continue
 
-                # コマンド処理
-                if content == "!test":
-                    try:
-                        await client.async_send_message(
-                            str(channel_no),
-                            "Hi!!",
-                            domain_id=str(domain_id),
-                            user_no=str(user_no),
-                            temp_message_id=str(temp_message_id),
-                        )
-                    except Exception:
-                        continue
-
-                if content == "!sendall":
-                    try:
-                        await send_all_messages(
-                            client,
-                            str(channel_no),
-                            str(domain_id),
-                            str(user_no),
-                            str(temp_message_id),
-                        )
-                    except Exception:
-                        continue
+                await handle_message(client, payload)
 
         except Exception:
             retry_count += 1
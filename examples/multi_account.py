@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 
 from works.client import Works
 from works.message_handler import MessageResult
+from works.mqtt import Notification
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -80,26 +81,28 @@ class WorksBot:
         self.temp_message_id = os.getenv("TEMP_MESSAGE_ID", "0")
         self.clients: Dict[str, Works] = {}
 
-    async def handle_messages(self, account: AccountConfig) -> None:
+    async def handle_messages(
+        self, account: AccountConfig, client: Works
+    ) -> None:
         """特定のアカウントのメッセージを処理する.
 
         Args:
             account: 認証情報とレスポンスメッセージを含むアカウント設定
+            client: ログイン済みのWorksクライアント
         """
         try:
-            client = Works(
-                input_id=account.input_id,
-                password=account.password,
-                cookie_path=COOKIE_DIR,
-            )
-            self.clients[account.input_id] = client
+            # 終了時に送信キューを処理し終えてから接続を閉じる
+            async with client:
+                self.clients[account.input_id] = client
 
-            logger.info(f"Start {account.input_id} message reception")
+                logger.info(f"Start {account.input_id} message reception")
 
-            async for result, message in client.receive_messages(
-                self.domain_id, self.user_no
-            ):
-                await self._process_message(result, message, client, account)
+                async for result, message in client.receive_messages(
+                    self.domain_id, self.user_no
+                ):
+                    await self._process_message(
+                        result, message, client, account
+                    )
 
         except Exception as e:
             logger.error(
@@ -109,7 +112,7 @@ class WorksBot:
     async def _process_message(
         self,
         result: MessageResult,
-        message: Optional[Dict],
+        message: Optional[Notification],
         client: Works,
         account: AccountConfig,
     ) -> None:
@@ -117,16 +120,16 @@ class WorksBot:
 
         Args:
             result: メッセージ処理結果
-            message: Worksからのメッセージデータ
+            message: Worksからの通知
             client: Worksクライアントインスタンス
             account: アカウント設定
         """
-        if not result.success or not message:
+        if not result.success or message is None:
             logger.error(f"Message processing failed: {result.message}")
             return
 
-        content = message.get("content", "")
-        channel_no = message.get("channelNo")
+        content = message.content
+        channel_no = message.channel_no
 
         if content == "!test" and channel_no is not None:
             try:
@@ -170,10 +173,15 @@ class BotManager:
             await asyncio.gather(*self.tasks, return_exceptions=True)
 
     async def _start_bot_tasks(self) -> None:
-        """各アカウントのタスクを作成して開始する."""
-        for account in self.accounts:
+        """全アカウントを並行してログインし、各アカウントのタスクを開始する."""
+        credentials = [(a.input_id, a.password) for a in self.accounts]
+        clients = await Works.create_many(credentials, cookie_path=COOKIE_DIR)
+        for account, client in zip(self.accounts, clients):
+            if not isinstance(client, Works):
+                logger.error(f"Login failed for {account.input_id}: {client}")
+                continue
             task = asyncio.create_task(
-                self.works_bot.handle_messages(account),
+                self.works_bot.handle_messages(account, client),
                 name=f"Bot-{account.input_id}",
             )
             self.tasks.append(task)
@@ -0,0 +1,121 @@
+"""Tests for Broadcast."""
+
+import asyncio
+import contextlib
+from typing import Dict, List, Set
+
+import pytest
+
+from works.broadcast import Broadcast, BroadcastStats
+
+
+def test_broadcast_sends_to_every_channel() -> None:
+    """Every channel gets one send and the stats add up."""
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        if channel_no == "2":
+            return {"success": "false", "status_code": "429"}
+        return {"success": "True", "status_code": "201"}
+
+    stats = asyncio.run(_await(Broadcast(send, ["1", "2", "3"])))
+
+    assert stats.dispatched == 3
+    assert stats.succeeded == 2
+    assert stats.failed == 1
+    assert stats.failures_by_status == {"429": 1}
+
+
+def test_broadcast_bounds_concurrency() -> None:
+    """No more than ``concurrency`` sends are in progress at once."""
+    in_flight: Set[str] = set()
+    peak: List[int] = [0]
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        in_flight.add(channel_no)
+        peak[0] = max(peak[0], len(in_flight))
+        await asyncio.sleep(0)
+        in_flight.discard(channel_no)
+        return {"success": "True"}
+
+    channels = [str(i) for i in range(20)]
+    stats = asyncio.run(_await(Broadcast(send, channels, concurrency=3)))
+
+    assert stats.succeeded == 20
+    assert peak[0] == 3
+
+
+def test_stopping_iteration_cancels_pending_sends() -> None:
+    """Closing the iteration early cancels the sends still in progress."""
+    started: List[str] = []
+    cancelled: List[str] = []
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        started.append(channel_no)
+        if channel_no != "0":
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(channel_no)
+                raise
+        return {"success": "True"}
+
+    async def scenario() -> Broadcast:
+        broadcast = Broadcast(send, map(str, range(100)), concurrency=4)
+        results = broadcast.__aiter__()
+        async with contextlib.aclosing(results):
+            async for result in results:
+                assert result.channel_no == "0"
+                break
+        return broadcast
+
+    broadcast = asyncio.run(scenario())
+
+    # Channels are pulled lazily, so none beyond the first window started
+    assert started == ["0", "1", "2", "3"]
+    assert sorted(cancelled) == ["1", "2", "3"]
+    assert broadcast.stats.completed == 1
+    assert broadcast.stats.finished_at is not None
+
+
+def test_exceptions_become_failed_results() -> None:
+    """A send that raises is recorded as a failure, not propagated."""
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        raise ConnectionError("boom")
+
+    async def scenario() -> List[Dict[str, str]]:
+        return [r.result async for r in Broadcast(send, ["1"])]
+
+    (result,) = asyncio.run(scenario())
+    assert result["success"] == "false"
+    assert result["status_code"] == "500"
+
+
+def test_broadcast_runs_once() -> None:
+    """Running a broadcast a second time raises RuntimeError."""
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        return {"success": "True"}
+
+    async def scenario() -> None:
+        broadcast = Broadcast(send, ["1"])
+        await broadcast
+        with pytest.raises(RuntimeError):
+            await broadcast
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_must_be_positive() -> None:
+    """A concurrency below 1 is rejected."""
+
+    async def send(channel_no: str) -> Dict[str, str]:
+        return {"success": "True"}
+
+    with pytest.raises(ValueError):
+        Broadcast(send, [], concurrency=0)
+
+
+async def _await(broadcast: Broadcast) -> BroadcastStats:
+    """Run a broadcast to the end inside a coroutine."""
+    return await broadcast
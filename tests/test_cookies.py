@@ -0,0 +1,116 @@
+"""Tests for the cookie file and its freshness metadata."""
+
+import json
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from works.auth import AuthManager
+
+COOKIES = {"WORKS_USER_ID": "user", "WORKS_SES": "session"}
+
+
+@pytest.fixture
+def auth(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AuthManager:
+    """Return an AuthManager with its cookie file in a temporary directory.
+
+    Network logins fail the test; cookie verification is recorded in
+    ``auth.verified`` and succeeds.
+    """
+    manager = AuthManager("user@example.com", "password")
+    manager.cookie_path = tmp_path / "cookie.json"
+    verified: List[str] = []
+
+    def verify(cookies_json: str) -> bool:
+        verified.append(cookies_json)
+        return True
+
+    def login(priority: int = 0) -> str:
+        raise AssertionError("unexpected network login")
+
+    monkeypatch.setattr(manager, "_verify_cookies", verify)
+    monkeypatch.setattr(manager, "_perform_login", login)
+    manager.verified = verified  # type: ignore[attr-defined]
+    return manager
+
+
+def _write(auth: AuthManager, data: object) -> None:
+    """Write raw JSON to the cookie file."""
+    auth.cookie_path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _read(auth: AuthManager) -> dict:
+    """Read the cookie file."""
+    return json.loads(auth.cookie_path.read_text(encoding="utf-8"))
+
+
+def test_save_writes_envelope(auth: AuthManager) -> None:
+    """Cookies are saved with the verification time and expiry."""
+    auth.save_cookies(json.dumps(COOKIES), expires_at=123.0)
+
+    data = _read(auth)
+    assert data["cookies"] == COOKIES
+    assert data["expires_at"] == 123.0
+    assert time.time() - data["verified_at"] < 5
+    assert json.loads(auth.load_cookies() or "") == COOKIES
+    assert list(auth.cookie_path.parent.iterdir()) == [auth.cookie_path]
+
+
+def test_fresh_cookies_skip_verification(auth: AuthManager) -> None:
+    """Recently verified cookies are used without a network check."""
+    expires_at = time.time() + 3600
+    auth.save_cookies(json.dumps(COOKIES), expires_at=expires_at)
+
+    assert json.loads(auth.login() or "") == COOKIES
+    assert auth.verified == []  # type: ignore[attr-defined]
+    assert auth.session_expires_at == expires_at
+
+
+def test_old_cookies_are_verified_again(auth: AuthManager) -> None:
+    """Cookies verified before the freshness window are re-verified."""
+    verified_at = time.time() - auth.cookie_freshness - 1
+    auth.save_cookies(json.dumps(COOKIES), verified_at=verified_at)
+
+    assert json.loads(auth.login() or "") == COOKIES
+    assert len(auth.verified) == 1  # type: ignore[attr-defined]
+    assert _read(auth)["verified_at"] > verified_at
+
+
+def test_expired_session_is_not_fresh(auth: AuthManager) -> None:
+    """A session past its expiry is verified even if recently checked."""
+    auth.save_cookies(json.dumps(COOKIES), expires_at=time.time() - 1)
+
+    auth.login()
+    assert len(auth.verified) == 1  # type: ignore[attr-defined]
+
+
+def test_legacy_cookie_file_is_never_fresh(auth: AuthManager) -> None:
+    """A file holding only cookies is treated as never verified."""
+    _write(auth, COOKIES)
+
+    assert json.loads(auth.load_cookies() or "") == COOKIES
+    auth.login()
+    assert len(auth.verified) == 1  # type: ignore[attr-defined]
+    assert _read(auth)["cookies"] == COOKIES
+
+
+def test_mark_cookies_stale(auth: AuthManager) -> None:
+    """Stale cookies are verified on the next login."""
+    auth.save_cookies(json.dumps(COOKIES), expires_at=time.time() + 3600)
+    auth.mark_cookies_stale()
+
+    data = _read(auth)
+    assert data["verified_at"] == 0
+    assert data["cookies"] == COOKIES
+    auth.login()
+    assert len(auth.verified) == 1  # type: ignore[attr-defined]
+
+
+def test_corrupt_cookie_file_is_deleted(auth: AuthManager) -> None:
+    """An unreadable cookie file is removed."""
+    auth.cookie_path.write_text("{not json", encoding="utf-8")
+
+    assert auth.load_cookies() is None
+    assert not auth.cookie_path.exists()
@@ -0,0 +1,89 @@
+"""DedupCacheのテスト."""
+
+from works.mqtt.dedup import DedupCache
+
+
+class _Clock:
+    """手動で進める時計."""
+
+    def __init__(self) -> None:
+        """時刻0から開始します."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """現在時刻を返します."""
+        return self.now
+
+
+def test_duplicates_within_ttl() -> None:
+    """有効期限内の同じキーは重複と判定されること."""
+    clock = _Clock()
+    cache = DedupCache(ttl=10, clock=clock)
+
+    assert cache.check_and_add("a") is False
+    clock.now = 9.9
+    assert cache.check_and_add("a") is True
+    assert cache.check_and_add("b") is False
+    assert cache.hits == 1
+    assert len(cache) == 2
+
+
+def test_keys_expire_after_ttl() -> None:
+    """有効期限を過ぎたキーは削除され、重複と判定されないこと."""
+    clock = _Clock()
+    cache = DedupCache(ttl=10, clock=clock)
+    cache.check_and_add("a")
+    clock.now = 5
+    cache.check_and_add("b")
+
+    clock.now = 10
+    assert "a" not in cache
+    assert "b" in cache
+    assert cache.expirations == 1
+
+    assert cache.check_and_add("a") is False
+    assert len(cache) == 2
+
+
+def test_duplicate_does_not_extend_expiry() -> None:
+    """重複の判定では有効期限を延長しないこと."""
+    clock = _Clock()
+    cache = DedupCache(ttl=10, clock=clock)
+    cache.check_and_add("a")
+    clock.now = 9
+    assert cache.check_and_add("a") is True
+
+    clock.now = 10
+    assert cache.check_and_add("a") is False
+
+
+def test_max_size_evicts_oldest() -> None:
+    """最大件数を超えると最も古いキーから削除されること."""
+    cache = DedupCache(ttl=60, max_size=2, clock=_Clock())
+    for key in ("a", "b", "c"):
+        cache.check_and_add(key)
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert "a" not in cache
+    assert "b" in cache
+    assert "c" in cache
+
+
+def test_explicit_time() -> None:
+    """時刻を指定した判定では時計を使わないこと."""
+    cache = DedupCache(ttl=10, clock=_Clock())
+
+    assert cache.check_and_add("a", now=100.0) is False
+    assert cache.check_and_add("a", now=109.0) is True
+    assert cache.check_and_add("a", now=110.0) is False
+
+
+def test_clear() -> None:
+    """clear()ですべてのキーが削除されること."""
+    cache = DedupCache(clock=_Clock())
+    cache.check_and_add("a")
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.check_and_add("a") is False
@@ -0,0 +1,93 @@
+"""AdaptiveKeepAliveとPINGRESPの監視のテスト."""
+
+import asyncio
+
+import pytest
+
+from works.mqtt.broker import BrokerConfig, LocalBroker
+from works.mqtt.client import MQTTClient, MQTTConfig
+from works.mqtt.keepalive import AdaptiveKeepAlive, RttHistogram
+
+
+class _Headers:
+    """認証ヘッダーを持たないHeaderManagerの代わり."""
+
+    headers: dict = {}
+
+
+def test_interval_grows_up_to_ceiling() -> None:
+    """速い応答が続くと間隔が上限まで伸びること."""
+    keepalive = AdaptiveKeepAlive(
+        initial=10, floor=5, ceiling=40, slow_rtt=1, growth=2
+    )
+
+    intervals = []
+    for _ in range(4):
+        keepalive.on_pingresp(0.01)
+        intervals.append(keepalive.interval)
+
+    assert intervals == [20, 40, 40, 40]
+
+
+def test_slow_response_and_timeout_reset_to_floor() -> None:
+    """遅い応答とタイムアウトでは間隔が下限に戻ること."""
+    keepalive = AdaptiveKeepAlive(initial=30, floor=5, ceiling=60, slow_rtt=1)
+
+    keepalive.on_pingresp(2.0)
+    assert keepalive.interval == 5
+
+    keepalive.on_pingresp(0.01)
+    assert keepalive.interval > 5
+    keepalive.on_timeout()
+    assert keepalive.interval == 5
+    assert keepalive.timeouts == 1
+
+
+def test_initial_interval_is_clamped() -> None:
+    """最初の間隔は下限と上限の範囲に収められること."""
+    low = AdaptiveKeepAlive(1, floor=5, ceiling=60, slow_rtt=1)
+    high = AdaptiveKeepAlive(99, floor=5, ceiling=60, slow_rtt=1)
+
+    assert low.interval == 5
+    assert high.interval == 60
+
+
+def test_rtt_histogram() -> None:
+    """往復時間が区間ごとに集計されること."""
+    histogram = RttHistogram(buckets=(10, 100))
+    for rtt in (0.005, 0.008, 0.05, 0.5):
+        histogram.record(rtt)
+
+    assert histogram.buckets() == {"<=10ms": 2, "<=100ms": 1, "+Inf": 1}
+    assert histogram.min == pytest.approx(5)
+    assert histogram.max == pytest.approx(500)
+    assert histogram.mean == pytest.approx(140.75)
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(75) == 100
+    assert histogram.percentile(100) == pytest.approx(500)
+    assert RttHistogram().percentile(50) is None
+
+
+def test_pingresp_timeout_closes_connection() -> None:
+    """PINGRESPが遅れると接続を閉じ、間隔を下限に戻すこと."""
+
+    async def scenario() -> MQTTClient:
+        async with LocalBroker(BrokerConfig(latency=0.3)) as broker:
+            config = MQTTConfig(
+                url=broker.url,
+                ping_interval=1,
+                ping_interval_min=1,
+                ping_timeout=0.1,  # type: ignore[arg-type]
+                max_retries=0,
+            )
+            client = MQTTClient(_Headers(), config)  # type: ignore[arg-type]
+            client.keepalive.interval = 0.05
+            async for _ in client.connect("1", "2"):
+                pass
+            await client.stop()
+            assert broker.stats.pings == 1
+            return client
+
+    client = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert client.keepalive.timeouts == 1
+    assert client.keepalive.interval == 1
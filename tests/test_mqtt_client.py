@@ -0,0 +1,164 @@
+"""LocalBrokerを使ったMQTTClientのテスト."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+import pytest
+
+from works.constants import StatusFlag
+from works.mqtt.broker import LocalBroker, default_payload
+from works.mqtt.client import MQTTClient, MQTTConfig
+from works.mqtt.notification import Notification
+
+USER_TOPIC = "/domains/1/users/2"
+
+
+class _Headers:
+    """認証ヘッダーを持たないHeaderManagerの代わり."""
+
+    headers: dict = {}
+
+
+async def _receive(
+    broker: LocalBroker,
+    count: int,
+    on_connected: Callable[[MQTTClient], Awaitable[None]],
+) -> List[Notification]:
+    """接続後にon_connectedを実行し、count件の通知を受信します."""
+    config = MQTTConfig(url=broker.url, max_retries=0)
+    client = MQTTClient(_Headers(), config)  # type: ignore[arg-type]
+
+    async def run_when_connected() -> None:
+        while client.state != StatusFlag.CONNECTED:
+            await asyncio.sleep(0.01)
+        await on_connected(client)
+
+    task = asyncio.create_task(run_when_connected())
+    received: List[Notification] = []
+    try:
+        async for ok, notification in client.connect("1", "2"):
+            assert ok
+            assert notification is not None
+            received.append(notification)
+            if len(received) == count:
+                break
+        await task
+    finally:
+        task.cancel()
+        await client.stop()
+    return received
+
+
+def test_qos1_notifications_are_acknowledged() -> None:
+    """ブローカーからのQoS 1の通知にPUBACKを返すこと."""
+
+    async def scenario() -> None:
+        async with LocalBroker() as broker:
+
+            async def publish(client: MQTTClient) -> None:
+                for seq in (1, 2):
+                    await broker.publish(USER_TOPIC, default_payload("", seq))
+
+            received = await _receive(broker, 2, publish)
+            assert [n.message_no for n in received] == [1, 2]
+            assert broker.stats.acked == 2
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_publish_waits_for_puback() -> None:
+    """QoS 1の発行はPUBACKを受信してから完了すること."""
+
+    async def scenario() -> None:
+        async with LocalBroker() as broker:
+
+            async def publish(client: MQTTClient) -> None:
+                await client.subscribe("/echo")
+                await client.publish(
+                    "/echo", default_payload("/echo", 7), qos=1
+                )
+                assert broker.stats.received == 1
+                assert client._pending_messages == {}
+
+            received = await _receive(broker, 1, publish)
+            # 購読中のトピックへの発行は自分にも配信される
+            assert received[0].topic == "/echo"
+            assert received[0].message_no == 7
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_pending_ack_fails_on_disconnect() -> None:
+    """切断されると確認応答待ちの発行がすぐに失敗すること."""
+
+    async def scenario() -> None:
+        async with LocalBroker() as broker:
+            config = MQTTConfig(url=broker.url, max_retries=0)
+            client = MQTTClient(_Headers(), config)  # type: ignore[arg-type]
+            results: List[BaseException] = []
+
+            async def publish_then_disconnect() -> None:
+                while client.state != StatusFlag.CONNECTED:
+                    await asyncio.sleep(0.01)
+                # PUBACKの送信を遅らせ、その間に接続を切る
+                broker.config.latency = 0.5
+                publish = asyncio.create_task(
+                    client.publish(USER_TOPIC, b"{}", qos=1)
+                )
+                await asyncio.sleep(0.05)
+                for session in list(broker._sessions):
+                    session.websocket.transport.close()
+                try:
+                    await publish
+                except ConnectionError as e:
+                    results.append(e)
+
+            task = asyncio.create_task(publish_then_disconnect())
+            async for _ in client.connect("1", "2"):
+                pass
+            await task
+            await client.stop()
+            assert len(results) == 1
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_handlers_receive_routed_notifications(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """ハンドラーの例外は記録され、stop()で実行中のハンドラーが止まること."""
+    handled: List[str] = []
+    cancelled: List[str] = []
+
+    async def failing(notification: Notification) -> None:
+        handled.append(f"failing {notification.topic}")
+        raise RuntimeError("boom")
+
+    async def slow(notification: Notification) -> None:
+        handled.append(f"slow {notification.topic}")
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(notification.topic)
+            raise
+
+    async def scenario() -> None:
+        client = MQTTClient(_Headers())  # type: ignore[arg-type]
+        await client.subscribe("/a/+", failing)
+        await client.subscribe("/a/#", slow)
+
+        assert client._route(Notification.from_dict({}, "/a/b"))
+        assert not client._route(Notification.from_dict({}, "/b"))
+        await asyncio.sleep(0.01)
+        assert sorted(handled) == ["failing /a/b", "slow /a/b"]
+
+        await client.stop()
+        assert cancelled == ["/a/b"]
+        assert not client._handler_tasks
+
+    with caplog.at_level(logging.ERROR, logger="works.mqtt.client"):
+        asyncio.run(asyncio.wait_for(scenario(), 10))
+    (record,) = caplog.records
+    assert record.exc_info is not None
+    assert isinstance(record.exc_info[1], RuntimeError)
@@ -0,0 +1,94 @@
+"""Notificationのテスト."""
+
+import json
+
+import pytest
+
+from works.constants import MessageType
+from works.mqtt.notification import Notification
+
+
+def _raw(**fields: object) -> bytes:
+    """フィールドからJSONペイロードを生成します."""
+    return json.dumps(fields).encode("utf-8")
+
+
+def test_keys_are_read_without_decoding() -> None:
+    """重複除外と欠落検出のキーはデコードせずに読み取ること."""
+    raw = _raw(**{"notification-id": "msg.1", "chNo": 10, "messageNo": 3})
+    notification = Notification(memoryview(raw), "/t")
+
+    assert notification.notification_id == "msg.1"
+    assert notification.channel_no == 10
+    assert notification.message_no == 3
+    assert not notification.is_decoded
+
+
+def test_numbers_sent_as_strings() -> None:
+    """文字列で届いた番号も整数として読み取ること."""
+    notification = Notification(_raw(chNo="10", messageNo="-1"))
+
+    assert notification.channel_no == 10
+    assert notification.message_no == -1
+    assert not notification.is_decoded
+
+
+def test_missing_keys() -> None:
+    """含まれていないキーはデコードせずにNoneとなること."""
+    notification = Notification(_raw(nType=1))
+
+    assert notification.notification_id is None
+    assert notification.channel_no is None
+    assert notification.message_no is None
+    assert not notification.is_decoded
+
+
+def test_nested_key_falls_back_to_decoding() -> None:
+    """入れ子に同じ名前がある場合はデコードした値を使うこと."""
+    raw = _raw(extra={"chNo": 99}, chNo=10)
+    notification = Notification(raw)
+
+    assert notification.channel_no == 10
+    assert notification.is_decoded
+
+
+def test_key_only_in_nested_object() -> None:
+    """入れ子のオブジェクトにだけある名前はトップレベルの値としないこと."""
+    notification = Notification(_raw(extra={"messageNo": 5}))
+
+    assert notification.message_no is None
+
+
+def test_mapping_access_decodes_once() -> None:
+    """辞書と同じ読み取り操作でデコードされた値を返すこと."""
+    raw = _raw(nType=1, chNo=10, **{"loc-args1": "hello"})
+    notification = Notification(raw, "/t")
+
+    assert notification["loc-args1"] == "hello"
+    assert notification.is_decoded
+    assert notification.get("missing") is None
+    assert "chNo" in notification
+    assert len(notification) == 3
+    assert notification.content == "hello"
+    assert notification.message_type == MessageType(1)
+
+
+def test_malformed_payload() -> None:
+    """不正なJSONでもキーは読み取れ、デコード時にValueErrorとなること."""
+    notification = Notification(b'{"chNo": 10, "messageNo": 3, broken')
+
+    assert notification.channel_no == 10
+    assert notification.message_no == 3
+    with pytest.raises(ValueError):
+        notification.data  # noqa: B018
+    with pytest.raises(ValueError):
+        Notification(b"[1, 2]").data  # noqa: B018
+
+
+def test_from_dict() -> None:
+    """デコード済みの辞書から生成した通知はそのまま読み取れること."""
+    notification = Notification.from_dict({"chNo": 10}, "/t")
+
+    assert notification.is_decoded
+    assert notification.channel_no == 10
+    assert notification.topic == "/t"
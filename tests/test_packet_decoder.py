@@ -0,0 +1,114 @@
+"""PacketDecoderのテスト."""
+
+import pytest
+
+from works.mqtt.packet import (
+    PacketDecoder,
+    PacketType,
+    build_puback_packet,
+    build_publish_packet,
+    parse_publish_view,
+)
+
+
+def _publish(topic: str, payload: bytes, message_id: int = 1) -> bytes:
+    """QoS 1のPUBLISHパケットのバイト列を生成します."""
+    return build_publish_packet(
+        topic, payload, qos=1, message_id=message_id
+    ).packet
+
+
+def test_single_packet_in_one_frame() -> None:
+    """1フレームに1パケットの場合はそのまま復元されること."""
+    decoder = PacketDecoder()
+    packets = decoder.feed(_publish("a/b", b'{"x":1}'))
+
+    assert len(packets) == 1
+    view = parse_publish_view(packets[0])
+    assert view.topic == "a/b"
+    assert bytes(view.payload) == b'{"x":1}'
+    assert view.message_id == 1
+    assert decoder.buffered == 0
+
+
+def test_packet_split_across_frames() -> None:
+    """複数フレームに分割されたパケットが1つに復元されること."""
+    data = _publish("a/b", b"payload")
+    decoder = PacketDecoder()
+
+    assert decoder.feed(data[:1]) == []
+    assert decoder.feed(data[1:2]) == []
+    assert decoder.feed(data[2:-1]) == []
+    assert decoder.buffered == len(data) - 1
+
+    packets = decoder.feed(data[-1:])
+    assert len(packets) == 1
+    assert bytes(parse_publish_view(packets[0]).payload) == b"payload"
+    assert decoder.buffered == 0
+
+
+def test_every_split_point() -> None:
+    """どの位置で分割しても同じパケット列が得られること."""
+    data = _publish("a", b"1", 1) + build_puback_packet(7).packet
+    for split in range(1, len(data)):
+        decoder = PacketDecoder()
+        packets = decoder.feed(data[:split]) + decoder.feed(data[split:])
+        assert [p.packet_type for p in packets] == [
+            PacketType.PUBLISH,
+            PacketType.PUBACK,
+        ]
+        assert decoder.buffered == 0
+
+
+def test_several_packets_in_one_frame() -> None:
+    """1フレームに含まれる複数のパケットが受信順に返されること."""
+    data = b"".join(_publish(f"t/{i}", b"x", i + 1) for i in range(3))
+    packets = PacketDecoder().feed(data)
+
+    assert [parse_publish_view(p).topic for p in packets] == [
+        "t/0",
+        "t/1",
+        "t/2",
+    ]
+
+
+def test_trailing_partial_packet_is_buffered() -> None:
+    """フレーム末尾の不完全なパケットは次のフレームまで保持されること."""
+    first = _publish("a", b"1", 1)
+    second = _publish("b", b"2", 2)
+    decoder = PacketDecoder()
+
+    packets = decoder.feed(first + second[:3])
+    assert len(packets) == 1
+    assert decoder.buffered == 3
+
+    packets = decoder.feed(second[3:])
+    assert [parse_publish_view(p).topic for p in packets] == ["b"]
+    assert decoder.buffered == 0
+
+
+def test_multi_byte_remaining_length() -> None:
+    """残りの長さが複数バイトのパケットを分割しても復元できること."""
+    payload = b"x" * 20000
+    data = _publish("big", payload)
+    decoder = PacketDecoder()
+
+    # 残りの長さのフィールドの途中で分割する
+    assert decoder.feed(data[:2]) == []
+    packets = decoder.feed(data[2:])
+    assert len(packets) == 1
+    assert bytes(parse_publish_view(packets[0]).payload) == payload
+
+
+def test_malformed_packet_resets_buffer() -> None:
+    """不正なパケットはValueErrorとなり、バッファが破棄されること."""
+    decoder = PacketDecoder()
+    # 残りの長さが4バイトを超える不正なパケット
+    decoder.feed(b"\x30\xff\xff")
+
+    with pytest.raises(ValueError):
+        decoder.feed(b"\xff\xff\x01")
+    assert decoder.buffered == 0
+
+    packets = decoder.feed(_publish("a", b"1"))
+    assert len(packets) == 1
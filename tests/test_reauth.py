@@ -0,0 +1,111 @@
+"""Tests for logging in again after a 401 response."""
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from works.auth import AuthManager, HeaderManager
+from works.message_sender import MessageSender
+
+OLD_HEADERS = {"Cookie": "WORKS_SES=old"}
+
+
+@pytest.fixture
+def auth(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AuthManager:
+    """Return an AuthManager that has just logged in.
+
+    Logins take a moment so that concurrent callers overlap, and are
+    counted in ``auth.logins``; stale marks are counted in ``auth.stale``.
+    """
+    manager = AuthManager("user@example.com", "password")
+    manager.cookie_path = tmp_path / "cookie.json"
+    manager._last_login_time = time.time()
+    logins: List[int] = []
+    stale: List[int] = []
+
+    def login(priority: int = 0) -> str:
+        time.sleep(0.1)
+        logins.append(priority)
+        return json.dumps({"WORKS_SES": f"new{len(logins)}"})
+
+    monkeypatch.setattr(manager, "_perform_login", login)
+    monkeypatch.setattr(
+        manager, "mark_cookies_stale", lambda: stale.append(1)
+    )
+    manager.logins = logins  # type: ignore[attr-defined]
+    manager.stale = stale  # type: ignore[attr-defined]
+    return manager
+
+
+def test_concurrent_reauthentication_logs_in_once(auth: AuthManager) -> None:
+    """Threads rejected with the same headers share one login."""
+    headers = HeaderManager(auth, dict(OLD_HEADERS))
+    results: List[bool] = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(headers.reauthenticate(0))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 5
+    assert len(auth.logins) == 1  # type: ignore[attr-defined]
+    assert len(auth.stale) == 1  # type: ignore[attr-defined]
+    assert headers.version == 1
+    assert "new1" in headers.headers["Cookie"]
+
+
+def test_async_reauthentication_logs_in_once(auth: AuthManager) -> None:
+    """Coroutines rejected with the same headers share one login."""
+    headers = HeaderManager(auth, dict(OLD_HEADERS))
+
+    async def run() -> List[bool]:
+        return await asyncio.gather(
+            *(headers.async_reauthenticate(0) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == [True] * 5
+    assert len(auth.logins) == 1  # type: ignore[attr-defined]
+    assert len(auth.stale) == 1  # type: ignore[attr-defined]
+
+
+def test_reauthentication_bypasses_cooldown(auth: AuthManager) -> None:
+    """Only background refreshes wait for the login cooldown."""
+    headers = HeaderManager(auth, dict(OLD_HEADERS))
+
+    with pytest.raises(Exception, match="too frequent"):
+        asyncio.run(headers.async_refresh())
+    assert headers.reauthenticate(0)
+    assert len(auth.logins) == 1  # type: ignore[attr-defined]
+
+
+def test_sender_retries_once_with_new_headers(auth: AuthManager) -> None:
+    """A 401 is retried once with the headers from the new login."""
+    sender = MessageSender(HeaderManager(auth, dict(OLD_HEADERS)))
+    sent: List[str] = []
+
+    def post(url: str, headers: Dict[str, str], **kwargs: Any) -> Any:
+        sent.append(headers["Cookie"])
+        status = 401 if len(sent) == 1 else 200
+        return SimpleNamespace(status_code=status, content=b"{}")
+
+    sender._session.post = post  # type: ignore[method-assign]
+    try:
+        result = sender._post_request("/send", {"channelNo": "1"})
+    finally:
+        sender._session.close()
+
+    assert result["status_code"] == "200"
+    assert sent[0] == OLD_HEADERS["Cookie"]
+    assert "new1" in sent[1]
+    assert len(auth.stale) == 1  # type: ignore[attr-defined]
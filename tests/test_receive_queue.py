@@ -0,0 +1,140 @@
+"""ReceiveQueueのテスト."""
+
+import asyncio
+from typing import List
+
+from works.mqtt.notification import Notification
+from works.mqtt.queue import OverflowPolicy, ReceiveQueue
+
+
+def _notification(n_type: int, no: int) -> Notification:
+    """通知タイプと番号を持つ通知を生成します."""
+    return Notification.from_dict({"nType": n_type, "no": no})
+
+
+async def _drain(queue: ReceiveQueue) -> List[int]:
+    """キューを閉じて、残りの通知の番号を取り出します."""
+    await queue.close()
+    numbers = []
+    while True:
+        item = await queue.get()
+        if item is None:
+            return numbers
+        numbers.append(item.data["no"])
+
+
+def test_drop_oldest() -> None:
+    """DROP_OLDESTでは最も古い通知から破棄されること."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+        for no in range(4):
+            assert await queue.put(_notification(1, no)) is True
+
+        assert queue.stats.dropped == 2
+        assert queue.stats.dropped_by_type == {1: 2}
+        assert queue.stats.max_depth == 2
+        assert await _drain(queue) == [2, 3]
+
+    asyncio.run(scenario())
+
+
+def test_drop_by_type_drops_queued_droppable() -> None:
+    """DROP_BY_TYPEではキュー内の破棄可能な通知から破棄されること."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(
+            maxsize=3,
+            policy=OverflowPolicy.DROP_BY_TYPE,
+            droppable_types=(9,),
+        )
+        await queue.put(_notification(1, 0))
+        await queue.put(_notification(9, 1))
+        await queue.put(_notification(1, 2))
+
+        assert await queue.put(_notification(1, 3)) is True
+        assert queue.stats.dropped_by_type == {9: 1}
+        assert await _drain(queue) == [0, 2, 3]
+
+    asyncio.run(scenario())
+
+
+def test_drop_by_type_drops_incoming_droppable() -> None:
+    """破棄可能な通知がキューになければ、受信した破棄可能な通知を破棄すること."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(
+            maxsize=2,
+            policy=OverflowPolicy.DROP_BY_TYPE,
+            droppable_types=(9,),
+        )
+        await queue.put(_notification(1, 0))
+        await queue.put(_notification(1, 1))
+
+        assert await queue.put(_notification(9, 2)) is False
+        assert queue.stats.dropped_by_type == {9: 1}
+        assert await _drain(queue) == [0, 1]
+
+    asyncio.run(scenario())
+
+
+def test_drop_by_type_blocks_on_non_droppable() -> None:
+    """破棄できる通知がなければ、空きができるまで待機すること."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(
+            maxsize=1,
+            policy=OverflowPolicy.DROP_BY_TYPE,
+            droppable_types=(9,),
+        )
+        await queue.put(_notification(1, 0))
+        put = asyncio.create_task(queue.put(_notification(1, 1)))
+        await asyncio.sleep(0)
+
+        assert queue.is_blocking
+        assert not put.done()
+        item = await queue.get()
+        assert item is not None
+        assert item.data["no"] == 0
+        assert await put is True
+        assert queue.stats.dropped == 0
+        assert await _drain(queue) == [1]
+
+    asyncio.run(scenario())
+
+
+def test_block_waits_for_space() -> None:
+    """BLOCKでは空きができるまで待機し、通知を破棄しないこと."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(maxsize=2, policy=OverflowPolicy.BLOCK)
+        await queue.put(_notification(1, 0))
+        await queue.put(_notification(1, 1))
+        put = asyncio.create_task(queue.put(_notification(1, 2)))
+        await asyncio.sleep(0)
+
+        assert queue.is_blocking
+        assert queue.stats.blocked == 1
+        await queue.get()
+        assert await put is True
+        assert not queue.is_blocking
+        assert queue.stats.dropped == 0
+        assert await _drain(queue) == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_close_releases_blocked_put() -> None:
+    """キューを閉じると待機中のputがFalseを返すこと."""
+
+    async def scenario() -> None:
+        queue = ReceiveQueue(maxsize=1)
+        await queue.put(_notification(1, 0))
+        put = asyncio.create_task(queue.put(_notification(1, 1)))
+        await asyncio.sleep(0)
+
+        await queue.close()
+        assert await put is False
+        assert await _drain(queue) == [0]
+
+    asyncio.run(scenario())
@@ -0,0 +1,188 @@
+"""再接続の管理のテスト."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from works.mqtt import websocket
+from works.mqtt.broker import BrokerConfig, LocalBroker, default_payload
+from works.mqtt.client import MQTTConfig
+from works.mqtt.reconnect import (
+    CircuitBreaker,
+    DecorrelatedJitter,
+    DowntimeWindow,
+    ReconnectSupervisor,
+)
+
+
+class _Clock:
+    """手動で進める時計."""
+
+    def __init__(self) -> None:
+        """時刻0から開始します."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """現在時刻を返します."""
+        return self.now
+
+
+class _Headers:
+    """認証ヘッダーを持たないHeaderManagerの代わり."""
+
+    headers: dict = {}
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """ReconnectSupervisor.wait()の待機時間を待たずに記録します."""
+    delays: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr("works.mqtt.reconnect.asyncio.sleep", sleep)
+    return delays
+
+
+def test_decorrelated_jitter_is_capped_and_resets() -> None:
+    """待機時間は上限で頭打ちになり、リセットで最小値に戻ること."""
+    jitter = DecorrelatedJitter(1, 10, rng=lambda low, high: high)
+
+    assert [jitter.next() for _ in range(4)] == [3, 9, 10, 10]
+    jitter.reset()
+    assert jitter.next() == 3
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    """連続した失敗で開き、時間経過後の1回の試行で状態が決まること."""
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10, clock=clock
+    )
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.remaining() == 10
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    # 半開状態での失敗はすぐに開状態に戻す
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_max_retries(sleeps: List[float]) -> None:
+    """試行回数の上限に達するとwait()がFalseを返すこと."""
+    supervisor = ReconnectSupervisor(1, 10, max_retries=2)
+
+    async def scenario() -> List[bool]:
+        return [await supervisor.wait() for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    assert len(sleeps) == 2
+
+
+def test_downtime_window_reports_attempts(sleeps: List[float]) -> None:
+    """再接続時に切断されていた期間と試行回数を返すこと."""
+    supervisor = ReconnectSupervisor(1, 10)
+
+    async def scenario() -> None:
+        assert supervisor.on_connected() is None
+        supervisor.on_disconnected()
+        await supervisor.wait()
+        supervisor.on_disconnected(failed=True)
+        await supervisor.wait()
+
+    asyncio.run(scenario())
+    window = supervisor.on_connected()
+
+    assert isinstance(window, DowntimeWindow)
+    assert window.attempts == 2
+    assert window.duration >= 0
+    assert supervisor.last_downtime == window
+
+
+def test_short_connection_counts_as_failure(sleeps: List[float]) -> None:
+    """min_uptime秒続かなかった接続は失敗として扱うこと."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    supervisor = ReconnectSupervisor(1, 10, breaker=breaker, min_uptime=60)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            supervisor.on_connected()
+            supervisor.on_disconnected()
+            await supervisor.wait()
+
+    asyncio.run(scenario())
+
+    assert supervisor.attempts == 2
+    assert breaker.state == "open"
+    # 開いている間はサーキットブレーカーの残り時間だけ待つ
+    assert sleeps[-1] >= 59
+
+
+def test_stable_connection_resets_attempts(sleeps: List[float]) -> None:
+    """min_uptime秒続いた接続で試行回数とブレーカーがリセットされること."""
+    breaker = CircuitBreaker(failure_threshold=5)
+    supervisor = ReconnectSupervisor(1, 10, breaker=breaker, min_uptime=0)
+
+    async def scenario() -> None:
+        supervisor.on_disconnected(failed=True)
+        await supervisor.wait()
+
+    asyncio.run(scenario())
+    assert supervisor.attempts == 1
+    assert breaker.failures == 1
+
+    supervisor.on_connected()
+    assert supervisor.attempts == 0
+    assert breaker.failures == 0
+
+
+def test_receive_passes_reconnect_handler(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """connect_websocket()に渡したハンドラーが再接続時に呼ばれること."""
+
+    async def scenario() -> List[DowntimeWindow]:
+        windows: List[DowntimeWindow] = []
+        config = BrokerConfig(disconnect_after=0.2)
+        async with LocalBroker(config) as broker:
+            monkeypatch.setattr(
+                websocket,
+                "MQTTConfig",
+                lambda **kwargs: MQTTConfig(url=broker.url, **kwargs),
+            )
+
+            async def on_reconnect(window: DowntimeWindow) -> None:
+                windows.append(window)
+                broker.config.disconnect_after = None
+                await broker.publish(
+                    "/domains/1/users/2", default_payload("", 1)
+                )
+
+            messages = websocket.connect_websocket(
+                _Headers(),  # type: ignore[arg-type]
+                "1",
+                "2",
+                polling_interval=0.01,  # type: ignore[arg-type]
+                on_reconnect=on_reconnect,
+            )
+            async for ok, _ in messages:
+                if ok:
+                    break
+            await messages.aclose()
+        return windows
+
+    windows = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert len(windows) == 1
+    assert windows[0].attempts == 1
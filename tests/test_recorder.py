@@ -0,0 +1,165 @@
+"""SessionRecorderと記録したセッションの再生のテスト."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from works.mqtt.broker import default_payload
+from works.mqtt.client import MQTTClient, MQTTConfig
+from works.mqtt.packet import build_publish_packet
+from works.mqtt.recorder import (
+    _RECORD,
+    MAGIC,
+    SessionReader,
+    SessionRecorder,
+)
+
+TOPIC = "/domains/1/users/2"
+
+
+class _Headers:
+    """認証ヘッダーを持たないHeaderManagerの代わり."""
+
+    headers: dict = {}
+
+
+def _publish(seq: int) -> bytes:
+    """通番seqの通知を含むPUBLISHフレームを生成します."""
+    return build_publish_packet(TOPIC, default_payload(TOPIC, seq)).packet
+
+
+def _write_log(path: Path, records: Sequence[Tuple[float, bytes]]) -> None:
+    """(UNIX時刻の秒, フレーム)のレコードから記録ファイルを作成します."""
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for seconds, frame in records:
+            f.write(_RECORD.pack(int(seconds * 1e9), len(frame)))
+            f.write(frame)
+
+
+async def _replay(path: Path, realtime: bool = False) -> List[int]:
+    """記録ファイルを再生し、通知のメッセージ番号を返します."""
+    client = MQTTClient(_Headers())  # type: ignore[arg-type]
+    numbers = []
+    async for ok, notification in client.replay(path, realtime=realtime):
+        assert ok
+        assert notification is not None
+        numbers.append(notification.message_no)
+    return numbers
+
+
+def test_record_and_read(tmp_path: Path) -> None:
+    """記録したフレームと接続の区切りがUNIX時刻とともに読み出せること."""
+    path = tmp_path / "session.log"
+    before = time.time_ns()
+    with SessionRecorder(path) as recorder:
+        recorder.mark_boundary()
+        recorder.record(b"first")
+        recorder.record(b"second")
+        recorder.flush()
+    after = time.time_ns()
+
+    with SessionReader(path) as reader:
+        records = [(ts, bytes(frame)) for ts, frame in reader]
+
+    assert [frame for _, frame in records] == [b"", b"first", b"second"]
+    assert all(before <= ts <= after for ts, _ in records)
+
+
+def test_recorder_appends_to_existing_log(tmp_path: Path) -> None:
+    """既存の記録ファイルには追記されること."""
+    path = tmp_path / "session.log"
+    with SessionRecorder(path) as recorder:
+        recorder.record(b"run 1")
+    with SessionRecorder(path) as recorder:
+        recorder.record(b"run 2")
+
+    with SessionReader(path) as reader:
+        assert [bytes(frame) for _, frame in reader] == [b"run 1", b"run 2"]
+
+
+def test_reader_ignores_truncated_record(tmp_path: Path) -> None:
+    """末尾の書きかけのレコードは無視されること."""
+    path = tmp_path / "session.log"
+    _write_log(path, [(1.0, b"complete")])
+    with open(path, "ab") as f:
+        f.write(_RECORD.pack(2, 100) + b"partial")
+
+    with SessionReader(path) as reader:
+        assert [bytes(frame) for _, frame in reader] == [b"complete"]
+
+
+def test_not_a_session_log(tmp_path: Path) -> None:
+    """記録ファイルでないファイルはValueErrorとなること."""
+    path = tmp_path / "other.log"
+    path.write_bytes(b"something else")
+
+    with pytest.raises(ValueError):
+        SessionReader(path)
+    with pytest.raises(ValueError):
+        SessionRecorder(path)
+
+
+def test_replay_splits_frames_and_drops_duplicates(tmp_path: Path) -> None:
+    """分割されたフレームを復元し、重複した通知を除くこと."""
+    path = tmp_path / "session.log"
+    frame = _publish(1) + _publish(2)
+    _write_log(
+        path,
+        [
+            (100.0, b""),
+            (100.1, frame[:5]),
+            (100.2, frame[5:]),
+            (100.3, _publish(2)),
+            (100.4, _publish(3)),
+        ],
+    )
+
+    assert asyncio.run(_replay(path)) == [1, 2, 3]
+
+
+def test_replay_dedup_uses_recorded_time_across_runs(tmp_path: Path) -> None:
+    """別の実行の記録とも記録時刻で重複を判定すること."""
+    path = tmp_path / "session.log"
+    ttl = MQTTConfig().dedup_ttl
+    _write_log(
+        path,
+        [
+            (1000.0, b""),
+            (1000.0, _publish(1)),
+            # 次の実行での再接続後の再送(有効期限内)
+            (1000.0 + ttl / 2, b""),
+            (1000.0 + ttl / 2, _publish(1)),
+            # 有効期限後に同じ通知が届いた場合は重複としない
+            (1000.0 + ttl * 2, b""),
+            (1000.0 + ttl * 2, _publish(1)),
+        ],
+    )
+
+    assert asyncio.run(_replay(path)) == [1, 1]
+
+
+def test_realtime_replay_skips_gaps_between_connections(
+    tmp_path: Path,
+) -> None:
+    """実時間の再生で接続の間の空白を待たないこと."""
+    path = tmp_path / "session.log"
+    _write_log(
+        path,
+        [
+            (1000.0, b""),
+            (1000.0, _publish(1)),
+            (1000.05, _publish(2)),
+            (9000.0, b""),
+            (9000.0, _publish(3)),
+            (9000.05, _publish(4)),
+        ],
+    )
+
+    started = time.monotonic()
+    assert asyncio.run(_replay(path, realtime=True)) == [1, 2, 3, 4]
+    elapsed = time.monotonic() - started
+    assert 0.1 <= elapsed < 5
@@ -0,0 +1,146 @@
+"""Tests for TokenBucket and SendQueue."""
+
+import asyncio
+from typing import Callable, Dict, List
+
+import pytest
+
+from works.ratelimit import Priority, TokenBucket
+from works.send_queue import SendFactory, SendQueue
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def _recorder(order: List[str]) -> Callable[[str], SendFactory]:
+    """Return a factory maker that records the dispatch order."""
+
+    def make(label: str) -> SendFactory:
+        async def send() -> Dict[str, str]:
+            order.append(label)
+            return {"success": "True", "status_code": "201"}
+
+        return send
+
+    return make
+
+
+def test_token_bucket_burst_and_refill() -> None:
+    """The bucket allows a burst, then refills at its rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.25
+    assert bucket.wait_time() == pytest.approx(0.25)
+    clock.now += 0.25
+    assert bucket.wait_time() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_caps_at_burst() -> None:
+    """Idle time does not store more tokens than the burst."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+
+    clock.now += 100
+    assert bucket.try_acquire(2) == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_token_bucket_configure_shrinks_tokens() -> None:
+    """Lowering the burst drops the tokens above the new capacity."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=5, clock=clock)
+
+    bucket.configure(rate=1, burst=1)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_send_queue_priority_then_round_robin() -> None:
+    """Higher priorities go first, channels take turns within one."""
+
+    async def scenario() -> List[str]:
+        order: List[str] = []
+        make = _recorder(order)
+        async with SendQueue(1000, 100, 1000, 100) as queue:
+            queue.submit("a", make("a1"), Priority.LOW)
+            queue.submit("a", make("a2"), Priority.LOW)
+            queue.submit("a", make("a3"), Priority.LOW)
+            queue.submit("b", make("b1"), Priority.LOW)
+            queue.submit("c", make("c1"), Priority.HIGH)
+            queue.submit("d", make("d1"), Priority.NORMAL)
+            queue.submit("c", make("c2"), Priority.HIGH)
+            await queue.join()
+        return order
+
+    assert asyncio.run(scenario()) == [
+        "c1",
+        "c2",
+        "d1",
+        "a1",
+        "b1",
+        "a2",
+        "a3",
+    ]
+
+
+def test_send_queue_skips_channel_out_of_tokens() -> None:
+    """A channel waiting for tokens does not hold up other channels."""
+
+    async def scenario() -> List[str]:
+        order: List[str] = []
+        make = _recorder(order)
+        async with SendQueue(100, 1, 1000, 100) as queue:
+            queue.submit("a", make("a1"))
+            queue.submit("a", make("a2"))
+            queue.submit("b", make("b1"))
+            queue.submit("b", make("b2"))
+            queue.submit("c", make("c1"))
+            await queue.join()
+            assert queue.stats.sent == 5
+        return order
+
+    assert asyncio.run(scenario()) == ["a1", "b1", "c1", "a2", "b2"]
+
+
+def test_send_queue_cancelled_job_is_skipped() -> None:
+    """A send cancelled while queued is never dispatched."""
+
+    async def scenario() -> List[str]:
+        order: List[str] = []
+        make = _recorder(order)
+        async with SendQueue(1000, 100, 1000, 100) as queue:
+            queue.submit("a", make("a1")).cancel()
+            result = await queue.send("a", make("a2"))
+            assert result["success"] == "True"
+            assert queue.stats.pending == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["a2"]
+
+
+def test_send_queue_rejects_after_close() -> None:
+    """Submitting to a closed queue raises RuntimeError."""
+
+    async def scenario() -> None:
+        queue = SendQueue()
+        await queue.close()
+        with pytest.raises(RuntimeError):
+            queue.submit("a", _recorder([])("a1"))
+
+    asyncio.run(scenario())
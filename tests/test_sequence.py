@@ -0,0 +1,128 @@
+"""SequenceTrackerと欠落の補完のテスト."""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+
+from works.constants import StatusFlag
+from works.mqtt.broker import LocalBroker
+from works.mqtt.client import MQTTClient, MQTTConfig
+from works.mqtt.sequence import Gap, SequenceTracker
+
+USER_TOPIC = "/domains/1/users/2"
+
+
+class _Headers:
+    """認証ヘッダーを持たないHeaderManagerの代わり."""
+
+    headers: dict = {}
+
+
+def test_consecutive_numbers_have_no_gap() -> None:
+    """連続したメッセージ番号では欠落を検出しないこと."""
+    tracker = SequenceTracker()
+
+    assert tracker.observe(1, 10) is None
+    assert tracker.observe(1, 11) is None
+    assert tracker.observe(2, 5) is None
+    assert tracker.last(1) == 11
+    assert len(tracker) == 2
+    assert tracker.stats.gaps == 0
+
+
+def test_gap_and_reordering() -> None:
+    """欠落を検出し、遅れて届いた番号で欠落が埋まること."""
+    tracker = SequenceTracker()
+    tracker.observe(1, 1)
+
+    gap = tracker.observe(1, 5)
+    assert gap == Gap(1, 2, 4)
+    assert len(gap) == 3
+    assert tracker.stats.missing == 3
+
+    assert tracker.observe(1, 3) is None
+    assert tracker.stats.reordered == 1
+    assert tracker.missing(gap) == [Gap(1, 2, 2), Gap(1, 4, 4)]
+
+    assert tracker.observe(1, 3) is None
+    assert tracker.stats.stale == 1
+    assert tracker.missing_ranges() == {1: [(2, 2), (4, 4)]}
+
+
+def test_own_messages_are_not_gaps() -> None:
+    """自分が送信した番号は欠落として扱わないこと."""
+    tracker = SequenceTracker()
+    tracker.observe(1, 1)
+    tracker.skip(1, 2)
+    tracker.skip(1, 4)
+
+    assert tracker.observe(1, 3) is None
+    gap = tracker.observe(1, 6)
+    assert gap == Gap(1, 5, 5)
+    assert tracker.stats.missing == 1
+
+
+def test_skip_after_gap_fills_it() -> None:
+    """欠落の検出後に判明した自分の送信は欠落から取り除かれること."""
+    tracker = SequenceTracker()
+    tracker.observe(1, 1)
+    gap = tracker.observe(1, 4)
+    assert gap is not None
+
+    tracker.skip(1, 2)
+    assert tracker.missing(gap) == [Gap(1, 3, 3)]
+
+
+def test_max_ranges_drops_oldest() -> None:
+    """保持する欠落範囲の数を超えると古い範囲から破棄されること."""
+    tracker = SequenceTracker(max_ranges=2)
+    tracker.observe(1, 0)
+    for message_no in (2, 4, 6):
+        tracker.observe(1, message_no)
+
+    assert tracker.missing_ranges() == {1: [(3, 3), (5, 5)]}
+
+
+def test_gap_fetcher_fills_missing_messages() -> None:
+    """遅れても届かなかった範囲だけを取得して受信キューに入れること."""
+    requests: List[Tuple[int, int, int]] = []
+
+    async def fetch(
+        channel_no: int, start: int, end: int
+    ) -> List[Dict[str, Any]]:
+        requests.append((channel_no, start, end))
+        return [
+            {"chNo": channel_no, "messageNo": 3, "fromUserNo": 9},
+            # 自分の送信は受信として扱わない
+            {"chNo": channel_no, "messageNo": 4, "fromUserNo": 2},
+        ]
+
+    def payload(message_no: int) -> bytes:
+        return json.dumps({"chNo": 7, "messageNo": message_no}).encode()
+
+    async def scenario() -> List[int]:
+        async with LocalBroker() as broker:
+            config = MQTTConfig(url=broker.url, max_retries=0, gap_grace=0.1)
+            client = MQTTClient(_Headers(), config)  # type: ignore[arg-type]
+            client.set_gap_fetcher(fetch)
+
+            async def publish() -> None:
+                while client.state != StatusFlag.CONNECTED:
+                    await asyncio.sleep(0.01)
+                for message_no in (1, 2, 5):
+                    await broker.publish(USER_TOPIC, payload(message_no))
+
+            task = asyncio.create_task(publish())
+            received = []
+            async for _, notification in client.connect("1", "2"):
+                assert notification is not None
+                received.append(notification.message_no)
+                if len(received) == 4:
+                    break
+            await task
+            await client.stop()
+            assert client.sequences.stats.backfilled == 1
+            return received
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 10)) == [1, 2, 5, 3]
+    assert requests == [(7, 3, 4)]
@@ -0,0 +1,87 @@
+"""Tests for scheduling background session refreshes."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from works.auth import SessionRefresher
+
+
+class _StopError(Exception):
+    """Raised by the patched sleep to end the refresh loop."""
+
+
+class _Headers:
+    """HeaderManager stub whose refresh sets the next session expiry."""
+
+    def __init__(self, expiries: List[Optional[float]]) -> None:
+        self.auth_manager = SimpleNamespace(session_expires_at=None)
+        self.expiries = expiries
+        self.refreshes = 0
+
+    async def async_refresh(self, priority: int = 0) -> None:
+        self.refreshes += 1
+        if not self.expiries:
+            raise RuntimeError("login failed")
+        self.auth_manager.session_expires_at = self.expiries.pop(0)
+
+
+def _run(refresher: SessionRefresher, monkeypatch: pytest.MonkeyPatch,
+         sleeps: int) -> List[float]:
+    """Run the refresh loop for ``sleeps`` sleeps and return the delays."""
+    delays: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        if len(delays) == sleeps:
+            raise _StopError
+        delays.append(delay)
+
+    monkeypatch.setattr("works.auth.asyncio.sleep", sleep)
+    with pytest.raises(_StopError):
+        asyncio.run(refresher._run())
+    return delays
+
+
+def test_unknown_expiry_uses_interval() -> None:
+    """Without a known expiry the refresh runs every interval."""
+    refresher = SessionRefresher(_Headers([]), interval=60)  # type: ignore[arg-type]
+    assert refresher.next_delay() == 60
+
+
+def test_refresh_runs_margin_before_expiry() -> None:
+    """The refresh is scheduled ``margin`` seconds before the expiry."""
+    headers = _Headers([])
+    headers.auth_manager.session_expires_at = time.time() + 1000
+    refresher = SessionRefresher(headers, margin=600)  # type: ignore[arg-type]
+    assert 390 < refresher.next_delay() <= 400
+
+
+def test_session_inside_margin_is_refreshed_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A refresh that does not extend the session backs off."""
+    soon = time.time() + 10
+    headers = _Headers([soon, soon, soon])
+    headers.auth_manager.session_expires_at = soon
+    refresher = SessionRefresher(  # type: ignore[arg-type]
+        headers, margin=600, retry_delay=300
+    )
+
+    assert _run(refresher, monkeypatch, sleeps=3) == [0.0, 300, 300]
+    assert headers.refreshes == 3
+
+
+def test_failed_refresh_waits_retry_delay(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failed refresh is retried after ``retry_delay``."""
+    headers = _Headers([])
+    refresher = SessionRefresher(  # type: ignore[arg-type]
+        headers, interval=60, retry_delay=5
+    )
+
+    assert _run(refresher, monkeypatch, sleeps=2) == [60, 5]
+    assert refresher.failures == 2
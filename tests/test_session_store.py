@@ -0,0 +1,137 @@
+"""Tests for the SQLite session store."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from works.auth import AuthManager
+from works.session_store import SessionStore
+
+COOKIES = {"WORKS_SES": "session", "name": "日本語"}
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[SessionStore]:
+    """Return a store in a temporary directory."""
+    session_store = SessionStore(tmp_path / "db" / "sessions.db")
+    yield session_store
+    session_store.close()
+
+
+def test_save_and_load(store: SessionStore) -> None:
+    """Saved sessions are loaded with their metadata."""
+    assert store.load("user") is None
+    store.save("user", COOKIES, verified_at=10.0, expires_at=20.0)
+
+    assert store.load("user") == {
+        "cookies": COOKIES,
+        "verified_at": 10.0,
+        "expires_at": 20.0,
+    }
+
+
+def test_save_replaces_session(store: SessionStore) -> None:
+    """Saving again replaces every field of the session."""
+    store.save("user", COOKIES, verified_at=10.0, expires_at=20.0)
+    store.save("user", {"WORKS_SES": "new"})
+
+    assert store.load("user") == {
+        "cookies": {"WORKS_SES": "new"},
+        "verified_at": 0,
+        "expires_at": None,
+    }
+
+
+def test_mark_stale_keeps_cookies(store: SessionStore) -> None:
+    """Marking a session stale only resets its verification time."""
+    store.save("user", COOKIES, verified_at=10.0, expires_at=20.0)
+    store.mark_stale("user")
+    store.mark_stale("missing")
+
+    assert store.load("user") == {
+        "cookies": COOKIES,
+        "verified_at": 0,
+        "expires_at": 20.0,
+    }
+    assert store.input_ids() == ["user"]
+
+
+def test_delete_and_input_ids(store: SessionStore) -> None:
+    """Accounts are listed in order and can be deleted."""
+    store.save("b", COOKIES)
+    store.save("a", COOKIES)
+    assert store.input_ids() == ["a", "b"]
+
+    store.delete("a")
+    store.delete("missing")
+    assert store.input_ids() == ["b"]
+
+
+def test_corrupt_cookies_are_deleted(store: SessionStore) -> None:
+    """A row whose cookies cannot be decoded is removed on load."""
+    store.save("user", COOKIES)
+    store._connect().execute(
+        "UPDATE sessions SET cookies = '{not json' WHERE input_id = 'user'"
+    )
+
+    assert store.load("user") is None
+    assert store.input_ids() == []
+
+
+def test_sessions_are_shared_between_stores(tmp_path: Path) -> None:
+    """Stores opened on the same file see each other's writes."""
+    path = tmp_path / "sessions.db"
+    first, second = SessionStore(path), SessionStore(path)
+    try:
+        first.save("user", COOKIES)
+        loaded = second.load("user")
+        assert loaded is not None
+        assert loaded["cookies"] == COOKIES
+        journal_mode = second._connect().execute("PRAGMA journal_mode")
+        assert journal_mode.fetchone()[0] == "wal"
+    finally:
+        first.close()
+        second.close()
+
+
+def test_threads_use_their_own_connections(store: SessionStore) -> None:
+    """Concurrent writes from several threads are all stored."""
+
+    def save(index: int) -> None:
+        for number in range(20):
+            store.save(f"user{index}", {"number": str(number)})
+
+    threads = [
+        threading.Thread(target=save, args=(index,)) for index in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.input_ids() == [f"user{index}" for index in range(4)]
+    for index in range(4):
+        loaded = store.load(f"user{index}")
+        assert loaded is not None
+        assert loaded["cookies"] == {"number": "19"}
+
+
+def test_auth_manager_uses_store(
+    store: SessionStore, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An AuthManager with a store keeps its cookies there, not in a file."""
+    auth = AuthManager("user@example.com", "password", store=store)
+    auth.cookie_path = tmp_path / "cookie.json"
+    monkeypatch.setattr(auth, "_verify_cookies", lambda cookies: True)
+    auth.save_cookies(json.dumps(COOKIES), expires_at=time.time() + 3600)
+
+    assert not auth.cookie_path.exists()
+    assert json.loads(auth.login() or "") == COOKIES
+    auth.mark_cookies_stale()
+    loaded = store.load("user@example.com")
+    assert loaded is not None
+    assert loaded["verified_at"] == 0
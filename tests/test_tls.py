@@ -0,0 +1,77 @@
+"""共有SSLContextとTLSAdapterのテスト."""
+
+import ssl
+from typing import Any
+
+import requests
+
+from works.tls import ResumingSSLContext, TLSAdapter, get_ssl_context
+
+URL = "https://example.invalid/path"
+
+
+def _pool(adapter: TLSAdapter, verify: Any, cert: Any = None) -> Any:
+    """requestsと同じ手順でリクエストの接続プールを取得します."""
+    request = requests.Request("GET", URL).prepare()
+    pool = adapter.get_connection_with_tls_context(request, verify, None, cert)
+    adapter.cert_verify(pool, URL, verify, cert)
+    return pool
+
+
+def test_shared_context_is_created_once() -> None:
+    """共有SSLContextは1つで、証明書とホスト名を検証すること."""
+    context = get_ssl_context()
+
+    assert get_ssl_context() is context
+    assert isinstance(context, ResumingSSLContext)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname
+    assert context.cert_store_stats()["x509_ca"] > 0
+
+
+def test_verify_true_uses_shared_context_without_ca_reload() -> None:
+    """verify=Trueでは共有SSLContextを使い、CAバンドルを渡さないこと."""
+    pool = _pool(TLSAdapter(), True)
+    conn = pool._new_conn()
+
+    assert conn.ssl_context is get_ssl_context()
+    assert conn.ca_certs is None
+    assert conn.ca_cert_dir is None
+
+
+def test_custom_verify_uses_own_context(tmp_path: Any) -> None:
+    """CAバンドルのパスを指定した場合は共有SSLContextを使わないこと."""
+    bundle = tmp_path / "ca.pem"
+    bundle.write_text("")
+    pool = _pool(TLSAdapter(), str(bundle))
+    conn = pool._new_conn()
+
+    assert conn.ssl_context is not get_ssl_context()
+    assert conn.ca_certs == str(bundle)
+
+
+def test_verify_false_uses_own_context() -> None:
+    """verify=Falseの場合は共有SSLContextの検証設定を変更しないこと."""
+    pool = _pool(TLSAdapter(), False)
+    conn = pool._new_conn()
+
+    assert conn.ssl_context is not get_ssl_context()
+    assert conn.cert_reqs == "CERT_NONE"
+    assert get_ssl_context().verify_mode == ssl.CERT_REQUIRED
+
+
+def test_client_certificate_uses_own_context(tmp_path: Any) -> None:
+    """クライアント証明書を指定した場合は共有SSLContextを使わないこと."""
+    cert = tmp_path / "client.pem"
+    cert.write_text("")
+    pool = _pool(TLSAdapter(), True, str(cert))
+
+    assert pool._new_conn().ssl_context is not get_ssl_context()
+
+
+def test_proxy_pools_use_shared_context() -> None:
+    """プロキシ経由の接続でも共有SSLContextを使うこと."""
+    adapter = TLSAdapter()
+    manager = adapter.proxy_manager_for("http://proxy.invalid:3128")
+
+    assert manager.connection_pool_kw["ssl_context"] is get_ssl_context()
@@ -0,0 +1,85 @@
+"""TopicTrieのテスト."""
+
+import pytest
+
+from works.mqtt.topic import TopicTrie, validate_topic_filter
+
+
+def _trie(*filters: str) -> "TopicTrie[str]":
+    """フィルタ自身を値として登録したTopicTrieを生成します."""
+    trie: TopicTrie[str] = TopicTrie()
+    for topic_filter in filters:
+        trie.add(topic_filter, topic_filter)
+    return trie
+
+
+def test_exact_match() -> None:
+    """ワイルドカードのないフィルタは同じトピックにのみ一致すること."""
+    trie = _trie("a/b")
+
+    assert trie.match("a/b") == ["a/b"]
+    assert trie.match("a") == []
+    assert trie.match("a/b/c") == []
+
+
+def test_single_level_wildcard() -> None:
+    """+は1階層にのみ一致すること."""
+    trie = _trie("a/+/c", "+")
+
+    assert trie.match("a/b/c") == ["a/+/c"]
+    assert trie.match("a/x/c") == ["a/+/c"]
+    assert trie.match("a/b/d") == []
+    assert trie.match("a/b/c/d") == []
+    assert trie.match("a") == ["+"]
+    # 空の階層も1階層として扱う
+    assert trie.match("a//c") == ["a/+/c"]
+
+
+def test_multi_level_wildcard() -> None:
+    """#は親の階層と、それ以下のすべての階層に一致すること."""
+    trie = _trie("a/#")
+
+    assert trie.match("a") == ["a/#"]
+    assert trie.match("a/b") == ["a/#"]
+    assert trie.match("a/b/c") == ["a/#"]
+    assert trie.match("b/a") == []
+
+
+def test_overlapping_filters() -> None:
+    """一致するすべてのフィルタの値が返されること."""
+    trie = _trie("a/b", "a/+", "a/#", "#", "+/b", "x/#")
+
+    assert sorted(trie.match("a/b")) == sorted(
+        ["a/b", "a/+", "a/#", "#", "+/b"]
+    )
+
+
+def test_dollar_topics_skip_leading_wildcards() -> None:
+    """$で始まるトピックは先頭のワイルドカードに一致しないこと."""
+    trie = _trie("#", "+/x", "$SYS/#", "$SYS/+")
+
+    assert sorted(trie.match("$SYS/x")) == ["$SYS/#", "$SYS/+"]
+    assert sorted(trie.match("a/x")) == ["#", "+/x"]
+
+
+def test_remove() -> None:
+    """削除したフィルタが一致しなくなること."""
+    trie: TopicTrie[str] = TopicTrie()
+    trie.add("a/+", "first")
+    trie.add("a/+", "second")
+
+    assert trie.remove("a/+", "first") is False
+    assert trie.match("a/b") == ["second"]
+    assert trie.remove("a/+", "second") is True
+    assert trie.match("a/b") == []
+    assert "a/+" not in trie
+    assert len(trie) == 0
+
+
+@pytest.mark.parametrize("topic_filter", ["a/#/b", "a/b#", "a+/b", ""])
+def test_invalid_filters(topic_filter: str) -> None:
+    """不正なトピックフィルタはValueErrorとなること."""
+    with pytest.raises(ValueError):
+        validate_topic_filter(topic_filter)
+    with pytest.raises(ValueError):
+        TopicTrie().add(topic_filter, "value")
@@ -4,14 +4,24 @@ This module provides authentication functionality for the Works platform,
 including cookie management and header generation for API requests.
 """
 
+import asyncio
+import contextlib
 import json
+import os
+import tempfile
+import threading
 import time
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 from requests.exceptions import RequestException
 
+from works.ratelimit import Priority, login_scheduler
+from works.session_store import SessionStore
+from works.tls import TLSAdapter
+
 
 class AuthManager:
     """Authentication manager for Works.
@@ -23,39 +33,86 @@ class AuthManager:
         input_id (str): User ID for authentication
         password (str): User password
         cookie_path (Path): Path to cookie storage file
+        store (Optional[SessionStore]): Shared session store used instead
+          of the cookie file when set
         session (requests.Session): HTTP session for requests
+        cookie_freshness (float): Seconds a verified cookie file is trusted
+          without another network verification
         _last_login_time (float): Timestamp of last login attempt
         _login_cooldown (float): Minimum time between login attempts
     """
 
-    def __init__(self, input_id: str, password: str) -> None:
+    def __init__(
+        self,
+        input_id: str,
+        password: str,
+        cookie_freshness: float = 3600,
+        store: Optional[SessionStore] = None,
+    ) -> None:
         """Initialize the AuthManager.
 
         Args:
             input_id (str): User ID for authentication
             password (str): User password
+            cookie_freshness (float): Seconds a verified cookie file is
+              trusted without verification. Defaults to 1 hour.
+            store (Optional[SessionStore]): Shared session store to keep
+              cookies in instead of a per-account file
         """
         self.input_id = input_id
         self.password = password
         self.cookie_path = Path("cookie.json")
+        self.store = store
+        self.cookie_freshness = cookie_freshness
         self.session = requests.Session()
+        self.session.mount("https://", TLSAdapter())
         self._last_login_time: float = 0
         self._login_cooldown: float = 300  # 5分のクールダウン
+        self._session_expires_at: Optional[float] = None
+
+    def save_cookies(
+        self,
+        cookies_json: str,
+        verified_at: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Save cookies to the session store or a JSON file.
 
-    def save_cookies(self, cookies_json: str) -> None:
-        """Save cookies to a JSON file.
+        The cookies are stored together with the time they were last
+        verified and the session expiry, if known. The file is replaced
+        atomically, so a crash never leaves a truncated cookie file.
 
         Args:
             cookies_json (str): JSON string of cookies to save
+            verified_at (Optional[float]): Time the cookies were verified.
+              Defaults to now.
+            expires_at (Optional[float]): Time the session expires
 
         Raises:
             OSError: If saving cookies fails
         """
+        envelope = {
+            "cookies": json.loads(cookies_json),
+            "verified_at": time.time() if verified_at is None else verified_at,
+            "expires_at": expires_at,
+        }
+        if self.store is not None:
+            self.store.save(self.input_id, **envelope)
+            return
+
+        tmp_path = None
         try:
             self.cookie_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cookie_path, "w", encoding="utf-8") as f:
-                f.write(cookies_json)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{self.cookie_path.name}.",
+                dir=self.cookie_path.parent,
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(envelope, indent=4, ensure_ascii=False))
+            os.replace(tmp_path, self.cookie_path)
         except OSError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
             raise OSError(
                 f"Failed to save cookies for {self.input_id}: {e}"
             ) from e
@@ -67,20 +124,80 @@ class AuthManager:
             Optional[str]: JSON string of cookies if file exists and valid,
               None otherwise
         """
-        try:
-            if self.cookie_path.exists():
-                with open(self.cookie_path, encoding="utf-8") as f:
-                    cookies_data = f.read()
-                    json.loads(cookies_data)  # Validate JSON format
-                    return cookies_data
+        envelope = self._load_cookie_envelope()
+        if envelope is None:
             return None
+        return json.dumps(envelope["cookies"], indent=4, ensure_ascii=False)
+
+    def _load_cookie_envelope(self) -> Optional[Dict[str, Any]]:
+        """Load the cookie file with its verification metadata.
+
+        Files written before metadata was recorded hold only the cookies
+        and are treated as never verified.
+
+        Returns:
+            Optional[Dict[str, Any]]: Dictionary with ``cookies``,
+              ``verified_at`` and ``expires_at``, or None if unavailable
+        """
+        if self.store is not None:
+            return self.store.load(self.input_id)
+
+        try:
+            if not self.cookie_path.exists():
+                return None
+            with open(self.cookie_path, encoding="utf-8") as f:
+                data = json.loads(f.read())
         except (OSError, json.JSONDecodeError):
             self._delete_cookie_file()
             return None
 
+        if not isinstance(data, dict):
+            self._delete_cookie_file()
+            return None
+        if not isinstance(data.get("cookies"), dict):
+            data = {"cookies": data, "verified_at": 0, "expires_at": None}
+        return data
+
+    def _is_fresh(self, envelope: Dict[str, Any]) -> bool:
+        """Check if cookies can be used without network verification.
+
+        Args:
+            envelope (Dict[str, Any]): Loaded cookie file
+
+        Returns:
+            bool: True if verified within the freshness window and not expired
+        """
+        now = time.time()
+        expires_at = envelope.get("expires_at")
+        if expires_at is not None and now >= expires_at:
+            return False
+        verified_at = envelope.get("verified_at") or 0
+        return now - verified_at < self.cookie_freshness
+
+    def mark_cookies_stale(self) -> None:
+        """Force verification of the stored cookies on the next login.
+
+        Called when a request is rejected with 401, so the next login
+        revalidates the cookies instead of trusting the freshness window.
+        """
+        if self.store is not None:
+            self.store.mark_stale(self.input_id)
+            return
+
+        envelope = self._load_cookie_envelope()
+        if envelope is None or not envelope.get("verified_at"):
+            return
+        self.save_cookies(
+            json.dumps(envelope["cookies"], ensure_ascii=False),
+            verified_at=0,
+            expires_at=envelope.get("expires_at"),
+        )
+
     def _delete_cookie_file(self) -> None:
-        """Delete the cookie file if it exists."""
-        if self.cookie_path.exists():
+        """Delete the stored cookies if they exist."""
+        if self.store is not None:
+            self.store.delete(self.input_id)
+        elif self.cookie_path.exists():
             self.cookie_path.unlink()
 
     def _can_login(self) -> bool:
@@ -95,9 +212,12 @@ class AuthManager:
             return True
         return False
 
-    def login(self) -> Optional[str]:
+    def login(self, priority: int = Priority.NORMAL) -> Optional[str]:
         """Log in to the service and return cookies as a JSON string.
 
+        Args:
+            priority (int): Priority in the process-wide login queue
+
         Returns:
             Optional[str]: JSON string containing authentication cookies
 
@@ -105,9 +225,20 @@ class AuthManager:
             Exception: If login fails or rate limit is exceeded
         """
         # Try to load existing cookies first
-        if existing_cookies := self.load_cookies():
+        if envelope := self._load_cookie_envelope():
+            existing_cookies = json.dumps(
+                envelope["cookies"], indent=4, ensure_ascii=False
+            )
+            self._session_expires_at = envelope.get("expires_at")
+            # Recently verified cookies are used without a network check
+            if self._is_fresh(envelope):
+                return existing_cookies
             try:
                 if self._verify_cookies(existing_cookies):
+                    self.save_cookies(
+                        existing_cookies,
+                        expires_at=envelope.get("expires_at"),
+                    )
                     return existing_cookies
             except Exception:
                 self._delete_cookie_file()
@@ -118,18 +249,84 @@ class AuthManager:
                 f"Please wait {self._login_cooldown} seconds."
             )
 
-        return self._perform_login()
+        return self._perform_login(priority)
+
+    def refresh(
+        self, priority: int = Priority.NORMAL, bypass_cooldown: bool = False
+    ) -> str:
+        """Renew the session with a fresh login, ignoring stored cookies.
+
+        Args:
+            priority (int): Priority in the process-wide login queue
+            bypass_cooldown (bool): Log in even within the login cooldown.
+              Used when the server has rejected the current session, so
+              there is no working session to fall back on.
+
+        Returns:
+            str: JSON string containing the new authentication cookies
+
+        Raises:
+            Exception: If login fails or rate limit is exceeded
+        """
+        if bypass_cooldown:
+            self._last_login_time = time.time()
+        elif not self._can_login():
+            raise Exception(
+                f"Login attempt too frequent for {self.input_id}. "
+                f"Please wait {self._login_cooldown} seconds."
+            )
+        return self._perform_login(priority)
+
+    @property
+    def session_expires_at(self) -> Optional[float]:
+        """Optional[float]: Time the current session expires, if known."""
+        return self._session_expires_at
+
+    async def async_login(
+        self, executor: Optional[Executor] = None
+    ) -> Optional[str]:
+        """Log in without blocking the event loop.
+
+        Runs the blocking login flow (cookie verification, loginProcessV2
+        and phone integration) in a worker thread. The flow is not
+        rewritten on aiohttp on purpose: it shares the requests cookie
+        handling, the cookie file or session store I/O and the login
+        scheduler with ``login()`` and ``refresh()``, and a second copy
+        would drift from it. Logins are rare, so a thread per login in
+        progress is cheap compared to the sends and receives that do
+        run on aiohttp.
+
+        Args:
+            executor (Optional[Executor]): Executor to run the login in.
+              Defaults to the event loop's default executor.
+
+        Returns:
+            Optional[str]: JSON string containing authentication cookies
+
+        Raises:
+            Exception: If login fails or rate limit is exceeded
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.login)
 
-    def _perform_login(self) -> str:
+    def _perform_login(self, priority: int = Priority.NORMAL) -> str:
         """Perform the actual login request.
 
+        Waits for admission from the process-wide login scheduler first, so
+        that many accounts logging in at once are spread out over time.
+
+        Args:
+            priority (int): Priority in the process-wide login queue
+
         Returns:
             str: JSON string containing authentication cookies
 
         Raises:
             Exception: If login fails
         """
+        login_scheduler().acquire_blocking(priority)
         headers = self._get_default_headers()
+        self._session_expires_at = None
 
         try:
             response = self._make_login_request(headers)
@@ -211,6 +408,8 @@ class AuthManager:
         for cookie in response.cookies:
             if cookie.value is not None:
                 cookies[cookie.name] = str(cookie.value)
+            if cookie.name == "WORKS_SES" and cookie.expires:
+                self._session_expires_at = float(cookie.expires)
         return cookies
 
     def _process_login_response(
@@ -307,7 +506,9 @@ class AuthManager:
             cookies_json = json.dumps(
                 all_cookies, indent=4, ensure_ascii=False
             )
-            self.save_cookies(cookies_json)
+            self.save_cookies(
+                cookies_json, expires_at=self._session_expires_at
+            )
             return cookies_json
         raise Exception("Login failed: Missing essential cookies")
 
@@ -368,19 +569,159 @@ class HeaderManager:
     Handles creation and management of headers including authentication cookies
     for API requests to the Works platform.
 
+    Consumers should read ``headers`` for every request rather than keep a
+    reference: a refresh replaces the whole dictionary in one assignment,
+    so readers see either the old or the new headers, never a mix.
+
     Attributes:
         auth_manager (AuthManager): Authentication manager instance
         headers (Dict[str, str]): Request headers
+        version (int): Incremented each time the headers are replaced
     """
 
-    def __init__(self, auth_manager: AuthManager) -> None:
+    def __init__(
+        self,
+        auth_manager: AuthManager,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
         """Initialize the HeaderManager.
 
         Args:
             auth_manager (AuthManager): Authentication manager instance
+            headers (Optional[Dict[str, str]]): Prebuilt headers. If omitted,
+              logs in synchronously to create them.
         """
         self.auth_manager = auth_manager
-        self.headers = self.create_headers()
+        self._headers = headers or self.create_headers()
+        self.version = 0
+        self._refresh_lock = threading.Lock()
+        self._reauth_task: Optional[asyncio.Future[None]] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Dict[str, str]: Current request headers."""
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: Dict[str, str]) -> None:
+        self._headers = headers
+        self.version += 1
+
+    async def async_refresh(
+        self,
+        executor: Optional[Executor] = None,
+        priority: int = Priority.NORMAL,
+    ) -> None:
+        """Renew the session and publish the new headers.
+
+        The blocking login runs in a worker thread. Requests already in
+        flight keep the headers they started with.
+
+        Args:
+            executor (Optional[Executor]): Executor to run the login in
+            priority (int): Priority in the process-wide login queue
+
+        Raises:
+            Exception: If login fails
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self._refresh, None, priority)
+
+    def reauthenticate(self, stale_version: int) -> bool:
+        """Log in again after a request was rejected as unauthorized.
+
+        Concurrent callers are coalesced: only the first caller for a given
+        headers version marks the stored cookies stale and logs in, and the
+        others wait for it and reuse the new headers. The login cooldown
+        does not apply, since the rejected session cannot be reused.
+
+        Args:
+            stale_version (int): ``version`` of the headers that were
+              rejected
+
+        Returns:
+            bool: True if fresh headers are available
+        """
+        try:
+            self._refresh(stale_version, Priority.HIGH)
+        except Exception:
+            return False
+        return True
+
+    async def async_reauthenticate(self, stale_version: int) -> bool:
+        """Log in again without blocking the event loop.
+
+        Like ``reauthenticate``, but all coroutines waiting on the same
+        stale headers share a single login running in a worker thread.
+
+        Args:
+            stale_version (int): ``version`` of the headers that were
+              rejected
+
+        Returns:
+            bool: True if fresh headers are available
+        """
+        if self.version != stale_version:
+            return True
+        task = self._reauth_task
+        if task is None or task.done():
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(
+                None, self._refresh, stale_version, Priority.HIGH
+            )
+            self._reauth_task = task
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            return False
+        return True
+
+    def _refresh(
+        self, stale_version: Optional[int], priority: int = Priority.NORMAL
+    ) -> None:
+        """Log in and replace the headers.
+
+        A ``stale_version`` means the server rejected those headers: the
+        stored cookies are marked stale and the login cooldown is bypassed.
+
+        Args:
+            stale_version (Optional[int]): Skip the login if the headers
+              have already been replaced since this version
+            priority (int): Priority in the process-wide login queue
+
+        Raises:
+            Exception: If login fails
+        """
+        with self._refresh_lock:
+            rejected = stale_version is not None
+            if rejected and self.version != stale_version:
+                return
+            if rejected:
+                self.auth_manager.mark_cookies_stale()
+            cookies_json = self.auth_manager.refresh(
+                priority, bypass_cooldown=rejected
+            )
+            self.headers = self._build_headers(self.auth_manager, cookies_json)
+
+    @classmethod
+    async def create(
+        cls, auth_manager: AuthManager, executor: Optional[Executor] = None
+    ) -> "HeaderManager":
+        """Create a HeaderManager without blocking the event loop.
+
+        Args:
+            auth_manager (AuthManager): Authentication manager instance
+            executor (Optional[Executor]): Executor to run the login in
+
+        Returns:
+            HeaderManager: HeaderManager with authenticated headers
+
+        Raises:
+            Exception: If login fails
+        """
+        cookies_json = await auth_manager.async_login(executor)
+        headers = cls._build_headers(auth_manager, cookies_json)
+        return cls(auth_manager, headers)
 
     def create_headers(self) -> Dict[str, str]:
         """Create headers with authentication cookies.
@@ -392,11 +733,28 @@ class HeaderManager:
         Raises:
             Exception: If login fails
         """
-        cookies_json = self.auth_manager.login()
+        return self._build_headers(
+            self.auth_manager, self.auth_manager.login()
+        )
+
+    @classmethod
+    def _build_headers(
+        cls, auth_manager: AuthManager, cookies_json: Optional[str]
+    ) -> Dict[str, str]:
+        """Build request headers from login cookies.
+
+        Args:
+            auth_manager (AuthManager): Authentication manager instance
+            cookies_json (Optional[str]): JSON string of cookies
+
+        Returns:
+            Dict[str, str]: Headers dictionary
+
+        Raises:
+            Exception: If no cookies were obtained
+        """
         if not cookies_json:
-            raise Exception(
-                f"Login failed for user {self.auth_manager.input_id}"
-            )
+            raise Exception(f"Login failed for user {auth_manager.input_id}")
 
         cookies_dict = json.loads(cookies_json)
         return {
@@ -411,7 +769,7 @@ class HeaderManager:
                 "AppleWebKit/537.36 (KHTML, like Gecko) "
                 "Chrome/124.0.0.0 Safari/537.36"
             ),
-            "Cookie": self.cookies_to_header(cookies_dict),
+            "Cookie": cls.cookies_to_header(cookies_dict),
         }
 
     @staticmethod
@@ -427,3 +785,93 @@ class HeaderManager:
         return "; ".join(
             f"{name}={value}" for name, value in cookies_dict.items()
         )
+
+
+class SessionRefresher:
+    """Renews the login session in the background before it expires.
+
+    When the session expiry is known, the refresh runs ``margin`` seconds
+    before it; otherwise it runs every ``interval`` seconds. New headers are
+    published through ``HeaderManager.headers``, so open WebSocket
+    connections and in-flight requests are left untouched.
+
+    Attributes:
+        header_manager (HeaderManager): Header manager to refresh
+        interval (float): Refresh interval when the expiry is unknown
+        margin (float): Seconds before expiry to refresh
+        retry_delay (float): Delay before retrying a failed refresh
+        failures (int): Consecutive failed refresh attempts
+    """
+
+    def __init__(
+        self,
+        header_manager: HeaderManager,
+        interval: float = 6 * 3600,
+        margin: float = 600,
+        retry_delay: float = 300,
+    ) -> None:
+        """Initialize the SessionRefresher.
+
+        Args:
+            header_manager (HeaderManager): Header manager to refresh
+            interval (float): Refresh interval in seconds when the session
+              expiry is unknown. Defaults to 6 hours.
+            margin (float): Seconds before expiry to refresh.
+              Defaults to 10 minutes.
+            retry_delay (float): Delay in seconds before retrying a failed
+              refresh. Defaults to the login cooldown of 5 minutes.
+        """
+        self.header_manager = header_manager
+        self.interval = interval
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.failures = 0
+        self._refreshed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start refreshing in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def next_delay(self) -> float:
+        """Return the number of seconds until the next refresh.
+
+        A session already inside the margin is refreshed immediately, but
+        only once; if the refreshed session still expires within the margin,
+        the next attempt waits ``retry_delay``.
+
+        Returns:
+            float: Delay in seconds
+        """
+        if self.failures:
+            return self.retry_delay
+        expires_at = self.header_manager.auth_manager.session_expires_at
+        if expires_at is None:
+            return self.interval
+        delay = expires_at - self.margin - time.time()
+        if delay > 0:
+            return delay
+        # A session that still expires within the margin right after a
+        # refresh would otherwise be refreshed again in a tight loop
+        return self.retry_delay if self._refreshed else 0.0
+
+    async def _run(self) -> None:
+        """Refresh the session until stopped."""
+        while True:
+            await asyncio.sleep(self.next_delay())
+            try:
+                await self.header_manager.async_refresh(priority=Priority.LOW)
+                self.failures = 0
+                self._refreshed = True
+            except Exception:
+                self.failures += 1
@@ -0,0 +1,229 @@
+"""Broadcast module.
+
+Sends one message to many channels with bounded concurrency, streaming
+per-channel results as they complete and keeping aggregate statistics.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Optional,
+    Set,
+    Union,
+)
+
+Channels = Union[Iterable[str], AsyncIterable[str]]
+ChannelSender = Callable[[str], Awaitable[Dict[str, str]]]
+
+
+@dataclass
+class BroadcastResult:
+    """Result of sending to a single channel.
+
+    Attributes:
+        channel_no (str): Destination channel
+        result (Dict[str, str]): Send result in ``MessageSender`` format
+        elapsed (float): Seconds from dispatch until the send completed
+    """
+
+    channel_no: str
+    result: Dict[str, str]
+    elapsed: float
+
+    @property
+    def success(self) -> bool:
+        """bool: Whether the send succeeded."""
+        return self.result.get("success") == str(True)
+
+
+@dataclass
+class BroadcastStats:
+    """Aggregate statistics of a Broadcast.
+
+    Attributes:
+        dispatched (int): Number of sends started
+        succeeded (int): Number of successful sends
+        failed (int): Number of failed sends
+        failures_by_status (Dict[str, int]): Failed sends per status code
+        started_at (Optional[float]): Monotonic time the broadcast started
+        finished_at (Optional[float]): Monotonic time the broadcast ended
+    """
+
+    dispatched: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    failures_by_status: Dict[str, int] = field(default_factory=dict)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def completed(self) -> int:
+        """int: Number of finished sends."""
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        """float: Seconds since the start, or the total duration."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at
+        return (end if end is not None else time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """float: Completed sends per second."""
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        """float: Ratio of failed sends to completed sends."""
+        return self.failed / self.completed if self.completed else 0.0
+
+    def record(self, result: BroadcastResult) -> None:
+        """Record a finished send.
+
+        Args:
+            result (BroadcastResult): Result of the send
+        """
+        if result.success:
+            self.succeeded += 1
+            return
+        self.failed += 1
+        status = result.result.get("status_code", "")
+        self.failures_by_status[status] = (
+            self.failures_by_status.get(status, 0) + 1
+        )
+
+
+class Broadcast:
+    """Fan-out of one send over many channels.
+
+    Iterate with ``async for`` to receive a BroadcastResult per channel
+    in completion order, or await the broadcast to run it to the end and
+    get the BroadcastStats. Channels are pulled lazily from the source,
+    so large or unbounded async iterables are not loaded into memory.
+    Stopping the iteration early cancels the sends still in progress.
+
+    A broadcast runs once; iterating or awaiting it again raises
+    RuntimeError.
+
+    Attributes:
+        concurrency (int): Maximum number of sends in progress
+        stats (BroadcastStats): Aggregate statistics, updated live
+    """
+
+    def __init__(
+        self,
+        send: ChannelSender,
+        channels: Channels,
+        concurrency: int = 32,
+    ) -> None:
+        """Initialize the Broadcast.
+
+        Args:
+            send (ChannelSender): Sends the message to one channel
+            channels (Channels): Destination channels
+            concurrency (int): Maximum number of sends in progress
+
+        Raises:
+            ValueError: If concurrency is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.stats = BroadcastStats()
+        self._send = send
+        self._channels = channels
+        self._started = False
+
+    def __aiter__(self) -> AsyncIterator[BroadcastResult]:
+        """Start the broadcast and iterate over per-channel results."""
+        if self._started:
+            raise RuntimeError("Broadcast has already been started")
+        self._started = True
+        return self._run()
+
+    def __await__(self) -> Generator[None, None, BroadcastStats]:
+        """Run the broadcast to the end and return its statistics."""
+        return self.wait().__await__()
+
+    async def wait(self) -> BroadcastStats:
+        """Run the broadcast to the end.
+
+        Returns:
+            BroadcastStats: Aggregate statistics
+        """
+        async for _ in self:
+            pass
+        return self.stats
+
+    async def _run(self) -> AsyncIterator[BroadcastResult]:
+        """Send to every channel and yield results as they complete."""
+        stats = self.stats
+        stats.started_at = time.monotonic()
+        channels = self._iter_channels()
+        pending: Set[asyncio.Task[BroadcastResult]] = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.concurrency:
+                    try:
+                        channel_no = await channels.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    stats.dispatched += 1
+                    pending.add(
+                        asyncio.create_task(self._send_one(str(channel_no)))
+                    )
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    stats.record(result)
+                    yield result
+        finally:
+            stats.finished_at = time.monotonic()
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _iter_channels(self) -> AsyncIterator[str]:
+        """Iterate over the channel source, sync or async."""
+        if isinstance(self._channels, AsyncIterable):
+            async for channel_no in self._channels:
+                yield channel_no
+        else:
+            for channel_no in self._channels:
+                yield channel_no
+
+    async def _send_one(self, channel_no: str) -> BroadcastResult:
+        """Send to one channel, turning errors into a failed result."""
+        started = time.monotonic()
+        try:
+            result = await self._send(channel_no)
+        except Exception as e:
+            result = self._error_result(e)
+        return BroadcastResult(channel_no, result, time.monotonic() - started)
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, str]:
+        """Create a failed send result from an exception."""
+        return {
+            "success": "false",
+            "status_code": "500",
+            "message": f"Request failed: {str(error)}",
+        }
@@ -1,18 +1,41 @@
 """Works client class."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import AsyncGenerator, Dict, Optional, Tuple
+from types import TracebackType
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-from works.auth import AuthManager, HeaderManager
+from works.auth import AuthManager, HeaderManager, SessionRefresher
+from works.broadcast import Broadcast, Channels
 from works.message_handler import MessageResult, receive_messages
-from works.message_sender import MessageSender
+from works.message_sender import MessageSender, new_temp_message_id
+from works.mqtt import Notification
+from works.mqtt.client import GapFetcher, ReconnectHandler
+from works.ratelimit import Priority
+from works.send_queue import SendQueue
+from works.session_store import SessionStore
 
 
 class Works:
     """Works client class."""
 
     def __init__(
-        self, input_id: str, password: str, cookie_path: Optional[Path] = None
+        self,
+        input_id: str,
+        password: str,
+        cookie_path: Optional[Path] = None,
+        store: Optional[SessionStore] = None,
     ) -> None:
         """Initialize Works client.
 
@@ -21,20 +44,168 @@ class Works:
             password (str): Password for login
             cookie_path (Optional[Path]): Path to save/load cookies.
             Defaults to None.
+            store (Optional[SessionStore]): Shared session store used
+            instead of cookie files. Defaults to None.
         """
-        self.auth_manager = AuthManager(input_id, password)
-        if cookie_path:
+        self.auth_manager = self._create_auth_manager(
+            input_id, password, cookie_path, store
+        )
+        self._bind(HeaderManager(self.auth_manager))
+
+    @classmethod
+    async def create(
+        cls,
+        input_id: str,
+        password: str,
+        cookie_path: Optional[Path] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        store: Optional[SessionStore] = None,
+    ) -> "Works":
+        """Create a Works client without blocking the event loop.
+
+        The login runs in a worker thread, so other accounts and
+        connections keep running while it completes.
+
+        Args:
+            input_id (str): User ID for login
+            password (str): Password for login
+            cookie_path (Optional[Path]): Path to save/load cookies.
+            Defaults to None.
+            executor (Optional[ThreadPoolExecutor]): Executor to run the
+            login in. Defaults to the event loop's default executor.
+            store (Optional[SessionStore]): Shared session store used
+            instead of cookie files. Defaults to None.
+
+        Returns:
+            Works: Logged-in Works client
+
+        Raises:
+            Exception: If login fails
+        """
+        self = cls.__new__(cls)
+        self.auth_manager = cls._create_auth_manager(
+            input_id, password, cookie_path, store
+        )
+        self._bind(await HeaderManager.create(self.auth_manager, executor))
+        return self
+
+    @classmethod
+    async def create_many(
+        cls,
+        accounts: Iterable[Tuple[str, str]],
+        cookie_path: Optional[Path] = None,
+        concurrency: int = 32,
+        store: Optional[SessionStore] = None,
+    ) -> List[Union["Works", BaseException]]:
+        """Log in many accounts in parallel with bounded concurrency.
+
+        Args:
+            accounts (Iterable[Tuple[str, str]]): Pairs of user ID and
+            password
+            cookie_path (Optional[Path]): Path to save/load cookies.
+            Defaults to None.
+            concurrency (int): Maximum number of simultaneous logins.
+            Defaults to 32.
+            store (Optional[SessionStore]): Shared session store used
+            instead of cookie files. Defaults to None.
+
+        Returns:
+            List[Union[Works, BaseException]]: Clients in the order of
+            ``accounts``, or the exception raised for a failed login
+        """
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="works-login"
+        ) as executor:
+            results = await asyncio.gather(
+                *(
+                    cls.create(
+                        input_id, password, cookie_path, executor, store
+                    )
+                    for input_id, password in accounts
+                ),
+                return_exceptions=True,
+            )
+        return list(results)
+
+    @classmethod
+    def _create_auth_manager(
+        cls,
+        input_id: str,
+        password: str,
+        cookie_path: Optional[Path],
+        store: Optional[SessionStore] = None,
+    ) -> AuthManager:
+        """Create an AuthManager with the per-account cookie storage.
+
+        With a session store no cookie files are created or cleaned up.
+
+        Args:
+            input_id (str): User ID for login
+            password (str): Password for login
+            cookie_path (Optional[Path]): Directory to save/load cookies
+            store (Optional[SessionStore]): Shared session store
+
+        Returns:
+            AuthManager: Authentication manager (not logged in yet)
+        """
+        auth_manager = AuthManager(input_id, password, store=store)
+        if cookie_path and store is None:
             cookie_file = f"cookie_{input_id}.json"
             cookie_path = cookie_path / cookie_file
             cookie_path.parent.mkdir(parents=True, exist_ok=True)
-            self.auth_manager.cookie_path = cookie_path.resolve()
-            self._cleanup_old_cookie(input_id)
+            auth_manager.cookie_path = cookie_path.resolve()
+            cls._cleanup_old_cookie(input_id)
+        return auth_manager
 
-        self.header_manager = HeaderManager(self.auth_manager)
-        self.headers = self.header_manager.headers
+    def _bind(self, header_manager: HeaderManager) -> None:
+        """Attach authenticated headers and the clients that use them.
+
+        Args:
+            header_manager (HeaderManager): Authenticated header manager
+        """
+        self.header_manager = header_manager
         self.message_sender = MessageSender(self.header_manager)
+        self.send_queue = SendQueue()
+        self.session_refresher = SessionRefresher(self.header_manager)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Dict[str, str]: Current request headers."""
+        return self.header_manager.headers
+
+    def start_session_refresh(self) -> None:
+        """Renew the login session in the background before it expires.
+
+        Must be called from a running event loop. The new headers are
+        picked up by message sending and by the next WebSocket reconnect.
+        """
+        self.session_refresher.start()
+
+    async def stop_session_refresh(self) -> None:
+        """Stop the background session renewal."""
+        await self.session_refresher.stop()
+
+    async def close(self) -> None:
+        """Stop renewal, drain queued sends and close HTTP connections."""
+        await self.stop_session_refresh()
+        await self.send_queue.close()
+        await self.message_sender.close()
+
+    async def __aenter__(self) -> "Works":
+        """Use the client as an async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        """Close the client on exit."""
+        await self.close()
 
-    def _cleanup_old_cookie(self, input_id: str) -> Tuple[bool, Optional[str]]:
+    @staticmethod
+    def _cleanup_old_cookie(input_id: str) -> Tuple[bool, Optional[str]]:
         """Clean up old cookie file if exists.
 
         Args:
@@ -72,10 +243,70 @@ class Works:
         domain_id: str,
         user_no: str,
         temp_message_id: str,
+        priority: int = Priority.NORMAL,
     ) -> Dict[str, str]:
-        """Send a message to a specified group (Async version)."""
-        return await self.message_sender.async_send_message(
-            group_id, message, domain_id, user_no, temp_message_id
+        """Send a message to a specified group (Async version).
+
+        The send goes through ``send_queue``, which rate limits it per
+        channel and per account. Use ``Priority.HIGH`` for interactive
+        replies and ``Priority.LOW`` for bulk notices.
+        """
+        return await self.send_queue.send(
+            group_id,
+            lambda: self.message_sender.async_send_message(
+                group_id, message, domain_id, user_no, temp_message_id
+            ),
+            priority,
+        )
+
+    def broadcast(
+        self,
+        channels: Channels,
+        message: str,
+        domain_id: str,
+        user_no: str,
+        make_temp_message_id: Optional[Callable[[str], str]] = None,
+        concurrency: int = 32,
+        priority: int = Priority.LOW,
+    ) -> Broadcast:
+        """Send a message to many channels.
+
+        Sends go through ``send_queue`` at the given priority, so they
+        share its rate limits and yield to interactive sends.
+
+        Example:
+            async for result in client.broadcast(channels, "hi", ...):
+                ...
+            # or: stats = await client.broadcast(channels, "hi", ...)
+
+        Args:
+            channels (Channels): Channel numbers, sync or async iterable
+            message (str): Message to send
+            domain_id (str): Domain ID
+            user_no (str): User number
+            make_temp_message_id (Optional[Callable[[str], str]]): Returns
+            a new temporary message ID for a channel number. Called once
+            per channel. Defaults to ``new_temp_message_id``.
+            concurrency (int): Maximum number of sends in progress.
+            Defaults to 32.
+            priority (int): Send priority. Defaults to Priority.LOW.
+
+        Returns:
+            Broadcast: Async iterable of per-channel results, awaitable
+            for the aggregate statistics
+        """
+        new_id = make_temp_message_id or (lambda _: new_temp_message_id())
+        return Broadcast(
+            lambda channel_no: self.async_send_message(
+                channel_no,
+                message,
+                domain_id,
+                user_no,
+                new_id(channel_no),
+                priority=priority,
+            ),
+            channels,
+            concurrency,
         )
 
     async def send_sticker(
@@ -88,17 +319,22 @@ class Works:
         package_id: str = "18832978",
         sticker_id: str = "485404830",
         stk_opt: str = "",
+        priority: int = Priority.NORMAL,
     ) -> Dict[str, str]:
         """Send a sticker to a specified group."""
-        return await self.message_sender.async_send_sticker(
+        return await self.send_queue.send(
             group_id,
-            domain_id,
-            user_no,
-            temp_message_id,
-            stk_type,
-            package_id,
-            sticker_id,
-            stk_opt,
+            lambda: self.message_sender.async_send_sticker(
+                group_id,
+                domain_id,
+                user_no,
+                temp_message_id,
+                stk_type,
+                package_id,
+                sticker_id,
+                stk_opt,
+            ),
+            priority,
         )
 
     async def send_custom_log(
@@ -110,16 +346,21 @@ class Works:
         user_no: str,
         temp_message_id: str,
         button_url: str = "https://github.com/nezumi0627",
+        priority: int = Priority.NORMAL,
     ) -> Dict[str, str]:
         """Send a custom log message with a button."""
-        return await self.message_sender.async_send_custom_log(
+        return await self.send_queue.send(
             group_id,
-            message,
-            button_message,
-            domain_id,
-            user_no,
-            temp_message_id,
-            button_url,
+            lambda: self.message_sender.async_send_custom_log(
+                group_id,
+                message,
+                button_message,
+                domain_id,
+                user_no,
+                temp_message_id,
+                button_url,
+            ),
+            priority,
         )
 
     async def send_add_log(
@@ -133,18 +374,23 @@ class Works:
         desc: str = "Nezumi-Project2024",
         lang: str = "ja",
         photo_hash: str = "779911d9ab14b9caaec3fd44197a1adc",
+        priority: int = Priority.NORMAL,
     ) -> Dict[str, str]:
         """Send an additional log message."""
-        return await self.message_sender.async_send_add_log(
+        return await self.send_queue.send(
             group_id,
-            input_id,
-            domain_id,
-            user_no,
-            temp_message_id,
-            user_name,
-            desc,
-            lang,
-            photo_hash,
+            lambda: self.message_sender.async_send_add_log(
+                group_id,
+                input_id,
+                domain_id,
+                user_no,
+                temp_message_id,
+                user_name,
+                desc,
+                lang,
+                photo_hash,
+            ),
+            priority,
         )
 
     async def receive_messages(
@@ -153,13 +399,25 @@ class Works:
         user_no: str,
         polling_interval: int = 5,
         stop_condition: Optional[str] = None,
-    ) -> AsyncGenerator[Tuple[MessageResult, Optional[Dict]], None]:
-        """Receive messages from Works using WebSocket."""
+        gap_fetcher: Optional[GapFetcher] = None,
+        on_reconnect: Optional[ReconnectHandler] = None,
+    ) -> AsyncGenerator[Tuple[MessageResult, Optional[Notification]], None]:
+        """Receive messages from Works using WebSocket.
+
+        Messages sent through this client are not reported as gaps.
+        Gaps in messageNo are always detected and counted; pass
+        ``gap_fetcher`` to fetch the missing range of a channel.
+        ``on_reconnect`` is awaited with the DowntimeWindow of
+        every reconnect, e.g. to catch up on what was missed meanwhile.
+        """
         async for result in receive_messages(
             self.header_manager,
             domain_id,
             user_no,
             polling_interval,
             stop_condition,
+            gap_fetcher,
+            self.message_sender,
+            on_reconnect,
         ):
             yield result
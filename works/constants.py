@@ -2,7 +2,7 @@
 
 import logging
 from enum import Enum, IntEnum, unique
-from typing import Final
+from typing import Final, Optional
 
 
 @unique
@@ -69,10 +69,29 @@ class WebSocket:
     SUBPROTOCOL: Final[str] = "mqtt"
     PING_INTERVAL: Final[int] = 30  # PING送信間隔（秒）
     PING_TIMEOUT: Final[int] = 10  # PING応答待機タイムアウト（秒）
+    PING_INTERVAL_MIN: Final[int] = 10  # PING送信間隔の下限（秒）
     RETRY_INTERVAL: Final[int] = 5  # 再接続間隔（秒）
-    MAX_RETRIES: Final[int] = 3  # 最大再接続試行回数
+    MAX_RETRY_INTERVAL: Final[int] = 300  # 再接続間隔の上限（秒）
+    MAX_RETRIES: Final[Optional[int]] = None  # 最大再接続回数（Noneは無制限）
+    MIN_STABLE_UPTIME: Final[int] = 30  # 接続成功とみなす接続継続時間（秒）
     KEEP_ALIVE: Final[int] = 50  # キープアライブ時間（秒）
     PROTOCOL_VERSION: Final[int] = 4  # MQTTプロトコルバージョン
+    QOS: Final[int] = 1  # 購読時のQoSレベル
+    MAX_INFLIGHT: Final[int] = 32  # 確認応答待ちの最大メッセージ数
+    ACK_TIMEOUT: Final[int] = 10  # PUBACK/SUBACK待機タイムアウト（秒）
+
+
+class RateLimit:
+    """ログイン・接続・メッセージ送信の流量制限の定数."""
+
+    LOGIN_RATE: Final[float] = 2.0  # 1秒あたりのログイン数
+    LOGIN_BURST: Final[int] = 5  # 連続して許可するログイン数
+    CONNECT_RATE: Final[float] = 10.0  # 1秒あたりのWebSocket接続数
+    CONNECT_BURST: Final[int] = 20  # 連続して許可する接続数
+    SEND_CHANNEL_RATE: Final[float] = 1.0  # チャンネルごとの1秒あたりの送信数
+    SEND_CHANNEL_BURST: Final[int] = 5  # チャンネルごとの連続送信の上限
+    SEND_ACCOUNT_RATE: Final[float] = 20.0  # アカウントごとの1秒あたりの送信数
+    SEND_ACCOUNT_BURST: Final[int] = 40  # アカウントごとの連続送信の上限
 
 
 class Logging:
@@ -32,8 +32,7 @@ def initialize_db(db_path: str) -> Optional[str]:
         return None
 
     except sqlite3.Error as e:
-        error_msg = f"データベース初期化中にエラーが発生: {str(e)}"
-        return error_msg
+        return f"データベース初期化中にエラーが発生: {str(e)}"
 
     finally:
         if conn:
@@ -1,14 +1,16 @@
 """Works message handler module."""
 
 from dataclasses import dataclass
-from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+from typing import AsyncGenerator, Dict, Optional, Tuple
 
 from works.auth import HeaderManager
 from works.constants import WebSocket
-from works.mqtt import connect_websocket
+from works.message_sender import MessageSender
+from works.mqtt import Notification, connect_websocket
+from works.mqtt.client import GapFetcher, ReconnectHandler
 
 
-@dataclass
+@dataclass(frozen=True)
 class MessageResult:
     """メッセージ処理の結果を表すデータクラス.
 
@@ -23,13 +25,21 @@ class MessageResult:
     data: Optional[Dict] = None
 
 
+# 受信のたびに生成しないよう共有する結果
+_RECEIVED = MessageResult(True, "Message received")
+_CONNECTION_ERROR = MessageResult(False, "Connection error")
+
+
 async def receive_messages(
     header_manager: HeaderManager,
     domain_id: str,
     user_no: str,
     polling_interval: int = WebSocket.RETRY_INTERVAL,
     stop_condition: Optional[str] = None,
-) -> AsyncGenerator[Tuple[MessageResult, Optional[Dict[str, Any]]], None]:
+    gap_fetcher: Optional[GapFetcher] = None,
+    message_sender: Optional[MessageSender] = None,
+    on_reconnect: Optional[ReconnectHandler] = None,
+) -> AsyncGenerator[Tuple[MessageResult, Optional[Notification]], None]:
     """WebSocket経由でWorksのメッセージを受信する.
 
     Args:
@@ -37,26 +47,40 @@ async def receive_messages(
         domain_id: ドメインID
         user_no: ユーザー番号
         polling_interval: 再接続間隔（秒）
-        stop_condition: 停止条件となるメッセージ内容
+        stop_condition: 停止条件となるメッセージ内容。通知の本文
+            (loc-args1、Notification.content)と完全に一致した場合に停止する
+        gap_fetcher: messageNoの欠落を補完する関数。チャンネル番号と
+            欠落範囲の最初と最後のメッセージ番号を受け取る。省略時は
+            欠落を検出して統計に記録するのみ
+        message_sender: 送信に使うクライアント。渡すと自分の送信分を
+            欠落として扱わない
+        on_reconnect: 再接続のたびに切断されていた期間
+            (DowntimeWindow)を受け取る非同期関数。切断中に
+            取りこぼしたメッセージの補完に使用する
 
     Yields:
-        Tuple[MessageResult, Optional[Dict[str, Any]]]: 処理結果とメッセージデータ
+        Tuple[MessageResult, Optional[Notification]]: 処理結果と通知
     """
+    sequences = message_sender.sequences if message_sender else None
     try:
         async for success, message_data in connect_websocket(
-            header_manager, domain_id, user_no, polling_interval
+            header_manager,
+            domain_id,
+            user_no,
+            polling_interval,
+            gap_fetcher,
+            sequences,
+            on_reconnect,
         ):
             if not success:
-                yield MessageResult(False, "Connection error"), None
+                yield _CONNECTION_ERROR, None
                 continue
 
-            if message_data:
-                yield MessageResult(True, "Message received"), message_data
+            if message_data is not None:
+                yield _RECEIVED, message_data
 
-                if (
-                    stop_condition
-                    and message_data.get("content") == stop_condition
-                ):
+                # 通知に"content"キーはないため、本文(loc-args1)と比較する
+                if stop_condition and message_data.content == stop_condition:
                     yield (
                         MessageResult(
                             True, f"Polling stopped: {stop_condition}"
@@ -1,27 +1,207 @@
 """LINE WORKS メッセージ送信モジュール."""
 
+import asyncio
 import json
-from typing import Dict
+import threading
+import time
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+from types import TracebackType
+from typing import Dict, Optional, Tuple, Type
 
 import aiohttp
 import requests
 from aiohttp import ClientTimeout
+from urllib3.util.retry import Retry
 
 from works.auth import HeaderManager
 from works.constants import ApiEndpoint, MessageType, ServiceId
+from works.mqtt.sequence import SequenceTracker
+from works.tls import TLSAdapter, get_ssl_context
+
+# 再ログインして再送信する認証エラーのステータスコード
+# (403は権限の不足で、再ログインしても解消しないため含めない)
+AUTH_ERROR_STATUS = 401
+
+_last_temp_message_id = 0
+_temp_message_id_lock = threading.Lock()
+
+
+def new_temp_message_id() -> str:
+    """一時メッセージIDを生成する.
+
+    マイクロ秒単位の時刻をもとに、プロセス内で単調増加する数字の
+    文字列を返す。送信ごとに異なるIDが必要な場合に使用する。
+
+    Returns:
+        str: 一時メッセージID
+    """
+    global _last_temp_message_id
+    with _temp_message_id_lock:
+        _last_temp_message_id = max(
+            _last_temp_message_id + 1, time.time_ns() // 1000
+        )
+        return str(_last_temp_message_id)
+
+
+@dataclass
+class SenderConfig:
+    """メッセージ送信の接続設定."""
+
+    timeout: float = 30  # リクエスト全体のタイムアウト（秒）
+    pool_limit: int = 100  # 非同期送信の最大同時接続数
+    pool_limit_per_host: int = 20  # 非同期送信のホストごとの最大接続数
+    keepalive_timeout: float = 60  # 未使用の接続を保持する秒数
+    dns_ttl: int = 300  # DNSの解決結果をキャッシュする秒数
+    pool_connections: int = 10  # 同期送信で接続プールを保持するホスト数
+    pool_maxsize: int = 32  # 同期送信のホストごとに保持する接続数
+    max_retries: int = 3  # 同期送信の再試行回数
+    retry_backoff: float = 0.5  # 再試行の待機時間の基準（秒）
+    retry_statuses: Tuple[int, ...] = (429, 503)  # 再試行するステータス
 
 
 class MessageSender:
-    """メッセージ送信を管理するクラス."""
+    """メッセージ送信を管理するクラス.
+
+    非同期送信は接続プールを持つaiohttpのセッションを、同期送信は
+    接続プールを持つrequestsのセッションを再利用する。同期送信は
+    複数のスレッドから同時に呼び出せる。
+    使用後はclose()を呼ぶか、async withで使用する。
+
+    送信に成功したメッセージの番号はsequencesに記録される。受信側に
+    同じトラッカーを渡すと、自分の送信分が欠落として検出されない。
+    """
 
-    def __init__(self, header_manager: HeaderManager) -> None:
+    def __init__(
+        self,
+        header_manager: HeaderManager,
+        config: Optional[SenderConfig] = None,
+    ) -> None:
         """MessageSenderを初期化する.
 
         Args:
             header_manager (HeaderManager):認証済みヘッダー情報を管理する
+            config (Optional[SenderConfig]): 接続設定
         """
         self.header_manager = header_manager
-        self.headers = self.header_manager.headers
+        self.config = config or SenderConfig()
+        self._session = self._create_session()
+        self._client_session: Optional[aiohttp.ClientSession] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sequences = SequenceTracker()
+
+    async def __aenter__(self) -> "MessageSender":
+        """非同期コンテキストマネージャーとして使用する."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        """接続を閉じる."""
+        await self.close()
+
+    async def close(self) -> None:
+        """保持している接続をすべて閉じる.
+
+        非同期送信の接続はイベントループに属するため、ループを
+        終了する前に呼び出す。
+        """
+        if self._client_loop is asyncio.get_running_loop():
+            session, self._client_session = self._client_session, None
+            self._client_loop = None
+            if session is not None and not session.closed:
+                await session.close()
+        else:
+            self._discard_client_session()
+        self._session.close()
+
+    def _create_session(self) -> requests.Session:
+        """同期送信用の接続プールを持つセッションを作成する.
+
+        再試行は送信前の接続エラーと、サーバーが処理しなかったことを
+        示すステータス(429/503)に限る。送信後の読み取りエラーは
+        二重送信を避けるため再試行しない。
+        認証はヘッダーで渡すため、レスポンスのCookieは保存しない。
+        これによりセッションを複数のスレッドで共有できる。
+
+        Returns:
+            requests.Session: 送信に使用するセッション
+        """
+        retry = Retry(
+            total=self.config.max_retries,
+            connect=self.config.max_retries,
+            read=0,
+            status=self.config.max_retries,
+            other=0,
+            allowed_methods=frozenset({"POST"}),
+            status_forcelist=self.config.retry_statuses,
+            backoff_factor=self.config.retry_backoff,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = TLSAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_client_session(self) -> aiohttp.ClientSession:
+        """接続プールを持つaiohttpのセッションを取得する.
+
+        最初の非同期送信で作成し、以降は同じセッションを再利用する。
+        送信以外のAPI呼び出しもこのセッションを使うことで接続を共有できる。
+        別のイベントループから呼ばれた場合は、元のループのセッションを
+        閉じてから、そのループ用に作り直す。
+
+        Returns:
+            aiohttp.ClientSession: 送信に使用するセッション
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not loop:
+            self._discard_client_session()
+        session = self._client_session
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.pool_limit,
+                limit_per_host=self.config.pool_limit_per_host,
+                keepalive_timeout=self.config.keepalive_timeout,
+                ttl_dns_cache=self.config.dns_ttl,
+                ssl=get_ssl_context(),
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=ClientTimeout(total=self.config.timeout),
+            )
+            self._client_session = session
+            self._client_loop = loop
+        return session
+
+    def _discard_client_session(self) -> None:
+        """別のイベントループのaiohttpのセッションを手放す.
+
+        セッションは作成したループでしか閉じられないため、そのループに
+        closeを依頼する。ループが既に閉じている場合は接続も使えない
+        ため、参照を外すだけにする。
+        """
+        session, self._client_session = self._client_session, None
+        loop, self._client_loop = self._client_loop, None
+        if session is None or session.closed or loop is None:
+            return
+        if not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """現在の認証ヘッダー(セッション更新後は新しいヘッダー)."""
+        return self.header_manager.headers
 
     def send_message(
         self,
@@ -177,6 +357,9 @@ class MessageSender:
     def _post_request(self, endpoint: str, payload: Dict) -> Dict[str, str]:
         """POSTリクエストを送信する（同期版）.
 
+        認証エラー(401)の場合は再ログインし、1回だけ再送信する。
+        同時に失敗した送信の再ログインは1回にまとめられる。
+
         Args:
             endpoint (str): APIエンドポイント
             payload (Dict): 送信するデータ
@@ -185,21 +368,21 @@ class MessageSender:
             Dict[str, str]: レスポンス結果
         """
         try:
-            response = requests.post(
-                f"{ApiEndpoint.BASE_URL}{endpoint}",
-                headers=self.headers,
-                json=payload,
-                timeout=30,
-            )
-            return {
-                "success": str(response.status_code == 200),
-                "status_code": str(response.status_code),
-                "message": (
-                    "Success"
-                    if response.status_code == 200
-                    else f"Failed with status code: {response.status_code}"
-                ),
-            }
+            for attempt in range(2):
+                version = self.header_manager.version
+                response = self._session.post(
+                    f"{ApiEndpoint.BASE_URL}{endpoint}",
+                    headers=self.headers,
+                    json=payload,
+                    timeout=self.config.timeout,
+                )
+                status = response.status_code
+                if status != AUTH_ERROR_STATUS or attempt:
+                    break
+                if not self.header_manager.reauthenticate(version):
+                    break
+            self._record_sent(payload, status, response.content)
+            return self._status_result(status)
         except Exception as e:
             return {
                 "success": "false",
@@ -212,6 +395,9 @@ class MessageSender:
     ) -> Dict[str, str]:
         """POSTリクエストを送信する（非同期版）.
 
+        認証エラー(401)の場合は再ログインを待って1回だけ再送信する。
+        同時に失敗した送信の再ログインは1回にまとめられる。
+
         Args:
             endpoint (str): APIエンドポイント
             payload (Dict): 送信するデータ
@@ -219,29 +405,67 @@ class MessageSender:
         Returns:
             Dict[str, str]: レスポンス結果
         """
-        timeout = ClientTimeout(total=30)
         try:
-            async with (
-                aiohttp.ClientSession(timeout=timeout) as session,
-                session.post(
+            session = self.get_client_session()
+            for attempt in range(2):
+                version = self.header_manager.version
+                async with session.post(
                     f"{ApiEndpoint.BASE_URL}{endpoint}",
                     headers=self.headers,
                     json=payload,
-                ) as response,
-            ):
-                status = response.status
-                return {
-                    "success": str(status == 200),
-                    "status_code": str(status),
-                    "message": (
-                        "Success"
-                        if status == 200
-                        else f"Failed with status code: {status}"
-                    ),
-                }
+                ) as response:
+                    status = response.status
+                    body = await response.read()  # 接続をプールに戻す
+                if status != AUTH_ERROR_STATUS or attempt:
+                    break
+                if not await self.header_manager.async_reauthenticate(
+                    version
+                ):
+                    break
+            self._record_sent(payload, status, body)
+            return self._status_result(status)
         except Exception as e:
             return {
                 "success": "false",
                 "status_code": "500",
                 "message": f"Request failed: {str(e)}",
             }
+
+    def _record_sent(self, payload: Dict, status: int, body: bytes) -> None:
+        """送信したメッセージの番号をsequencesに記録する.
+
+        レスポンスにmessageNoが含まれない場合は何もしない。
+
+        Args:
+            payload (Dict): 送信したデータ
+            status (int): HTTPステータスコード
+            body (bytes): レスポンスの本文
+        """
+        if status != 200:
+            return
+        try:
+            message_no = int(json.loads(body)["messageNo"])
+            channel_no = int(payload["channelNo"])
+        except (ValueError, TypeError, KeyError):
+            return
+        self.sequences.skip(channel_no, message_no)
+
+    @staticmethod
+    def _status_result(status: int) -> Dict[str, str]:
+        """ステータスコードからレスポンス結果を作成する.
+
+        Args:
+            status (int): HTTPステータスコード
+
+        Returns:
+            Dict[str, str]: レスポンス結果
+        """
+        return {
+            "success": str(status == 200),
+            "status_code": str(status),
+            "message": (
+                "Success"
+                if status == 200
+                else f"Failed with status code: {status}"
+            ),
+        }
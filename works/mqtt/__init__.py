@@ -6,17 +6,40 @@ MQTTプロトコル処理を提供するパッケージ。
 パケットの構築、解析、および関連する型定義が含まれています。
 """
 
+from .dedup import DedupCache
+from .keepalive import AdaptiveKeepAlive, RttHistogram
+from .notification import Notification
 from .packet import (
     MQTTPacket,
+    PacketDecoder,
     PacketType,
+    PublishView,
+    build_connack_packet,
     build_connect_packet,
     build_disconnect_packet,
     build_ping_packet,
+    build_puback_packet,
     build_publish_packet,
+    build_suback_packet,
     build_subscribe_packet,
+    build_unsuback_packet,
+    build_unsubscribe_packet,
     parse_packet,
     parse_publish,
+    parse_publish_view,
+    parse_suback,
+    parse_subscribe,
+    parse_unsubscribe,
 )
+from .queue import OverflowPolicy, QueueStats, ReceiveQueue
+from .reconnect import (
+    CircuitBreaker,
+    DecorrelatedJitter,
+    DowntimeWindow,
+    ReconnectSupervisor,
+)
+from .recorder import SessionReader, SessionRecorder
+from .sequence import Gap, SequenceStats, SequenceTracker
 from .websocket import connect_websocket
 
 # パブリックAPIとして公開する要素を定義
@@ -25,14 +48,47 @@ __all__ = [
     "MQTTPacket",
     "PacketType",
     # パケット構築関数
+    "build_connack_packet",
     "build_connect_packet",
     "build_disconnect_packet",
     "build_ping_packet",
+    "build_puback_packet",
     "build_publish_packet",
+    "build_suback_packet",
     "build_subscribe_packet",
+    "build_unsuback_packet",
+    "build_unsubscribe_packet",
     # パケット解析関数
+    "PacketDecoder",
     "parse_packet",
     "parse_publish",
+    "PublishView",
+    "parse_publish_view",
+    "parse_suback",
+    "parse_subscribe",
+    "parse_unsubscribe",
+    # 通知
+    "DedupCache",
+    "Notification",
+    # キープアライブ
+    "AdaptiveKeepAlive",
+    "RttHistogram",
+    # 受信キュー
+    "OverflowPolicy",
+    "QueueStats",
+    "ReceiveQueue",
+    # 再接続
+    "CircuitBreaker",
+    "DecorrelatedJitter",
+    "DowntimeWindow",
+    "ReconnectSupervisor",
+    # 記録と再生
+    "SessionReader",
+    "SessionRecorder",
+    # メッセージ番号の追跡
+    "Gap",
+    "SequenceStats",
+    "SequenceTracker",
     # WebSocket関連
     "connect_websocket",
 ]
@@ -0,0 +1,343 @@
+"""Local MQTT-over-WebSocket broker.
+
+テストと負荷試験用のローカルブローカーを提供するモジュール。
+
+本番の WebSocket.URL の代わりに MQTTClient の接続先として使用できます。
+works.mqtt.packet のビルダーとパーサーで実装しており、
+CONNECT/CONNACK、SUBSCRIBE/SUBACK、UNSUBSCRIBE/UNSUBACK、
+PINGREQ/PINGRESP、PUBLISH/PUBACKを扱います。クライアントからの
+PUBLISHはトピックに一致する購読を持つ接続に配信します。
+一定間隔での通知の配信、遅延の付加、切断の注入を設定できます。
+
+使い方:
+    python -m works.mqtt.broker --port 8765 --rate 10
+
+    config = MQTTConfig(url="ws://127.0.0.1:8765/wmqtt")
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set, cast
+
+import websockets
+from websockets.server import WebSocketServer, WebSocketServerProtocol
+from websockets.typing import Data, Subprotocol
+
+from works.constants import WebSocket
+from works.mqtt.packet import (
+    PINGRESP_FRAME,
+    MQTTPacket,
+    PacketDecoder,
+    PacketType,
+    build_connack_packet,
+    build_puback_packet,
+    build_publish_packet,
+    build_suback_packet,
+    build_unsuback_packet,
+    parse_publish_view,
+    parse_subscribe,
+    parse_unsubscribe,
+)
+from works.mqtt.topic import TopicTrie
+
+logger = logging.getLogger(__name__)
+
+# トピックと通番から通知のペイロードを生成する関数
+PayloadFactory = Callable[[str, int], bytes]
+
+
+def default_payload(topic: str, seq: int) -> bytes:
+    """REV_MSG形式のテスト用通知を生成する.
+
+    Args:
+        topic: 配信先のトピック
+        seq: 通番
+
+    Returns:
+        bytes: JSONペイロード
+    """
+    return json.dumps(
+        {
+            "chNo": 1,
+            "chType": 6,
+            "chTitle": "local-broker",
+            "createTime": int(time.time() * 1000),
+            "loc-args0": "broker",
+            "loc-args1": f"message {seq}",
+            "loc-key": "REV_MSG",
+            "messageNo": seq,
+            "nType": 1,
+            "notification-id": f"msg.local.{seq}",
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+@dataclass
+class BrokerConfig:
+    """ローカルブローカーの設定."""
+
+    host: str = "127.0.0.1"
+    port: int = 0  # 0の場合は空いているポートを使用
+    path: str = "/wmqtt"
+    publish_rate: float = 0.0  # 接続ごとの毎秒の配信数(0で無効)
+    latency: float = 0.0  # パケット送信前の遅延(秒)
+    disconnect_after: Optional[float] = None  # 接続後に切断するまでの秒数
+    max_qos: int = 1  # 許可する最大QoS
+    payload_factory: PayloadFactory = default_payload
+
+
+@dataclass
+class BrokerStats:
+    """ローカルブローカーの統計."""
+
+    connections: int = 0
+    active: int = 0
+    published: int = 0
+    received: int = 0  # クライアントから受信したPUBLISHの数
+    acked: int = 0
+    pings: int = 0
+    disconnects_injected: int = 0
+
+
+@dataclass(eq=False)
+class _Session:
+    """接続ごとの状態."""
+
+    websocket: WebSocketServerProtocol
+    topics: TopicTrie[int] = field(default_factory=TopicTrie)
+    message_ids: "itertools.count[int]" = field(
+        default_factory=lambda: itertools.count(1)
+    )
+    connected: bool = False
+
+
+class LocalBroker:
+    """プロセス内で動作するMQTT over WebSocketのブローカー."""
+
+    def __init__(self, config: Optional[BrokerConfig] = None) -> None:
+        """LocalBrokerを初期化します.
+
+        Args:
+            config: ブローカーの設定
+        """
+        self.config = config or BrokerConfig()
+        self.stats = BrokerStats()
+        self._server: Optional[WebSocketServer] = None
+        self._sessions: Set[_Session] = set()
+        self._seq = itertools.count(1)
+
+    @property
+    def url(self) -> str:
+        """接続先URL(MQTTConfig.urlに指定)."""
+        if self._server is None:
+            raise RuntimeError("Broker is not running")
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://{self.config.host}:{port}{self.config.path}"
+
+    async def start(self) -> None:
+        """ブローカーを起動します."""
+        self._server = await websockets.serve(
+            self._handle,
+            self.config.host,
+            self.config.port,
+            subprotocols=[cast(Subprotocol, WebSocket.SUBPROTOCOL)],
+            ping_interval=None,
+            ping_timeout=None,
+        )
+
+    async def stop(self) -> None:
+        """ブローカーを停止し、すべての接続を閉じます."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "LocalBroker":
+        """ブローカーを起動します."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """ブローカーを停止します."""
+        await self.stop()
+
+    async def publish(self, topic: str, payload: bytes) -> int:
+        """トピックを購読しているすべての接続に配信します.
+
+        Args:
+            topic: 配信するトピック
+            payload: ペイロード
+
+        Returns:
+            int: 配信した接続数
+        """
+        delivered = 0
+        for session in list(self._sessions):
+            granted = session.topics.match(topic)
+            if session.connected and granted:
+                await self._publish_to(session, topic, payload, max(granted))
+                delivered += 1
+        return delivered
+
+    async def disconnect_all(self) -> None:
+        """すべての接続を切断します(切断の注入)."""
+        for session in list(self._sessions):
+            self.stats.disconnects_injected += 1
+            await session.websocket.close()
+
+    async def _handle(self, websocket: WebSocketServerProtocol) -> None:
+        """1つの接続を処理します."""
+        session = _Session(websocket)
+        self._sessions.add(session)
+        self.stats.connections += 1
+        self.stats.active += 1
+        tasks = [asyncio.create_task(self._publish_loop(session))]
+        if self.config.disconnect_after is not None:
+            tasks.append(asyncio.create_task(self._disconnect_later(session)))
+
+        decoder = PacketDecoder()
+        try:
+            async for frame in websocket:
+                if not isinstance(frame, bytes):
+                    continue
+                for packet in decoder.feed(frame):
+                    await self._dispatch(session, packet)
+        except (websockets.exceptions.ConnectionClosed, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._sessions.discard(session)
+            self.stats.active -= 1
+
+    async def _dispatch(self, session: _Session, packet: MQTTPacket) -> None:
+        """受信したパケットに応答します."""
+        if packet.packet_type == PacketType.CONNECT:
+            session.connected = True
+            await self._send(session, build_connack_packet().packet)
+        elif packet.packet_type == PacketType.SUBSCRIBE:
+            message_id, requested = parse_subscribe(packet)
+            granted = []
+            for topic_filter, qos in requested:
+                qos = min(qos, self.config.max_qos)
+                # 同じフィルタの再購読は既存の購読を置き換える
+                session.topics.remove(topic_filter)
+                session.topics.add(topic_filter, qos)
+                granted.append(qos)
+            packet = build_suback_packet(message_id, granted)
+            await self._send(session, packet.packet)
+        elif packet.packet_type == PacketType.UNSUBSCRIBE:
+            message_id, topics = parse_unsubscribe(packet)
+            for topic_filter in topics:
+                session.topics.remove(topic_filter)
+            packet = build_unsuback_packet(message_id)
+            await self._send(session, packet.packet)
+        elif packet.packet_type == PacketType.PUBLISH:
+            await self._receive_publish(session, packet)
+        elif packet.packet_type == PacketType.PINGREQ:
+            self.stats.pings += 1
+            await self._send(session, PINGRESP_FRAME)
+        elif packet.packet_type == PacketType.PUBACK:
+            self.stats.acked += 1
+        elif packet.packet_type == PacketType.DISCONNECT:
+            await session.websocket.close()
+
+    async def _receive_publish(
+        self, session: _Session, packet: MQTTPacket
+    ) -> None:
+        """クライアントからのPUBLISHに応答し、購読者に配信します.
+
+        QoS 1の場合はPUBACKを返してから、トピックに一致する購読を持つ
+        すべての接続(送信元を含む)に配信します。
+        """
+        view = parse_publish_view(packet)
+        self.stats.received += 1
+        if view.message_id is not None:
+            ack = build_puback_packet(view.message_id)
+            await self._send(session, ack.packet)
+        await self.publish(view.topic, bytes(view.payload))
+
+    async def _publish_loop(self, session: _Session) -> None:
+        """設定された間隔で購読中のトピックに通知を配信します."""
+        if self.config.publish_rate <= 0:
+            return
+        interval = 1 / self.config.publish_rate
+        next_time = time.monotonic()
+        while True:
+            next_time += interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+            if not session.connected:
+                continue
+            for topic in list(session.topics.filters()):
+                if "+" in topic or "#" in topic:
+                    continue  # ワイルドカードには配信できない
+                seq = next(self._seq)
+                payload = self.config.payload_factory(topic, seq)
+                qos = max(session.topics.match(topic), default=0)
+                await self._publish_to(session, topic, payload, qos)
+
+    async def _disconnect_later(self, session: _Session) -> None:
+        """設定された時間の経過後に接続を切断します."""
+        await asyncio.sleep(cast(float, self.config.disconnect_after))
+        self.stats.disconnects_injected += 1
+        await session.websocket.close()
+
+    async def _publish_to(
+        self, session: _Session, topic: str, payload: bytes, qos: int
+    ) -> None:
+        """1つの接続にPUBLISHを送信します."""
+        message_id = next(session.message_ids) % 65535 + 1
+        packet = build_publish_packet(
+            topic, payload, qos=qos, message_id=message_id
+        )
+        self.stats.published += 1
+        await self._send(session, packet.packet)
+
+    async def _send(self, session: _Session, frame: bytes) -> None:
+        """遅延を付加してフレームを送信します."""
+        if self.config.latency > 0:
+            await asyncio.sleep(self.config.latency)
+        with contextlib.suppress(websockets.exceptions.ConnectionClosed):
+            await session.websocket.send(cast(Data, frame))
+
+
+async def _serve(config: BrokerConfig) -> None:
+    """ブローカーを起動し、停止されるまで待機します."""
+    async with LocalBroker(config) as broker:
+        logger.info(f"Local broker listening on {broker.url}")
+        await asyncio.Future()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """コマンドラインからローカルブローカーを起動する."""
+    parser = argparse.ArgumentParser(description="Local MQTT broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="接続ごとの毎秒の配信数"
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--disconnect-after", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = BrokerConfig(
+        host=args.host,
+        port=args.port,
+        publish_rate=args.rate,
+        latency=args.latency,
+        disconnect_after=args.disconnect_after,
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(config))
+
+
+if __name__ == "__main__":
+    main()
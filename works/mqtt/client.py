@@ -1,11 +1,26 @@
 """MQTT WebSocketクライアントの実装."""
 
 import asyncio
-import json
-import ssl
+import contextlib
+import logging
 import uuid
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, AsyncGenerator, Dict, Optional, Tuple, cast
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import websockets
 from websockets.client import WebSocketClientProtocol
@@ -13,26 +28,72 @@ from websockets.typing import Data, Subprotocol
 
 from works.auth import HeaderManager
 from works.constants import StatusFlag, WebSocket
+from works.mqtt.dedup import DedupCache
+from works.mqtt.keepalive import AdaptiveKeepAlive
+from works.mqtt.notification import Notification
 from works.mqtt.packet import (
+    DISCONNECT_FRAME,
+    PINGREQ_FRAME,
+    MQTTPacket,
+    PacketDecoder,
     PacketType,
+    PublishView,
     build_connect_packet,
-    build_disconnect_packet,
-    build_ping_packet,
+    build_puback_packet,
+    build_publish_packet,
     build_subscribe_packet,
-    parse_packet,
-    parse_publish,
+    build_unsubscribe_packet,
+    parse_publish_view,
+    parse_suback,
+)
+from works.mqtt.queue import OverflowPolicy, ReceiveQueue
+from works.mqtt.reconnect import (
+    CircuitBreaker,
+    DowntimeWindow,
+    ReconnectSupervisor,
 )
+from works.mqtt.recorder import SessionReader, SessionRecorder
+from works.mqtt.sequence import Gap, SequenceTracker
+from works.mqtt.topic import TopicTrie, validate_topic_filter
+from works.ratelimit import Priority, connect_scheduler
+from works.tls import get_ssl_context
+
+logger = logging.getLogger(__name__)
+
+# トピックごとの通知ハンドラー
+TopicHandler = Callable[[Notification], Awaitable[None]]
+# 再接続時に切断期間を受け取るハンドラー
+ReconnectHandler = Callable[[DowntimeWindow], Awaitable[None]]
+# チャンネル番号と欠落範囲(start, end)からメッセージを取得する関数
+GapFetcher = Callable[[int, int, int], Awaitable[List[Dict[str, Any]]]]
 
 
 @dataclass
 class MQTTConfig:
     """MQTT接続の設定."""
 
+    url: str = WebSocket.URL  # ローカルブローカーなどへの接続先
     keep_alive: int = WebSocket.KEEP_ALIVE
     ping_interval: int = WebSocket.PING_INTERVAL
+    ping_interval_min: int = WebSocket.PING_INTERVAL_MIN
     ping_timeout: int = WebSocket.PING_TIMEOUT
-    retry_interval: int = WebSocket.RETRY_INTERVAL
-    max_retries: int = WebSocket.MAX_RETRIES
+    retry_interval: float = WebSocket.RETRY_INTERVAL
+    max_retry_interval: float = WebSocket.MAX_RETRY_INTERVAL
+    max_retries: Optional[int] = WebSocket.MAX_RETRIES  # Noneは無制限
+    circuit_breaker: Optional[CircuitBreaker] = None  # クライアント間で共有可
+    min_stable_uptime: float = WebSocket.MIN_STABLE_UPTIME
+    connect_priority: int = Priority.NORMAL  # プロセス全体の接続待ちでの優先度
+    qos: int = WebSocket.QOS
+    max_inflight: int = WebSocket.MAX_INFLIGHT
+    ack_timeout: float = WebSocket.ACK_TIMEOUT
+    record_path: Optional[Path] = None  # 指定すると受信フレームを記録
+    dedup_ttl: float = 60.0  # 重複判定のためにキーを保持する秒数
+    dedup_max_size: int = 10000  # 重複判定のために保持する最大キー数
+    queue_size: int = 1000  # 受信キューに保持する最大の通知数
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+    droppable_types: Tuple[int, ...] = ()  # DROP_BY_TYPEで破棄する通知タイプ
+    gap_grace: float = 2.0  # 欠落を補完する前に遅れて届くのを待つ秒数
+    max_backfill: int = 200  # 1つの欠落範囲で補完する最大メッセージ数
 
 
 class MQTTClient:
@@ -48,86 +109,382 @@ class MQTTClient:
         self.config = config or MQTTConfig()
 
         self.running = True
-        self.current_retry = 0
         self.message_id = 0
         self.ws: Optional[WebSocketClientProtocol] = None
         self._pending_messages: Dict[int, asyncio.Future] = {}
-        self._received_messages: Dict[str, float] = {}
-        self._message_expiry = 60.0
+        self._ack_pending = asyncio.Event()  # 確認応答待ちの送信がある
+        self._inflight = asyncio.Semaphore(self.config.max_inflight)
+        self.dedup = DedupCache(
+            ttl=self.config.dedup_ttl, max_size=self.config.dedup_max_size
+        )
+        self._decoder = PacketDecoder()
+        self._inbox: Deque[MQTTPacket] = deque()
+        self._recorder: Optional[SessionRecorder] = None
+        self._routes: TopicTrie[TopicHandler] = TopicTrie()
+        self._subscriptions: Set[str] = set()
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self.queue = ReceiveQueue(
+            maxsize=self.config.queue_size,
+            policy=self.config.overflow_policy,
+            droppable_types=self.config.droppable_types,
+        )
+        self.keepalive = AdaptiveKeepAlive(
+            initial=self.config.ping_interval,
+            floor=self.config.ping_interval_min,
+            ceiling=self.config.keep_alive,
+            slow_rtt=self.config.ping_timeout / 4,
+        )
+        self._pingresp = asyncio.Event()
+        self.reconnect = ReconnectSupervisor(
+            base_delay=self.config.retry_interval,
+            max_delay=self.config.max_retry_interval,
+            max_retries=self.config.max_retries,
+            breaker=self.config.circuit_breaker,
+            min_uptime=self.config.min_stable_uptime,
+        )
+        self._reconnect_handlers: List[ReconnectHandler] = []
+        self.sequences = SequenceTracker()
+        self._gap_fetcher: Optional[GapFetcher] = None
+        self._user_topic = ""
+        self._user_no = ""
         self.state = StatusFlag.DISCONNECTED
 
+    @property
+    def current_retry(self) -> int:
+        """現在の連続した再接続の試行回数."""
+        return self.reconnect.attempts
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        """再接続時に呼び出すハンドラーを登録します.
+
+        ハンドラーは再接続後に切断されていた期間(DowntimeWindow)を
+        受け取り、受信処理と並行して実行されます。取りこぼした
+        メッセージの補完に使用します。
+
+        Args:
+            handler: 切断期間を受け取る非同期関数
+        """
+        self._reconnect_handlers.append(handler)
+
+    def set_gap_fetcher(self, fetcher: Optional[GapFetcher]) -> None:
+        """メッセージ番号の欠落を補完する関数を設定します.
+
+        チャンネルごとのmessageNoに欠落を検出すると、gap_grace秒だけ
+        遅れて届くメッセージを待ち、まだ欠落している範囲だけを
+        fetcherで取得して受信キューに追加します。
+
+        Args:
+            fetcher: チャンネル番号と範囲の最初と最後のメッセージ番号を
+                受け取り、通知と同じ形式の辞書のリストを返す非同期関数。
+                Noneの場合は補完しません。
+        """
+        self._gap_fetcher = fetcher
+
     def _get_next_message_id(self) -> int:
-        """次のメッセージIDを取得します."""
-        self.message_id = (self.message_id + 1) % 65536
-        return self.message_id
+        """次のメッセージIDを取得します.
+
+        0と確認応答待ちのIDは使用しません。
+        """
+        while True:
+            self.message_id = self.message_id % 65535 + 1
+            if self.message_id not in self._pending_messages:
+                return self.message_id
+
+    async def subscribe(
+        self, topic_filter: str, handler: Optional[TopicHandler] = None
+    ) -> None:
+        """トピックを購読します.
+
+        接続中であればすぐにSUBSCRIBEを送信し、未接続の場合は次の接続時に
+        購読します。ハンドラーを指定したトピックの通知はハンドラーに
+        渡され、connect()からは返されません。
+
+        Args:
+            topic_filter: トピックフィルタ(+と#のワイルドカード可)
+            handler: 一致した通知を受け取る非同期関数
+
+        Raises:
+            ValueError: トピックフィルタが不正な場合
+            Exception: ブローカーが購読を拒否した場合
+        """
+        validate_topic_filter(topic_filter)
+        if handler is not None:
+            self._routes.add(topic_filter, handler)
+        if topic_filter in self._subscriptions:
+            return
+
+        self._subscriptions.add(topic_filter)
+        if self.state != StatusFlag.CONNECTED:
+            return
+
+        try:
+            ack = await self._send_with_ack(
+                lambda message_id: build_subscribe_packet(
+                    [topic_filter], qos=self.config.qos, message_id=message_id
+                )
+            )
+        except Exception:
+            self._subscriptions.discard(topic_filter)
+            raise
+        if 0x80 in parse_suback(ack)[1]:
+            self._subscriptions.discard(topic_filter)
+            raise Exception("SUBACK受信に失敗しました")
+
+    async def unsubscribe(
+        self, topic_filter: str, handler: Optional[TopicHandler] = None
+    ) -> None:
+        """トピックの購読を解除します.
+
+        connect()の通知を受け取るユーザーのトピックは購読を解除できません。
+        このトピックに登録したハンドラーは解除でき、以降の通知は
+        connect()から返されます。
+
+        Args:
+            topic_filter: subscribe()で指定したトピックフィルタ
+            handler: 解除するハンドラー。Noneの場合はすべて解除。
+
+        Raises:
+            ValueError: ハンドラーを指定せずにユーザーのトピックを
+                解除しようとした場合
+        """
+        if self._user_topic and topic_filter == self._user_topic:
+            if handler is None:
+                raise ValueError(
+                    f"Cannot unsubscribe the notification topic: "
+                    f"{topic_filter}"
+                )
+            self._routes.remove(topic_filter, handler)
+            return
+        if not self._routes.remove(topic_filter, handler):
+            return  # 他のハンドラーが残っている
+        if topic_filter not in self._subscriptions:
+            return
+
+        self._subscriptions.discard(topic_filter)
+        if self.state == StatusFlag.CONNECTED:
+            await self._send_with_ack(
+                lambda message_id: build_unsubscribe_packet(
+                    [topic_filter], message_id=message_id
+                )
+            )
+
+    def _route(self, notification: Notification) -> bool:
+        """通知をトピックに一致するハンドラーに振り分けます.
+
+        ハンドラーは受信ループを止めないよう個別のタスクで実行します。
+
+        Args:
+            notification: 受信した通知
+
+        Returns:
+            bool: いずれかのハンドラーに振り分けた場合はTrue
+        """
+        if not len(self._routes):
+            return False
+        handlers = self._routes.match(notification.topic)
+        for handler in handlers:
+            self._spawn_handler(handler(notification))
+        return bool(handlers)
+
+    def _spawn_handler(self, coro: Awaitable[None]) -> None:
+        """ハンドラーを受信ループを止めないよう個別のタスクで実行します."""
+        task = asyncio.create_task(self._run_handler(coro))
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+
+    @staticmethod
+    async def _run_handler(coro: Awaitable[None]) -> None:
+        """ハンドラーを実行し、例外は記録して受信処理に伝えません."""
+        try:
+            await coro
+        except Exception:
+            logger.exception("ハンドラーの実行中にエラーが発生しました")
+
+    async def publish(
+        self, topic: str, payload: bytes, qos: Optional[int] = None
+    ) -> None:
+        """メッセージを発行します.
+
+        QoS 1の場合はPUBACKを受信するまで待機します。確認応答待ちの
+        メッセージ数はmax_inflightで制限されます。
+
+        Args:
+            topic: 発行するトピック
+            payload: メッセージのペイロード
+            qos: QoSレベル(0または1)。省略時は設定値。
+
+        Raises:
+            ValueError: 未対応のQoSレベルの場合
+            asyncio.TimeoutError: PUBACKを受信できなかった場合
+        """
+        if not self.ws:
+            raise Exception("WebSocket connection not established")
+
+        qos = self.config.qos if qos is None else qos
+        if qos == 0:
+            packet = build_publish_packet(topic, payload)
+            await self.ws.send(cast(Data, packet.packet))
+            return
+        if qos != 1:
+            raise ValueError(f"Unsupported QoS level: {qos}")
+
+        await self._send_with_ack(
+            lambda message_id: build_publish_packet(
+                topic, payload, qos=1, message_id=message_id
+            )
+        )
+
+    async def _send_with_ack(
+        self, build: Callable[[int], MQTTPacket]
+    ) -> MQTTPacket:
+        """確認応答が必要なパケットを送信し、応答を待機します.
+
+        Args:
+            build: メッセージIDからパケットを生成する関数
+
+        Returns:
+            MQTTPacket: 受信した確認応答パケット
+
+        Raises:
+            asyncio.TimeoutError: 確認応答を受信できなかった場合
+        """
+        if not self.ws:
+            raise Exception("WebSocket connection not established")
+
+        async with self._inflight:
+            message_id = self._get_next_message_id()
+            future = asyncio.get_running_loop().create_future()
+            self._pending_messages[message_id] = future
+            self._ack_pending.set()
+            try:
+                await self.ws.send(cast(Data, build(message_id).packet))
+                return await asyncio.wait_for(
+                    future, self.config.ack_timeout
+                )
+            finally:
+                self._pending_messages.pop(message_id, None)
+                if not self._pending_messages:
+                    self._ack_pending.clear()
+
+    def _resolve_ack(self, packet: MQTTPacket) -> None:
+        """確認応答パケットを待機中の送信に引き渡します."""
+        future = self._pending_messages.get(packet.get_message_id() or 0)
+        if future and not future.done():
+            future.set_result(packet)
+
+    def _fail_pending(self) -> None:
+        """確認応答待ちの送信を接続断として失敗させます."""
+        for future in self._pending_messages.values():
+            if not future.done():
+                future.set_exception(
+                    ConnectionError("MQTT connection closed")
+                )
 
     async def connect(
         self, domain_id: str, user_no: str
-    ) -> AsyncGenerator[Tuple[bool, Optional[Dict[str, Any]]], None]:
-        """WebSocket接続を確立し、MQTTセッションを開始します."""
-        auth_headers = self.header_manager.headers
-
-        while self.running and self.current_retry < self.config.max_retries:
+    ) -> AsyncGenerator[Tuple[bool, Optional[Notification]], None]:
+        """WebSocket接続を確立し、MQTTセッションを開始します.
+
+        受信は別タスクで行い、通知は受信キューを介して返します。
+        利用側の処理が遅れた場合の動作はMQTTConfig.overflow_policyで
+        選択し、キューの状態はself.queue.statsで確認できます。
+
+        切断時はReconnectSupervisorがDecorrelated Jitterで間隔を空けて
+        再接続し、max_retriesがNoneの場合は無制限に再試行します。
+        再接続に成功すると、on_reconnect()で登録したハンドラーに
+        切断されていた期間を通知します。接続のたびにHeaderManagerの
+        最新の認証ヘッダーを使用するため、セッション更新後の再接続は
+        新しいセッションで行われます。
+        """
+        if self.config.record_path and self._recorder is None:
+            self._recorder = SessionRecorder(self.config.record_path)
+
+        while self.running:
+            connected = False
             try:
+                # プロセス全体の接続数を制限し、一斉の再接続を分散する
+                await connect_scheduler().acquire(self.config.connect_priority)
                 self.state = StatusFlag.CONNECTING
 
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = True
-                ssl_context.verify_mode = ssl.CERT_REQUIRED
-
-                async with websockets.connect(
-                    WebSocket.URL,
-                    extra_headers=auth_headers,
-                    subprotocols=[cast(Subprotocol, WebSocket.SUBPROTOCOL)],
-                    ping_interval=None,
-                    ping_timeout=None,
-                    ssl=ssl_context,
-                ) as websocket:
+                async with self._open_websocket() as websocket:
                     self.ws = websocket
+                    self._decoder.reset()
+                    self._inbox.clear()
+                    if self._recorder:
+                        self._recorder.mark_boundary()
 
                     # MQTT接続の確立
                     await self._establish_mqtt_session(domain_id, user_no)
-                    self.state = StatusFlag.CONNECTED
-                    self.current_retry = 0
-
-                    # PING送信タスクを開始
-                    ping_task = asyncio.create_task(
-                        self._ping_loop(self.config.ping_interval)
-                    )
+                    connected = True
+                    self._on_session_established()
 
+                    notifications = self._receive_notifications()
                     try:
-                        async for result in self._message_loop():
-                            yield result
+                        async for notification in notifications:
+                            yield True, notification
                     finally:
-                        ping_task.cancel()
-                        try:
-                            await ping_task
-                        except asyncio.CancelledError:
-                            pass
+                        await notifications.aclose()
 
-            except websockets.exceptions.InvalidStatusCode:
                 self.state = StatusFlag.DISCONNECTED
-                self.current_retry += 1
-                yield False, None
+                self.reconnect.on_disconnected()
 
-            except websockets.exceptions.ConnectionClosed:
+            except Exception:
                 self.state = StatusFlag.DISCONNECTED
-                self.current_retry += 1
+                self.reconnect.on_disconnected(failed=not connected)
                 yield False, None
 
-            except Exception:
-                self.state = StatusFlag.DISCONNECTED
-                self.current_retry += 1
+            # 再接続まで待機(上限に達した場合は終了)
+            if not self.running or not await self.reconnect.wait():
+                return
+
+    def _open_websocket(self) -> websockets.connect:
+        """接続先へのWebSocket接続を開始します."""
+        # 共有のSSLContextでTLSセッションを再開する
+        ssl_context = None
+        if self.config.url.startswith("wss://"):
+            ssl_context = get_ssl_context()
+
+        return websockets.connect(
+            self.config.url,
+            extra_headers=self.header_manager.headers,
+            subprotocols=[cast(Subprotocol, WebSocket.SUBPROTOCOL)],
+            ping_interval=None,
+            ping_timeout=None,
+            close_timeout=self.config.ping_timeout,
+            ssl=ssl_context,
+        )
 
-                if self.current_retry >= self.config.max_retries:
-                    yield False, None
-                    return
+    def _on_session_established(self) -> None:
+        """接続状態を更新し、再接続の場合はハンドラーに通知します."""
+        self.state = StatusFlag.CONNECTED
+        window = self.reconnect.on_connected()
+        if window is not None:
+            for handler in self._reconnect_handlers:
+                self._spawn_handler(handler(window))
 
-                retry_delay = self.config.retry_interval * (
-                    2 ** (self.current_retry - 1)
-                )
-                yield False, None
-                await asyncio.sleep(retry_delay)
+    async def _receive_notifications(
+        self,
+    ) -> AsyncGenerator[Notification, None]:
+        """受信タスクとPING送信タスクを動かし、受信キューの通知を返します.
+
+        接続が切れて受信キューが閉じられると終了し、タスクを停止します。
+        """
+        # PING送信タスクと受信タスクを開始
+        ping_task = asyncio.create_task(self._ping_loop())
+        self.queue.reopen()
+        reader_task = asyncio.create_task(self._read_loop())
+
+        try:
+            while True:
+                notification = await self.queue.get()
+                if notification is None:
+                    break
+                yield notification
+        finally:
+            for task in (reader_task, ping_task):
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
 
     async def _establish_mqtt_session(
         self, domain_id: str, user_no: str
@@ -149,140 +506,452 @@ class MQTTClient:
         await self.ws.send(cast(Data, connect_packet.packet))
 
         # CONNACKの待機
-        response = await self.ws.recv()
-        if isinstance(response, bytes):
-            packet = parse_packet(response)
-        else:
-            packet = None
-
-        if not packet or packet.packet_type != PacketType.CONNACK:
+        packet = await self._recv_packet()
+        if packet.packet_type != PacketType.CONNACK:
             raise Exception("CONNACK受信に失敗しました")
 
-        # SUBSCRIBE パケットの送信
-        topics = [f"/domains/{domain_id}/users/{user_no}"]
+        # SUBSCRIBE パケットの送信(追加の購読も再接続時にまとめて送る)
+        self._user_topic = f"/domains/{domain_id}/users/{user_no}"
+        self._user_no = user_no
+        topics = [self._user_topic]
+        topics.extend(t for t in self._subscriptions if t != topics[0])
 
-        subscribe_packet = build_subscribe_packet(topics)
+        message_id = self._get_next_message_id()
+        subscribe_packet = build_subscribe_packet(
+            topics, qos=self.config.qos, message_id=message_id
+        )
         await self.ws.send(cast(Data, subscribe_packet.packet))
 
-        # SUBACKの待機
-        response = await self.ws.recv()
-        if isinstance(response, bytes):
-            packet = parse_packet(response)
-        else:
-            packet = None
+        # SUBACKの待機(先に届いたパケットはメッセージループに回す)
+        deferred: List[MQTTPacket] = []
+        while True:
+            packet = await asyncio.wait_for(
+                self._recv_packet(), self.config.ack_timeout
+            )
+            if packet.packet_type != PacketType.SUBACK:
+                deferred.append(packet)
+                continue
+            ack_id, granted = parse_suback(packet)
+            if ack_id == message_id:
+                break
+        self._inbox.extendleft(reversed(deferred))
 
-        if not packet or packet.packet_type != PacketType.SUBACK:
+        if 0x80 in granted:
             raise Exception("SUBACK受信に失敗しました")
 
+    async def _recv_packet(self) -> MQTTPacket:
+        """次のMQTTパケットを受信します.
+
+        1フレームに複数のパケットが含まれていた場合、残りのパケットは
+        受信箱に保持され、次回の呼び出しで順に返されます。
+
+        Returns:
+            MQTTPacket: 受信したパケット
+
+        Raises:
+            ValueError: 不正なパケットを受信した場合
+        """
+        if not self.ws:
+            raise Exception("WebSocket connection not established")
+
+        while not self._inbox:
+            frame = await self.ws.recv()
+            if not isinstance(frame, bytes):
+                continue
+            if self._recorder:
+                self._recorder.record(frame)
+            self._inbox.extend(self._decoder.feed(frame))
+
+        return self._inbox.popleft()
+
+    async def _read_loop(self) -> None:
+        """受信した通知を受信キューに入れるループ処理.
+
+        接続が切れると確認応答待ちの送信を失敗させ、キューを閉じて
+        残りの通知を取り出した利用側に接続の終了を伝えます。
+        利用側が通知の処理中にpublish()やsubscribe()の応答を待っていても、
+        ack_timeoutを待たずに切断を知ることができます。
+
+        キューが満杯で空きを待っている間に確認応答待ちの送信が始まると、
+        空きを待つのをやめて読み取りを続けます。その間に届いた通知は
+        受信順に保留し、確認応答を受け取った後にキューへ入れます。
+        これにより、通知の処理中にsubscribe()などを呼んだ利用側が
+        満杯のキューのためにSUBACKを受け取れなくなることを防ぎます。
+        """
+        messages = self._message_loop()
+        held: Deque[Notification] = deque()
+        try:
+            while True:
+                if held and not self._pending_messages:
+                    if await self._put(held[0]):
+                        held.popleft()
+                    continue
+                try:
+                    _, notification = await messages.__anext__()
+                except StopAsyncIteration:
+                    break
+                if notification is None:
+                    continue
+                if held or not await self._put(notification):
+                    held.append(notification)
+
+            # 切断前に保留していた通知も利用側に渡す
+            while held:
+                await self.queue.put(held.popleft())
+        finally:
+            self._fail_pending()
+            await self.queue.close()
+
+    async def _put(self, notification: Notification) -> bool:
+        """通知を受信キューに入れます.
+
+        キューが満杯で空きを待つ必要がある場合、確認応答待ちの送信が
+        あれば待たずに戻ります。
+
+        Args:
+            notification: 受信した通知
+
+        Returns:
+            bool: キューに入れたか破棄した場合はTrue、
+                確認応答を受け取るため保留する場合はFalse
+        """
+        if len(self.queue) < self.queue.maxsize:
+            await self.queue.put(notification)
+            return True
+
+        put = asyncio.ensure_future(self.queue.put(notification))
+        acked = asyncio.ensure_future(self._ack_pending.wait())
+        try:
+            await asyncio.wait(
+                (put, acked), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            acked.cancel()
+            if not put.done():
+                put.cancel()
+        return put.done() and not put.cancelled()
+
     async def _message_loop(
         self,
-    ) -> AsyncGenerator[Tuple[bool, Optional[Dict[str, Any]]], None]:
+    ) -> AsyncGenerator[Tuple[bool, Optional[Notification]], None]:
         """メッセージ受信ループを実行します."""
         if not self.ws:
             raise Exception("WebSocket connection not established")
 
         while self.state == StatusFlag.CONNECTED:
             try:
-                message = await self.ws.recv()
-
-                if not isinstance(message, bytes):
+                notification = await self._receive_packet()
+            except websockets.exceptions.ConnectionClosed:
+                self.state = StatusFlag.DISCONNECTED
+                break
+            except Exception:
+                # 解析できないパケットは読み飛ばす
+                notification = None
+
+            if notification is not None:
+                yield True, notification
+
+    async def _receive_packet(self) -> Optional[Notification]:
+        """パケットを1つ受信して処理します.
+
+        Returns:
+            Optional[Notification]: 利用側に渡す通知。通知以外のパケット、
+                重複した通知、ハンドラーに配送した通知の場合はNone。
+        """
+        packet = await self._recv_packet()
+        packet_type = packet.packet_type
+
+        if packet_type == PacketType.PINGRESP:
+            self._pingresp.set()
+        elif packet_type in (
+            PacketType.PUBACK,
+            PacketType.SUBACK,
+            PacketType.UNSUBACK,
+        ):
+            self._resolve_ack(packet)
+        elif packet_type == PacketType.PUBLISH:
+            return await self._receive_publish(packet)
+        return None
+
+    async def _receive_publish(
+        self, packet: MQTTPacket
+    ) -> Optional[Notification]:
+        """PUBLISHパケットを処理します.
+
+        Args:
+            packet: 受信したPUBLISHパケット
+
+        Returns:
+            Optional[Notification]: 利用側に渡す通知。重複した通知と
+                ハンドラーに配送した通知の場合はNone。
+        """
+        # フレームをコピーせずに解析
+        view = parse_publish_view(packet)
+
+        # QoS 1のメッセージには受信確認を返す
+        if view.message_id is not None:
+            await self._send_puback(view.message_id)
+
+        notification = self._decode_publish(view)
+        if notification is None:
+            return None
+        self._track_sequence(notification)
+        if self._route(notification):
+            return None
+        return notification
+
+    def _track_sequence(self, notification: Notification) -> None:
+        """通知のメッセージ番号を記録し、欠落があれば補完を開始します."""
+        channel_no = notification.channel_no
+        message_no = notification.message_no
+        if channel_no is None or message_no is None:
+            return
+
+        gap = self.sequences.observe(channel_no, message_no)
+        if gap is not None and self._gap_fetcher is not None:
+            self._spawn_handler(self._backfill(gap))
+
+    async def _backfill(self, gap: Gap) -> None:
+        """欠落したメッセージを取得して受信キューに追加します.
+
+        Args:
+            gap: 検出した欠落範囲
+        """
+        if self._gap_fetcher is None:
+            return
+
+        # 順序が入れ替わって遅れて届くメッセージを待つ
+        await asyncio.sleep(self.config.gap_grace)
+
+        for missing in self.sequences.missing(gap):
+            start = max(
+                missing.start, missing.end - self.config.max_backfill + 1
+            )
+            messages = await self._gap_fetcher(
+                missing.channel_no, start, missing.end
+            )
+            for data in messages:
+                notification = Notification.from_dict(data, self._user_topic)
+                message_no = notification.message_no
+                if message_no is None or not self.sequences.fill(
+                    missing.channel_no, message_no
+                ):
                     continue
-
-                packet = parse_packet(message)
-                if not packet:
+                # 自分の送信は補完で取得しても受信として扱わない
+                if str(notification.from_user_no) == self._user_no:
                     continue
-
-                if packet.packet_type == PacketType.PINGRESP:
+                if self._is_duplicate_message(notification):
                     continue
+                self.sequences.stats.backfilled += 1
+                if not self._route(notification):
+                    await self.queue.put(notification)
 
-                if packet.packet_type == PacketType.PUBLISH:
-                    if not packet.payload:
-                        continue
+    def _decode_publish(
+        self,
+        view: PublishView,
+        dedup: Optional[DedupCache] = None,
+        now: Optional[float] = None,
+    ) -> Optional[Notification]:
+        """PUBLISHのペイロードから通知を生成し、重複を除外します.
+
+        Args:
+            view: PUBLISHパケットのビュー
+            dedup: 重複判定に使うキャッシュ。省略時は受信用のキャッシュ。
+            now: 重複判定の現在時刻。省略時はキャッシュの時計。
+
+        Returns:
+            Optional[Notification]: 通知。空または重複の場合はNone。
+
+        Raises:
+            json.JSONDecodeError: JSONとして不正な場合
+        """
+        if not view.payload_length:
+            return None
+
+        # 受信バッファを参照したまま通知を生成(デコードは遅延)
+        notification = Notification(view.payload, view.topic)
+
+        # 重複チェック(キーだけを読み取り、JSONはデコードしない)
+        if self._is_duplicate_message(notification, dedup, now):
+            return None
+        return notification
+
+    async def replay(
+        self, path: Union[str, Path], realtime: bool = False
+    ) -> AsyncGenerator[Tuple[bool, Optional[Notification]], None]:
+        """記録したセッションを再生します.
+
+        記録ファイルのフレームを受信時と同じデコードと重複除外に通し、
+        connect()と同じ形式で結果を返します。接続は行いません。
+        重複除外は記録時のUNIX時刻で判定する再生専用のキャッシュで行うため、
+        再生したメッセージが受信中の重複判定に影響することはありません。
+
+        Args:
+            path: SessionRecorderで記録したファイル
+            realtime: Trueの場合は記録時の間隔を再現、
+                Falseの場合は可能な限り高速に再生。接続の区切りでは
+                間隔を測り直し、切断中や実行の間の空白は待ちません。
+
+        Yields:
+            Tuple[bool, Optional[Notification]]: 処理結果と通知
+        """
+        loop = asyncio.get_running_loop()
+        decoder = PacketDecoder()
+        dedup = DedupCache(
+            ttl=self.config.dedup_ttl, max_size=self.config.dedup_max_size
+        )
+        first_timestamp: Optional[int] = None
+        started = loop.time()
+
+        with SessionReader(path) as reader:
+            for timestamp, frame in reader:
+                if not frame:
+                    first_timestamp = None  # 接続の区切りから測り直す
+                elif realtime:
+                    if first_timestamp is None:
+                        first_timestamp = timestamp
+                        started = loop.time()
+                    delay = (timestamp - first_timestamp) / 1e9 - (
+                        loop.time() - started
+                    )
+                    if delay > 0:
+                        await asyncio.sleep(delay)
 
-                    try:
-                        # パケットの解析
-                        topic, payload, msg_id = parse_publish(packet)
-
-                        # ペイロードをUTF-8でデコード
-                        payload_str = payload.decode(
-                            "utf-8", errors="replace"
-                        ).strip()
-                        if not payload_str:
-                            continue
-
-                        # JSONとしてパース
-                        payload_dict = json.loads(payload_str)
-
-                        # 重複チェック
-                        if self._is_duplicate_message(payload_dict):
-                            continue
-
-                        yield True, payload_dict
-
-                    except (
-                        UnicodeDecodeError,
-                        json.JSONDecodeError,
-                        Exception,
-                    ):
-                        continue
+                for notification in self._replay_frame(
+                    decoder, frame, dedup, timestamp / 1e9
+                ):
+                    yield True, notification
 
-            except websockets.exceptions.ConnectionClosed:
-                self.state = StatusFlag.DISCONNECTED
-                break
-            except Exception:
+    def _replay_frame(
+        self,
+        decoder: PacketDecoder,
+        frame: memoryview,
+        dedup: DedupCache,
+        now: float,
+    ) -> List[Notification]:
+        """記録した1フレームを解析し、利用側に渡す通知を返します.
+
+        Args:
+            decoder: 再生用のパケットデコーダー
+            frame: 記録したフレーム。空のフレームは接続の区切り。
+            dedup: 再生専用の重複判定キャッシュ
+            now: フレームを記録した時刻(UNIX時間の秒)
+
+        Returns:
+            List[Notification]: 重複とハンドラーに配送したものを除いた通知
+        """
+        if not frame:
+            decoder.reset()  # 接続の区切り
+            return []
+
+        try:
+            packets = decoder.feed(frame)
+        except ValueError:
+            return []
+        finally:
+            frame.release()
+
+        notifications = []
+        for packet in packets:
+            if packet.packet_type != PacketType.PUBLISH:
                 continue
+            try:
+                view = parse_publish_view(packet)
+                notification = self._decode_publish(view, dedup, now)
+            except Exception:
+                # 解析できないペイロードは読み飛ばす
+                notification = None
+            if notification is not None and not self._route(notification):
+                notifications.append(notification)
+        return notifications
+
+    async def _send_puback(self, message_id: int) -> None:
+        """PUBACKパケットを送信します."""
+        if self.ws and not self.ws.closed:
+            packet = build_puback_packet(message_id)
+            await self.ws.send(cast(Data, packet.packet))
+
+    async def _ping_loop(self) -> None:
+        """定期的にPINGを送信し、PINGRESPを監視するループ処理.
 
-    async def _ping_loop(self, interval: int) -> None:
-        """定期的にPINGを送信するループ処理."""
+        ping_timeout以内にPINGRESPを受信できない場合は接続が切れたと
+        みなしてWebSocketを閉じ、再接続させます。送信間隔は往復時間に
+        応じてping_interval_minからkeep_aliveの間で調整されます。
+        """
+        loop = asyncio.get_running_loop()
         while self.running and self.state == StatusFlag.CONNECTED:
             try:
-                await asyncio.sleep(interval)
-                if self.ws and not self.ws.closed:
-                    ping_packet = build_ping_packet()
-                    await self.ws.send(cast(Data, ping_packet.packet))
+                await asyncio.sleep(self.keepalive.interval)
+                if not self.ws or self.ws.closed:
+                    break
+
+                self._pingresp.clear()
+                sent_at = loop.time()
+                await self.ws.send(cast(Data, PINGREQ_FRAME))
+                try:
+                    await asyncio.wait_for(
+                        self._pingresp.wait(), self.config.ping_timeout
+                    )
+                except asyncio.TimeoutError:
+                    if self.queue.is_blocking:
+                        # 受信キューが満杯で読み取りが止まっているだけ
+                        continue
+                    self.keepalive.on_timeout()
+                    await self.ws.close()
+                    break
+                self.keepalive.on_pingresp(loop.time() - sent_at)
+                self.reconnect.on_alive()
             except Exception:
                 break
 
-    def _is_duplicate_message(self, payload: dict) -> bool:
-        """メッセージが重複しているかチェックします."""
+    def _is_duplicate_message(
+        self,
+        notification: Notification,
+        dedup: Optional[DedupCache] = None,
+        now: Optional[float] = None,
+    ) -> bool:
+        """メッセージが重複しているかチェックします.
+
+        キーはペイロードから直接読み取るため、JSON全体はデコードしません。
+
+        Args:
+            notification: 判定する通知
+            dedup: 重複判定に使うキャッシュ。省略時は受信用のキャッシュ。
+            now: 重複判定の現在時刻。省略時はキャッシュの時計。
+        """
         # メッセージキーを取得
-        message_key = None
-        if "notification-id" in payload:
-            message_key = payload["notification-id"]
-        elif "messageNo" in payload:
-            message_key = f"{payload['chNo']}_{payload['messageNo']}"
+        message_key = notification.notification_id
+        if message_key is None and notification.message_no is not None:
+            message_key = (
+                f"{notification.channel_no}_{notification.message_no}"
+            )
 
         if not message_key:
             return False
 
-        # 現在時刻を取得
-        current_time = asyncio.get_event_loop().time()
-
-        # 期限切れのメッセージを削除
-        expired_keys = [
-            key
-            for key, timestamp in self._received_messages.items()
-            if current_time - timestamp > self._message_expiry
-        ]
-        for key in expired_keys:
-            del self._received_messages[key]
-
-        # 重複チェック
-        if message_key in self._received_messages:
-            return True
-
-        # 新しいメッセージを記録
-        self._received_messages[message_key] = current_time
-        return False
+        # 重複チェックと記録(期限切れのキーは古い順に削除される)
+        cache = self.dedup if dedup is None else dedup
+        return cache.check_and_add(message_key, now)
 
     async def stop(self) -> None:
-        """クライアントを停止します."""
+        """クライアントを停止します.
+
+        実行中のハンドラーはキャンセルし、終了するまで待機します。
+        """
         self.running = False
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
         if self.ws and not self.ws.closed:
-            try:
-                packet = build_disconnect_packet()
-                await self.ws.send(cast(Data, packet.packet))
+            with contextlib.suppress(Exception):
+                await self.ws.send(cast(Data, DISCONNECT_FRAME))
                 await self.ws.close()
                 self.state = StatusFlag.DISCONNECTED
-            except Exception:
-                pass
+
+        # ハンドラーからstop()が呼ばれた場合はそのハンドラー自身を除く
+        current = asyncio.current_task()
+        tasks = [t for t in self._handler_tasks if t is not current]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,92 @@
+"""MQTT duplicate suppression.
+
+受信メッセージの重複排除キャッシュを提供するモジュール。
+
+キーは記録順に保持され、有効期限は常に一定のため記録順と期限切れの順は
+一致します。そのため期限切れの削除は先頭から必要な分だけ行えばよく、
+登録・検索・削除はいずれも償却O(1)です。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class DedupCache:
+    """有効期限と最大件数を持つ重複排除キャッシュ.
+
+    Attributes:
+        ttl (float): キーを保持する秒数
+        max_size (int): 保持する最大キー数
+        hits (int): 重複と判定した回数
+        expirations (int): 有効期限切れで削除したキー数
+        evictions (int): 最大件数を超えたため削除したキー数
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """DedupCacheを初期化します.
+
+        Args:
+            ttl: キーを保持する秒数
+            max_size: 保持する最大キー数
+            clock: 現在時刻を返す単調増加の時計
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._clock = clock
+        self._expiry: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """保持しているキー数を返します."""
+        return len(self._expiry)
+
+    def __contains__(self, key: object) -> bool:
+        """キーが有効期限内で保持されているかを返します."""
+        self._expire(self._clock())
+        return key in self._expiry
+
+    def check_and_add(self, key: str, now: Optional[float] = None) -> bool:
+        """キーが既出かを判定し、未出であれば記録します.
+
+        Args:
+            key: メッセージを識別するキー
+            now: 現在時刻(省略時は時計から取得)
+
+        Returns:
+            bool: 有効期限内に同じキーを記録済みの場合はTrue
+        """
+        if now is None:
+            now = self._clock()
+        self._expire(now)
+
+        if key in self._expiry:
+            self.hits += 1
+            return True
+
+        self._expiry[key] = now + self.ttl
+        if len(self._expiry) > self.max_size:
+            self._expiry.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def clear(self) -> None:
+        """すべてのキーを削除します."""
+        self._expiry.clear()
+
+    def _expire(self, now: float) -> None:
+        """有効期限切れのキーを古い順に削除します."""
+        expiry = self._expiry
+        while expiry:
+            key = next(iter(expiry))
+            if expiry[key] > now:
+                break
+            del expiry[key]
+            self.expirations += 1
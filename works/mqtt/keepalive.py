@@ -0,0 +1,127 @@
+"""MQTT keepalive.
+
+PINGREQ/PINGRESPの往復時間の記録とPING送信間隔の調整を提供するモジュール。
+"""
+
+import bisect
+from typing import Dict, List, Optional, Sequence
+
+# 往復時間のヒストグラムの境界(ミリ秒)
+DEFAULT_BUCKETS: Sequence[float] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000
+)
+
+
+class RttHistogram:
+    """往復時間(RTT)のヒストグラム."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """RttHistogramを初期化します.
+
+        Args:
+            buckets: 各区間の上限(ミリ秒、昇順)。最後の区間より
+                大きい値は+Infの区間に入ります。
+        """
+        self.bounds: List[float] = sorted(buckets)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def record(self, rtt: float) -> None:
+        """往復時間を記録します.
+
+        Args:
+            rtt: 往復時間(秒)
+        """
+        ms = rtt * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """平均の往復時間(ミリ秒)."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """往復時間のパーセンタイルを区間の上限で近似して返します.
+
+        Args:
+            p: パーセンタイル(0から100)
+
+        Returns:
+            Optional[float]: 往復時間(ミリ秒)。+Infの区間の場合は最大値。
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(self.count * p / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return self.bounds[index]
+                break
+        return self.max
+
+    def buckets(self) -> Dict[str, int]:
+        """区間ごとの件数を返します(キーは区間の上限)."""
+        labels = [f"<={bound:g}ms" for bound in self.bounds] + ["+Inf"]
+        return dict(zip(labels, self.counts))
+
+
+class AdaptiveKeepAlive:
+    """回線の状態に応じてPING送信間隔を調整します.
+
+    応答が速い間は間隔を上限(キープアライブ時間)まで伸ばしてPINGの
+    通信量を減らし、応答が遅れた場合やタイムアウトした場合は下限まで
+    戻します。
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        floor: float,
+        ceiling: float,
+        slow_rtt: float,
+        growth: float = 1.5,
+    ) -> None:
+        """AdaptiveKeepAliveを初期化します.
+
+        Args:
+            initial: 最初のPING送信間隔(秒)
+            floor: PING送信間隔の下限(秒)
+            ceiling: PING送信間隔の上限(秒)
+            slow_rtt: これを超える往復時間を遅延とみなす秒数
+            growth: 正常な応答ごとに間隔に掛ける倍率
+        """
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.slow_rtt = slow_rtt
+        self.growth = growth
+        self.interval = min(max(initial, self.floor), self.ceiling)
+        self.rtt = RttHistogram()
+        self.timeouts = 0
+
+    def on_pingresp(self, rtt: float) -> None:
+        """PINGRESPを受信したときに呼び出します.
+
+        Args:
+            rtt: 往復時間(秒)
+        """
+        self.rtt.record(rtt)
+        if rtt > self.slow_rtt:
+            self.interval = self.floor
+        else:
+            self.interval = min(self.interval * self.growth, self.ceiling)
+
+    def on_timeout(self) -> None:
+        """PINGRESPがタイムアウトしたときに呼び出します."""
+        self.timeouts += 1
+        self.interval = self.floor
@@ -0,0 +1,229 @@
+"""MQTT notification payloads.
+
+受信した通知を表す型を提供するモジュール。
+
+通知のJSONは受信時にはデコードせず、フィールドに初めてアクセスした
+時点でデコードします。既知のフィールドには型付きのアクセサーを用意し、
+従来の辞書と同じ読み取り操作(get、[]、in)にも対応します。
+
+重複除外と欠落検出に使うnotification-id、chNo、messageNoは、
+JSON全体をデコードせずにペイロードから直接読み取ります。
+"""
+
+import re
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Pattern, Tuple, Union
+
+from works.constants import MessageType
+from works.mqtt.packet import loads_json
+
+
+def _peek_patterns(key: str, value: bytes) -> Tuple[Pattern, Pattern]:
+    """フィールド名と、その値を読み取る正規表現を生成します."""
+    name = re.escape(f'"{key}"'.encode())
+    return re.compile(name), re.compile(name + rb"\s*:\s*" + value)
+
+
+# デコードせずに読み取るフィールド(名前の出現, 値)。値の前後の引用符は
+# 文字列で届く番号にも対応するため任意
+_PEEK_PATTERNS: Dict[str, Tuple[Pattern, Pattern]] = {
+    "notification-id": _peek_patterns("notification-id", rb'"([^"\\]*)"'),
+    "chNo": _peek_patterns("chNo", rb'"?(-?\d+)"?\s*[,}]'),
+    "messageNo": _peek_patterns("messageNo", rb'"?(-?\d+)"?\s*[,}]'),
+}
+
+# 入れ子のオブジェクトの開始(ペイロード全体で1つだけなら平坦なオブジェクト)
+_OBJECT_START = re.compile(rb"{")
+
+# フィールドが含まれていないことを表す値
+_MISSING = object()
+
+
+class Notification(Mapping):
+    """遅延デコードされる通知.
+
+    Attributes:
+        topic (str): 受信したトピック
+    """
+
+    __slots__ = ("topic", "_raw", "_data")
+
+    def __init__(
+        self, raw: Union[bytes, memoryview], topic: str = ""
+    ) -> None:
+        """Notificationを初期化します.
+
+        Args:
+            raw: 通知のJSONペイロード(受信フレームを参照するmemoryview可)
+            topic: 受信したトピック
+        """
+        self.topic = topic
+        self._raw: Optional[Union[bytes, memoryview]] = raw
+        self._data: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], topic: str = ""
+    ) -> "Notification":
+        """デコード済みの辞書から生成します.
+
+        Args:
+            data: 通知データ
+            topic: 受信したトピック
+
+        Returns:
+            Notification: 生成された通知
+        """
+        notification = cls(b"", topic)
+        notification._raw = None
+        notification._data = data
+        return notification
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """デコード済みの通知データ(初回アクセス時にデコード).
+
+        Raises:
+            json.JSONDecodeError: JSONとして不正な場合
+            ValueError: JSONがオブジェクトでない場合
+        """
+        if self._data is None:
+            data = loads_json(self._raw or b"")
+            if not isinstance(data, dict):
+                raise ValueError("Notification payload is not an object")
+            self._data = data
+            self._raw = None  # 受信フレームへの参照を解放
+        return self._data
+
+    @property
+    def is_decoded(self) -> bool:
+        """ペイロードがデコード済みかどうか."""
+        return self._data is not None
+
+    def __getitem__(self, key: str) -> Any:
+        """フィールドの値を取得します."""
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """フィールド名を順に返します."""
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        """フィールド数を返します."""
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        """通知の文字列表現を返します."""
+        if self._data is None:
+            return f"Notification(topic={self.topic!r}, <not decoded>)"
+        return f"Notification(topic={self.topic!r}, {self._data!r})"
+
+    def _peek(self, key: str) -> Any:
+        """JSONをデコードせずにフィールドの値を読み取ります.
+
+        入れ子のオブジェクトを含まないペイロードで、フィールド名が
+        ちょうど1回だけ現れ、値が単純な形式の場合に限りペイロードから
+        直接読み取ります。それ以外の場合は、通常どおりデコードした値を
+        返します。
+
+        Args:
+            key: _PEEK_PATTERNSに登録されたフィールド名
+
+        Returns:
+            Any: フィールドの値。含まれていない場合は_MISSING。
+        """
+        raw = self._raw
+        if self._data is None and raw is not None:
+            name, value = _PEEK_PATTERNS[key]
+            occurrences = len(name.findall(raw))
+            if not occurrences:
+                return _MISSING
+            if occurrences == 1 and len(_OBJECT_START.findall(raw)) == 1:
+                match = value.search(raw)
+                if match is not None:
+                    return str(match.group(1), "utf-8", "replace")
+        return self.data.get(key, _MISSING)
+
+    def _int(self, key: str) -> Optional[int]:
+        """整数のフィールドを取得します."""
+        if key in _PEEK_PATTERNS:
+            value = self._peek(key)
+            if value is _MISSING:
+                return None
+        else:
+            value = self.data.get(key)
+        if value is None or value == "":
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def n_type(self) -> Optional[int]:
+        """通知タイプ(nType)."""
+        return self._int("nType")
+
+    @property
+    def message_type(self) -> Optional[MessageType]:
+        """通知タイプに対応するメッセージタイプ(未知の場合はNone)."""
+        n_type = self.n_type
+        if n_type is None:
+            return None
+        try:
+            return MessageType(n_type)
+        except ValueError:
+            return None
+
+    @property
+    def channel_no(self) -> Optional[int]:
+        """チャンネル番号(chNo)."""
+        return self._int("chNo")
+
+    @property
+    def channel_type(self) -> Optional[int]:
+        """チャンネルタイプ(chType)."""
+        return self._int("chType")
+
+    @property
+    def channel_title(self) -> str:
+        """チャンネル名(chTitle)."""
+        return str(self.data.get("chTitle", ""))
+
+    @property
+    def message_no(self) -> Optional[int]:
+        """チャンネル内のメッセージ番号(messageNo)."""
+        return self._int("messageNo")
+
+    @property
+    def content(self) -> str:
+        """メッセージ内容(loc-args1)."""
+        return str(self.data.get("loc-args1", ""))
+
+    @property
+    def sender_name(self) -> str:
+        """送信者名(loc-args0)."""
+        return str(self.data.get("loc-args0", ""))
+
+    @property
+    def loc_key(self) -> str:
+        """通知の種類を表すキー(loc-key)."""
+        return str(self.data.get("loc-key", ""))
+
+    @property
+    def from_user_no(self) -> Optional[int]:
+        """送信者のユーザー番号(fromUserNo)."""
+        return self._int("fromUserNo")
+
+    @property
+    def create_time(self) -> Optional[int]:
+        """作成時刻(createTime、エポックミリ秒)."""
+        return self._int("createTime")
+
+    @property
+    def notification_id(self) -> Optional[str]:
+        """通知ID(notification-id)."""
+        value = self._peek("notification-id")
+        if value is _MISSING or not value:
+            return None
+        return str(value)
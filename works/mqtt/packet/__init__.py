@@ -8,30 +8,67 @@ MQTTパケット処理を提供するパッケージ。
 - パケットタイプの定義
 """
 
-from .base import MQTTPacket, decode_remaining_length
+from .base import (
+    MQTTPacket,
+    decode_remaining_length,
+    encode_remaining_length,
+)
 from .builder import (
+    DISCONNECT_FRAME,
+    PINGREQ_FRAME,
+    PINGRESP_FRAME,
+    build_connack_packet,
     build_connect_packet,
     build_disconnect_packet,
     build_ping_packet,
+    build_puback_packet,
     build_publish_packet,
+    build_suback_packet,
     build_subscribe_packet,
+    build_unsuback_packet,
+    build_unsubscribe_packet,
+)
+from .parser import (
+    PacketDecoder,
+    analyze_packet,
+    parse_packet,
+    parse_publish,
+    parse_suback,
+    parse_subscribe,
+    parse_unsubscribe,
 )
-from .parser import analyze_packet, parse_packet, parse_publish
 from .types import PacketType
+from .view import PublishView, loads_json, parse_publish_view
 
 __all__ = [
     # 基本クラス
     "MQTTPacket",
     "PacketType",
     # パケット構築
+    "DISCONNECT_FRAME",
+    "PINGREQ_FRAME",
+    "PINGRESP_FRAME",
+    "build_connack_packet",
     "build_connect_packet",
     "build_disconnect_packet",
     "build_ping_packet",
+    "build_puback_packet",
     "build_publish_packet",
+    "build_suback_packet",
     "build_subscribe_packet",
+    "build_unsuback_packet",
+    "build_unsubscribe_packet",
     # パケット解析
+    "PacketDecoder",
     "analyze_packet",
     "parse_packet",
     "parse_publish",
+    "parse_suback",
+    "parse_subscribe",
+    "parse_unsubscribe",
+    "PublishView",
+    "parse_publish_view",
+    "loads_json",
     "decode_remaining_length",
+    "encode_remaining_length",
 ]
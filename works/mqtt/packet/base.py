@@ -43,8 +43,51 @@ def decode_remaining_length(data: bytes, start: int = 1) -> tuple[int, int]:
     return value, index
 
 
+def encode_remaining_length(length: int) -> bytes:
+    """残りの長さを可変長エンコードする.
+
+    Args:
+        length (int): 残りの長さ
+
+    Returns:
+        bytes: エンコードされた長さのバイト列(1-4バイト)
+
+    Raises:
+        ValueError: MQTTで表現できない長さの場合
+    """
+    if length < 128:
+        return bytes((length,))
+    if length >= 128**4:
+        raise ValueError("不正な長さ形式です")
+
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length > 0:
+            byte |= 0x80
+        encoded.append(byte)
+        if length == 0:
+            break
+
+    return bytes(encoded)
+
+
 class MQTTPacket:
-    """MQTTパケットを表すクラス."""
+    """MQTTパケットを表すクラス.
+
+    ワイヤ形式のバイト列は初回参照時に一度だけ生成して保持するため、
+    生成後のパケットは変更しないでください。
+    """
+
+    __slots__ = (
+        "packet_type",
+        "flags",
+        "remaining_length",
+        "_payload",
+        "_raw_packet",
+        "_payload_offset",
+    )
 
     def __init__(
         self,
@@ -53,6 +96,7 @@ class MQTTPacket:
         remaining_length: int,
         payload: Optional[bytes] = None,
         raw_packet: Optional[bytes] = None,
+        payload_offset: Optional[int] = None,
     ) -> None:
         """MQTTパケットを初期化します.
 
@@ -62,22 +106,47 @@ class MQTTPacket:
             remaining_length: 残りの長さ
             payload: ペイロード
             raw_packet: 生のパケットデータ
+            payload_offset: 生のパケットデータ内のペイロード開始位置。
+                指定した場合、ペイロードは参照時に初めて切り出されます。
         """
         self.packet_type = packet_type
         self.flags = flags
         self.remaining_length = remaining_length
-        self.payload = payload
+        self._payload = payload
         self._raw_packet = raw_packet
+        self._payload_offset = payload_offset
+
+    @property
+    def payload(self) -> Optional[bytes]:
+        """ペイロードを取得します.
+
+        生のパケットデータから遅延して切り出し、結果を保持します。
+        """
+        if (
+            self._payload is None
+            and self._raw_packet is not None
+            and self._payload_offset is not None
+            and self.remaining_length > 0
+        ):
+            self._payload = self._raw_packet[self._payload_offset :]
+        return self._payload
 
     @property
     def packet(self) -> bytes:
-        """パケットのバイナリデータを取得します."""
-        if self._raw_packet is not None:
-            return self._raw_packet
-        # 生のパケットデータがない場合は、ヘッダーとペイロードを結合
-        if self.payload is None:
-            return self.header
-        return self.header + self.payload
+        """パケットのバイナリデータを取得します.
+
+        生のパケットデータがない場合はヘッダーとペイロードから一度だけ
+        エンコードし、以降はその結果を返します。
+        """
+        if self._raw_packet is None:
+            header = self.header
+            payload = self._payload or b""
+            buffer = bytearray(len(header) + len(payload))
+            buffer[: len(header)] = header
+            buffer[len(header) :] = payload
+            self._raw_packet = bytes(buffer)
+            self._payload_offset = len(header)
+        return self._raw_packet
 
     @property
     def header(self) -> bytes:
@@ -86,29 +155,14 @@ class MQTTPacket:
         Returns:
             bytes: パケットヘッダーのバイト列
         """
-        first_byte = (self.packet_type.value << 4) | self.flags
-        remaining_bytes = self._encode_remaining_length()
-        return bytes([first_byte] + remaining_bytes)
-
-    def _encode_remaining_length(self) -> list[int]:
-        """残りの長さを可変長エンコードする.
-
-        Returns:
-            list[int]: エンコードされた長さのバイトリスト
-        """
-        remaining_bytes = []
-        length = self.remaining_length
-
-        while True:
-            byte = length % 128
-            length = length // 128
-            if length > 0:
-                byte |= 0x80
-            remaining_bytes.append(byte)
-            if length == 0:
-                break
-
-        return remaining_bytes
+        if self._raw_packet is not None:
+            return self._raw_packet[
+                : len(self._raw_packet) - self.remaining_length
+            ]
+        first_byte = (self.packet_type << 4) | self.flags
+        return bytes((first_byte,)) + encode_remaining_length(
+            self.remaining_length
+        )
 
     def get_message_id(self) -> Optional[int]:
         """メッセージIDを取得する.
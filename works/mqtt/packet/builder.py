@@ -3,19 +3,54 @@
 MQTTパケットビルダーを提供するモジュール。
 
 主な機能:
-- CONNECTパケットの生成
+- CONNECT/CONNACKパケットの生成
 - PUBLISHパケットの生成
-- SUBSCRIBEパケットの生成
-- PINGREQパケットの生成
+- PUBACKパケットの生成
+- SUBSCRIBE/SUBACKパケットの生成
+- UNSUBSCRIBE/UNSUBACKパケットの生成
+- PINGREQ/PINGRESPパケットの生成
 - DISCONNECTパケットの生成
+
+CONNACK、SUBACK、UNSUBACK、PINGRESPはブローカー側のパケットで、
+ローカルのテスト用ブローカーで使用します。
+
+各パケットは必要なサイズを事前に計算した1つのバッファ上で組み立てます。
+内容が変わらないPINGREQ、PINGRESP、DISCONNECTはモジュール定数として
+共有します。
 """
 
 import struct
-from typing import List, Optional
+from typing import Final, List, Optional, Tuple
 
-from .base import MQTTPacket
+from .base import MQTTPacket, encode_remaining_length
 from .types import PacketType
 
+# 内容が固定の制御パケット
+PINGREQ_FRAME: Final[bytes] = bytes((PacketType.PINGREQ << 4, 0))
+PINGRESP_FRAME: Final[bytes] = bytes((PacketType.PINGRESP << 4, 0))
+DISCONNECT_FRAME: Final[bytes] = bytes((PacketType.DISCONNECT << 4, 0))
+
+_PINGREQ_PACKET: Final[MQTTPacket] = MQTTPacket(
+    packet_type=PacketType.PINGREQ,
+    flags=0,
+    remaining_length=0,
+    raw_packet=PINGREQ_FRAME,
+)
+_DISCONNECT_PACKET: Final[MQTTPacket] = MQTTPacket(
+    packet_type=PacketType.DISCONNECT,
+    flags=0,
+    remaining_length=0,
+    raw_packet=DISCONNECT_FRAME,
+)
+
+# CONNECTの可変ヘッダー(キープアライブを除く)
+_CONNECT_HEADER: Final[bytes] = (
+    b"\x00\x04"  # プロトコル名の長さ
+    b"MQTT"  # プロトコル名
+    b"\x04"  # プロトコルレベル
+    b"\x02"  # 接続フラグ(クリーンセッション)
+)
+
 
 def build_connect_packet(
     client_id: str,
@@ -36,28 +71,46 @@ def build_connect_packet(
     Returns:
         MQTTPacket: 生成されたCONNECTパケット
     """
-    # 可変ヘッダーの構築
-    var_header = (
-        b"\x00\x04"  # プロトコル名の長さ
-        b"MQTT"  # プロトコル名
-        b"\x04"  # プロトコルレベル
-        b"\x02"  # 接続フラグ(クリーンセッション)
-        + struct.pack("!H", keep_alive)  # キープアライブ
-    )
-
-    # ペイロードの構築
-    payload = _encode_string(client_id)
+    fields = [client_id.encode("utf-8")]
     if username is not None:
-        payload += _encode_string(username)
+        fields.append(username.encode("utf-8"))
     if password is not None:
-        payload += _encode_string(password)
+        fields.append(password.encode("utf-8"))
 
-    return MQTTPacket(
-        packet_type=PacketType.CONNECT,
-        flags=0,
-        remaining_length=len(var_header) + len(payload),
-        payload=var_header + payload,
+    remaining_length = (
+        len(_CONNECT_HEADER) + 2 + sum(2 + len(f) for f in fields)
     )
+    buffer, pos = _allocate(PacketType.CONNECT, 0, remaining_length)
+
+    # 可変ヘッダーの書き込み
+    end = pos + len(_CONNECT_HEADER)
+    buffer[pos:end] = _CONNECT_HEADER
+    struct.pack_into("!H", buffer, end, keep_alive)  # キープアライブ
+    pos = end + 2
+
+    # ペイロードの書き込み
+    for field in fields:
+        pos = _write_string(buffer, pos, field)
+
+    return _finish(PacketType.CONNECT, 0, remaining_length, buffer)
+
+
+def build_connack_packet(
+    return_code: int = 0, session_present: bool = False
+) -> MQTTPacket:
+    """CONNACKパケットを生成する.
+
+    Args:
+        return_code (int): 接続結果コード(0は接続許可)。デフォルト0。
+        session_present (bool): セッションが存在するか。デフォルトFalse。
+
+    Returns:
+        MQTTPacket: 生成されたCONNACKパケット
+    """
+    buffer, pos = _allocate(PacketType.CONNACK, 0, 2)
+    buffer[pos] = int(session_present)
+    buffer[pos + 1] = return_code
+    return _finish(PacketType.CONNACK, 0, 2, buffer)
 
 
 def build_publish_packet(
@@ -66,6 +119,7 @@ def build_publish_packet(
     qos: int = 0,
     retain: bool = False,
     dup: bool = False,
+    message_id: int = 1,
 ) -> MQTTPacket:
     """PUBLISHパケットを生成する.
 
@@ -75,6 +129,7 @@ def build_publish_packet(
         qos (int): QoSレベル(0-2)。デフォルト0。
         retain (bool): 保持フラグ。デフォルトFalse。
         dup (bool): 再送フラグ。デフォルトFalse。
+        message_id (int): メッセージID(QoS > 0の場合のみ使用)。デフォルト1。
 
     Returns:
         MQTTPacket: 生成されたPUBLISHパケット
@@ -82,81 +137,203 @@ def build_publish_packet(
     # フラグの設定
     flags = (dup << 3) | (qos << 1) | retain
 
-    # 可変ヘッダーの構築
-    var_header = _encode_string(topic)
-
+    encoded_topic = topic.encode("utf-8")
+    remaining_length = 2 + len(encoded_topic) + len(payload)
     # QoS > 0の場合はメッセージIDを追加
     if qos > 0:
-        var_header += struct.pack("!H", 1)  # メッセージID = 1
+        remaining_length += 2
+
+    buffer, pos = _allocate(PacketType.PUBLISH, flags, remaining_length)
+    pos = _write_string(buffer, pos, encoded_topic)
+    if qos > 0:
+        struct.pack_into("!H", buffer, pos, message_id)
+        pos += 2
+    buffer[pos:] = payload
+
+    return _finish(PacketType.PUBLISH, flags, remaining_length, buffer)
 
-    return MQTTPacket(
-        packet_type=PacketType.PUBLISH,
-        flags=flags,
-        remaining_length=len(var_header) + len(payload),
-        payload=var_header + payload,
-    )
 
+def build_puback_packet(message_id: int) -> MQTTPacket:
+    """PUBACKパケットを生成する.
 
-def build_subscribe_packet(topics: List[str], qos: int = 0) -> MQTTPacket:
+    Args:
+        message_id (int): 確認応答するPUBLISHのメッセージID
+
+    Returns:
+        MQTTPacket: 生成されたPUBACKパケット
+    """
+    buffer, pos = _allocate(PacketType.PUBACK, 0, 2)
+    struct.pack_into("!H", buffer, pos, message_id)
+    return _finish(PacketType.PUBACK, 0, 2, buffer)
+
+
+def build_subscribe_packet(
+    topics: List[str], qos: int = 0, message_id: int = 1
+) -> MQTTPacket:
     """SUBSCRIBEパケットを生成する.
 
     Args:
         topics (List[str]): 購読するトピックのリスト
         qos (int): QoSレベル(0-2)。デフォルト0。
+        message_id (int): メッセージID。デフォルト1。
 
     Returns:
         MQTTPacket: 生成されたSUBSCRIBEパケット
     """
-    # 可変ヘッダーの構築(メッセージID = 1)
-    var_header = struct.pack("!H", 1)
+    encoded_topics = [topic.encode("utf-8") for topic in topics]
+    remaining_length = 2 + sum(3 + len(t) for t in encoded_topics)
 
-    # ペイロードの構築(トピックとQoSのペア)
-    payload = b"".join(
-        _encode_string(topic) + bytes([qos]) for topic in topics
-    )
+    # SUBSCRIBEは常にフラグ = 2
+    buffer, pos = _allocate(PacketType.SUBSCRIBE, 2, remaining_length)
 
-    return MQTTPacket(
-        packet_type=PacketType.SUBSCRIBE,
-        flags=2,  # SUBSCRIBEは常にフラグ = 2
-        remaining_length=len(var_header) + len(payload),
-        payload=var_header + payload,
-    )
+    # 可変ヘッダー(メッセージID)
+    struct.pack_into("!H", buffer, pos, message_id)
+    pos += 2
+
+    # ペイロード(トピックとQoSのペア)
+    for encoded in encoded_topics:
+        pos = _write_string(buffer, pos, encoded)
+        buffer[pos] = qos
+        pos += 1
+
+    return _finish(PacketType.SUBSCRIBE, 2, remaining_length, buffer)
+
+
+def build_suback_packet(message_id: int, granted: List[int]) -> MQTTPacket:
+    """SUBACKパケットを生成する.
+
+    Args:
+        message_id (int): 応答するSUBSCRIBEのメッセージID
+        granted (List[int]): トピックごとに許可したQoS(0x80は拒否)
+
+    Returns:
+        MQTTPacket: 生成されたSUBACKパケット
+    """
+    remaining_length = 2 + len(granted)
+    buffer, pos = _allocate(PacketType.SUBACK, 0, remaining_length)
+    struct.pack_into("!H", buffer, pos, message_id)
+    buffer[pos + 2 :] = bytes(granted)
+    return _finish(PacketType.SUBACK, 0, remaining_length, buffer)
+
+
+def build_unsubscribe_packet(
+    topics: List[str], message_id: int = 1
+) -> MQTTPacket:
+    """UNSUBSCRIBEパケットを生成する.
+
+    Args:
+        topics (List[str]): 購読を解除するトピックのリスト
+        message_id (int): メッセージID。デフォルト1。
+
+    Returns:
+        MQTTPacket: 生成されたUNSUBSCRIBEパケット
+    """
+    encoded_topics = [topic.encode("utf-8") for topic in topics]
+    remaining_length = 2 + sum(2 + len(t) for t in encoded_topics)
+
+    # UNSUBSCRIBEは常にフラグ = 2
+    buffer, pos = _allocate(PacketType.UNSUBSCRIBE, 2, remaining_length)
+    struct.pack_into("!H", buffer, pos, message_id)
+    pos += 2
+
+    for encoded in encoded_topics:
+        pos = _write_string(buffer, pos, encoded)
+
+    return _finish(PacketType.UNSUBSCRIBE, 2, remaining_length, buffer)
+
+
+def build_unsuback_packet(message_id: int) -> MQTTPacket:
+    """UNSUBACKパケットを生成する.
+
+    Args:
+        message_id (int): 応答するUNSUBSCRIBEのメッセージID
+
+    Returns:
+        MQTTPacket: 生成されたUNSUBACKパケット
+    """
+    buffer, pos = _allocate(PacketType.UNSUBACK, 0, 2)
+    struct.pack_into("!H", buffer, pos, message_id)
+    return _finish(PacketType.UNSUBACK, 0, 2, buffer)
 
 
 def build_ping_packet() -> MQTTPacket:
-    """PINGREQパケットを生成する.
+    """PINGREQパケットを取得する.
 
     Returns:
-        MQTTPacket: 生成されたPINGREQパケット
+        MQTTPacket: 共有のPINGREQパケット
     """
-    return MQTTPacket(
-        packet_type=PacketType.PINGREQ,
-        flags=0,
-        remaining_length=0,
-    )
+    return _PINGREQ_PACKET
 
 
 def build_disconnect_packet() -> MQTTPacket:
-    """DISCONNECTパケットを生成する.
+    """DISCONNECTパケットを取得する.
 
     Returns:
-        MQTTPacket: 生成されたDISCONNECTパケット
+        MQTTPacket: 共有のDISCONNECTパケット
     """
-    return MQTTPacket(
-        packet_type=PacketType.DISCONNECT,
-        flags=0,
-        remaining_length=0,
-    )
+    return _DISCONNECT_PACKET
 
 
-def _encode_string(s: str) -> bytes:
-    """文字列をMQTT形式でエンコードする.
+def _allocate(
+    packet_type: PacketType, flags: int, remaining_length: int
+) -> Tuple[bytearray, int]:
+    """固定ヘッダーを書き込んだパケット全体のバッファを確保する.
 
     Args:
-        s (str): エンコードする文字列
+        packet_type (PacketType): パケットタイプ
+        flags (int): フラグ
+        remaining_length (int): 残りの長さ
 
     Returns:
-        bytes: エンコードされたバイト列
+        Tuple[bytearray, int]: バッファと可変ヘッダーの開始位置
     """
-    encoded = s.encode("utf-8")
-    return struct.pack("!H", len(encoded)) + encoded
+    length_bytes = encode_remaining_length(remaining_length)
+    header_length = 1 + len(length_bytes)
+
+    buffer = bytearray(header_length + remaining_length)
+    buffer[0] = (packet_type << 4) | flags
+    buffer[1:header_length] = length_bytes
+    return buffer, header_length
+
+
+def _write_string(buffer: bytearray, pos: int, encoded: bytes) -> int:
+    """長さ付き文字列をMQTT形式でバッファに書き込む.
+
+    Args:
+        buffer (bytearray): 書き込み先のバッファ
+        pos (int): 書き込み位置
+        encoded (bytes): UTF-8エンコード済みの文字列
+
+    Returns:
+        int: 書き込み後の位置
+    """
+    struct.pack_into("!H", buffer, pos, len(encoded))
+    pos += 2
+    buffer[pos : pos + len(encoded)] = encoded
+    return pos + len(encoded)
+
+
+def _finish(
+    packet_type: PacketType,
+    flags: int,
+    remaining_length: int,
+    buffer: bytearray,
+) -> MQTTPacket:
+    """組み立て済みのバッファからパケットを生成する.
+
+    Args:
+        packet_type (PacketType): パケットタイプ
+        flags (int): フラグ
+        remaining_length (int): 残りの長さ
+        buffer (bytearray): 組み立て済みのバッファ
+
+    Returns:
+        MQTTPacket: エンコード結果を保持したパケット
+    """
+    return MQTTPacket(
+        packet_type=packet_type,
+        flags=flags,
+        remaining_length=remaining_length,
+        raw_packet=bytes(buffer),
+        payload_offset=len(buffer) - remaining_length,
+    )
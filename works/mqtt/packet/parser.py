@@ -7,7 +7,7 @@
 
 import json
 import struct
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .base import MQTTPacket
 from .types import PacketType
@@ -167,6 +167,216 @@ def parse_packet(data: bytes) -> Optional[MQTTPacket]:
         return None
 
 
+class PacketDecoder:
+    """WebSocketフレームからMQTTパケットを逐次復元するデコーダ.
+
+    WebSocketフレームの境界とMQTTパケットの境界は一致するとは限りません。
+    受信データを内部バッファに蓄積し、完全なパケットが揃うたびに
+    取り出します。1フレームに複数のパケットが含まれる場合と、
+    1つのパケットが複数のフレームに分割される場合の両方に対応します。
+    """
+
+    def __init__(self) -> None:
+        """PacketDecoderを初期化します."""
+        self._buffer = bytearray()
+
+    @property
+    def buffered(self) -> int:
+        """未処理のままバッファに残っているバイト数."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[MQTTPacket]:
+        """受信データを追加し、完成したパケットを返します.
+
+        Args:
+            data: 受信したフレームのバイナリデータ
+
+        Returns:
+            List[MQTTPacket]: 完成したパケットのリスト(受信順)
+
+        Raises:
+            ValueError: 不正なパケットを検出した場合。
+                ストリームの同期が失われるためバッファは破棄されます。
+        """
+        if not data:
+            return []
+
+        try:
+            if not self._buffer:
+                # バッファが空なら受信フレームを直接解析する
+                packets, consumed = _split_packets(data)
+                if consumed < len(data):
+                    self._buffer += memoryview(data)[consumed:]
+                return packets
+
+            self._buffer += data
+            packets, consumed = _split_packets(self._buffer)
+            del self._buffer[:consumed]
+            return packets
+        except ValueError:
+            self.reset()
+            raise
+
+    def reset(self) -> None:
+        """バッファを破棄します(再接続時などに使用)."""
+        self._buffer.clear()
+
+
+def _split_packets(
+    data: Union[bytes, bytearray],
+) -> Tuple[List[MQTTPacket], int]:
+    """バッファから完全なパケットをすべて切り出します.
+
+    Args:
+        data: 解析対象のバッファ
+
+    Returns:
+        Tuple[List[MQTTPacket], int]: 切り出したパケットと消費したバイト数
+
+    Raises:
+        ValueError: 不正なパケットタイプまたは長さ形式の場合
+    """
+    packets: List[MQTTPacket] = []
+    size = len(data)
+    start = 0
+
+    while start + 2 <= size:
+        # 可変長の残りの長さを解析(最大4バイト)
+        multiplier = 1
+        value = 0
+        pos = start + 1
+        while True:
+            if pos >= size:
+                return packets, start
+            byte = data[pos]
+            value += (byte & 0x7F) * multiplier
+            pos += 1
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+            if multiplier > 128**3:
+                raise ValueError("不正な長さ形式です")
+
+        end = pos + value
+        if end > size:
+            break
+
+        if start == 0 and end == size and isinstance(data, bytes):
+            raw_packet = data
+        else:
+            raw_packet = bytes(data[start:end])
+
+        packets.append(
+            MQTTPacket(
+                packet_type=PacketType(data[start] >> 4),
+                flags=data[start] & 0x0F,
+                remaining_length=value,
+                raw_packet=raw_packet,
+                payload_offset=pos - start,
+            )
+        )
+        start = end
+
+    return packets, start
+
+
+def parse_suback(packet: MQTTPacket) -> Tuple[int, List[int]]:
+    """SUBACKパケットを解析します.
+
+    Args:
+        packet: SUBACKパケット
+
+    Returns:
+        Tuple[int, List[int]]: メッセージIDと、トピックごとに許可された
+            QoSレベル(0x80は購読失敗)のリスト
+
+    Raises:
+        ValueError: パケットの解析に失敗した場合
+    """
+    payload = packet.payload
+    if packet.packet_type != PacketType.SUBACK or not payload:
+        raise ValueError("Invalid SUBACK packet")
+    if len(payload) < 2:
+        raise ValueError("Packet too short for SUBACK")
+
+    message_id = struct.unpack("!H", payload[0:2])[0]
+    return message_id, list(payload[2:])
+
+
+def parse_subscribe(packet: MQTTPacket) -> Tuple[int, List[Tuple[str, int]]]:
+    """SUBSCRIBEパケットを解析します.
+
+    Args:
+        packet: SUBSCRIBEパケット
+
+    Returns:
+        Tuple[int, List[Tuple[str, int]]]: メッセージIDと、
+            トピックフィルタと要求QoSの組のリスト
+
+    Raises:
+        ValueError: パケットの解析に失敗した場合
+    """
+    message_id, topics = _parse_topic_list(packet, PacketType.SUBSCRIBE, 1)
+    return message_id, [(topic, options[0]) for topic, options in topics]
+
+
+def parse_unsubscribe(packet: MQTTPacket) -> Tuple[int, List[str]]:
+    """UNSUBSCRIBEパケットを解析します.
+
+    Args:
+        packet: UNSUBSCRIBEパケット
+
+    Returns:
+        Tuple[int, List[str]]: メッセージIDとトピックフィルタのリスト
+
+    Raises:
+        ValueError: パケットの解析に失敗した場合
+    """
+    message_id, topics = _parse_topic_list(packet, PacketType.UNSUBSCRIBE, 0)
+    return message_id, [topic for topic, _ in topics]
+
+
+def _parse_topic_list(
+    packet: MQTTPacket, packet_type: PacketType, option_length: int
+) -> Tuple[int, List[Tuple[str, bytes]]]:
+    """メッセージIDに続くトピックのリストを解析します.
+
+    Args:
+        packet: 解析対象のパケット
+        packet_type: 期待するパケットタイプ
+        option_length: 各トピックに続くオプションのバイト数
+
+    Returns:
+        Tuple[int, List[Tuple[str, bytes]]]: メッセージIDと、
+            トピックとオプションの組のリスト
+
+    Raises:
+        ValueError: パケットの解析に失敗した場合
+    """
+    payload = packet.payload
+    if packet.packet_type != packet_type or not payload or len(payload) < 2:
+        raise ValueError(f"Invalid {packet_type.name} packet")
+
+    message_id = struct.unpack("!H", payload[0:2])[0]
+    topics = []
+    pos = 2
+    while pos < len(payload):
+        if pos + 2 > len(payload):
+            raise ValueError("Packet too short for topic")
+        length = struct.unpack("!H", payload[pos : pos + 2])[0]
+        end = pos + 2 + length
+        if end + option_length > len(payload):
+            raise ValueError("Packet too short for topic")
+        topics.append(
+            (
+                payload[pos + 2 : end].decode("utf-8"),
+                payload[end : end + option_length],
+            )
+        )
+        pos = end + option_length
+    return message_id, topics
+
+
 def parse_publish(packet: MQTTPacket) -> Tuple[str, bytes, Optional[int]]:
     """PUBLISHパケットを解析します.
 
@@ -23,6 +23,8 @@ class PacketType(IntEnum):
         PUBACK (int): QoS 1での PUBLISH パケットの受信確認
         SUBSCRIBE (int): トピックの購読要求パケット
         SUBACK (int): サーバーからの購読要求応答パケット
+        UNSUBSCRIBE (int): トピックの購読解除要求パケット
+        UNSUBACK (int): サーバーからの購読解除応答パケット
         PINGREQ (int): クライアントからのping要求パケット
         PINGRESP (int): サーバーからのping応答パケット
         DISCONNECT (int): クライアントからの正常切断要求パケット
@@ -34,6 +36,8 @@ class PacketType(IntEnum):
     PUBACK = 4
     SUBSCRIBE = 8
     SUBACK = 9
+    UNSUBSCRIBE = 10
+    UNSUBACK = 11
     PINGREQ = 12
     PINGRESP = 13
     DISCONNECT = 14
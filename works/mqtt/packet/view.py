@@ -0,0 +1,164 @@
+"""MQTT packet views.
+
+PUBLISHパケットをコピーせずに参照するビューを提供するモジュール。
+
+受信フレームからトピック、メッセージID、ペイロードの位置だけを解析し、
+データ本体はmemoryviewとして元のフレームを参照します。
+"""
+
+import json
+import struct
+from typing import Any, Optional, Union
+
+from .base import MQTTPacket
+from .types import PacketType
+
+try:
+    import orjson
+except ImportError:  # orjsonは任意の依存関係
+    orjson = None
+
+
+def loads_json(data: Union[bytes, memoryview]) -> Any:
+    """バッファからJSONをデコードします.
+
+    orjsonがインストールされていればmemoryviewから直接デコードし、
+    なければ標準のjsonモジュールを使用します。不正なUTF-8は置換文字に
+    置き換えてデコードします。
+
+    Args:
+        data: JSONのバイト列またはそれを参照するmemoryview
+
+    Returns:
+        Any: デコードされたJSONデータ
+
+    Raises:
+        json.JSONDecodeError: JSONとして不正な場合
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # 不正なUTF-8を含む場合は標準のデコードで再試行
+    return json.loads(str(data, "utf-8", "replace"))
+
+
+class PublishView:
+    """受信フレームを参照するPUBLISHパケットのビュー.
+
+    Attributes:
+        buffer (memoryview): パケット全体を参照するバッファ
+        flags (int): 固定ヘッダーのフラグ
+        message_id (Optional[int]): メッセージID(QoS 0の場合はNone)
+    """
+
+    __slots__ = (
+        "buffer",
+        "flags",
+        "message_id",
+        "_topic_start",
+        "_topic_end",
+        "_payload_start",
+    )
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        flags: int,
+        topic_start: int,
+        topic_end: int,
+        message_id: Optional[int],
+        payload_start: int,
+    ) -> None:
+        """PublishViewを初期化します.
+
+        Args:
+            buffer: パケット全体を参照するバッファ
+            flags: 固定ヘッダーのフラグ
+            topic_start: トピック名の開始位置
+            topic_end: トピック名の終了位置
+            message_id: メッセージID
+            payload_start: ペイロードの開始位置
+        """
+        self.buffer = buffer
+        self.flags = flags
+        self.message_id = message_id
+        self._topic_start = topic_start
+        self._topic_end = topic_end
+        self._payload_start = payload_start
+
+    @property
+    def qos(self) -> int:
+        """QoSレベル."""
+        return (self.flags & 0x06) >> 1
+
+    @property
+    def topic(self) -> str:
+        """トピック名(参照時にデコード)."""
+        return str(self.buffer[self._topic_start : self._topic_end], "utf-8")
+
+    @property
+    def payload(self) -> memoryview:
+        """ペイロードを参照するmemoryview."""
+        return self.buffer[self._payload_start :]
+
+    @property
+    def payload_length(self) -> int:
+        """ペイロードのバイト数."""
+        return len(self.buffer) - self._payload_start
+
+    def json(self) -> Any:
+        """ペイロードをJSONとしてデコードします.
+
+        中間のbytesオブジェクトを作らず、バッファから直接デコードします。
+
+        Returns:
+            Any: デコードされたJSONデータ
+
+        Raises:
+            json.JSONDecodeError: JSONとして不正な場合
+        """
+        return loads_json(self.payload)
+
+
+def parse_publish_view(packet: MQTTPacket) -> PublishView:
+    """PUBLISHパケットをコピーせずに解析します.
+
+    Args:
+        packet: PUBLISHパケット
+
+    Returns:
+        PublishView: 元のフレームを参照するビュー
+
+    Raises:
+        ValueError: パケットの解析に失敗した場合
+    """
+    if packet.packet_type != PacketType.PUBLISH:
+        raise ValueError("Not a PUBLISH packet")
+
+    buffer = memoryview(packet.packet)
+    # 固定ヘッダーの長さ = 全体の長さ - 残りの長さ
+    pos = len(buffer) - packet.remaining_length
+
+    if packet.remaining_length < 2:
+        raise ValueError("No payload in PUBLISH packet")
+
+    # トピック名の位置を取得
+    topic_length = struct.unpack_from("!H", buffer, pos)[0]
+    topic_start = pos + 2
+    topic_end = topic_start + topic_length
+    if topic_end > len(buffer):
+        raise ValueError("Packet too short for topic")
+
+    # QoSレベルに応じてメッセージIDを取得
+    pos = topic_end
+    message_id = None
+    if packet.flags & 0x06:
+        if len(buffer) < pos + 2:
+            raise ValueError("Packet too short for QoS > 0")
+        message_id = struct.unpack_from("!H", buffer, pos)[0]
+        pos += 2
+
+    return PublishView(
+        buffer, packet.flags, topic_start, topic_end, message_id, pos
+    )
@@ -0,0 +1,178 @@
+"""MQTT receive queue.
+
+ソケットの読み取りと通知の利用側を分離する受信キューを提供するモジュール。
+
+読み取りタスクは受信した通知をキューに入れ、利用側は自分の速度で
+取り出します。キューが満杯になったときの動作はOverflowPolicyで選択します。
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Collection, Deque, Dict, Optional
+
+from works.mqtt.notification import Notification
+
+
+class OverflowPolicy(Enum):
+    """キューが満杯のときの動作."""
+
+    BLOCK = "block"  # 空きができるまで読み取りを止める
+    DROP_OLDEST = "drop_oldest"  # 最も古い通知を破棄する
+    DROP_BY_TYPE = "drop_by_type"  # 指定したタイプの通知から破棄する
+
+
+@dataclass
+class QueueStats:
+    """受信キューの統計.
+
+    Attributes:
+        depth: 現在キューにある通知の数
+        max_depth: これまでの最大の深さ
+        enqueued: キューに入れた通知の数
+        dequeued: 取り出された通知の数
+        dropped: 破棄した通知の数
+        dropped_by_type: 通知タイプ(nType)ごとの破棄数
+        blocked: 満杯のため読み取りを待機した回数
+    """
+
+    depth: int = 0
+    max_depth: int = 0
+    enqueued: int = 0
+    dequeued: int = 0
+    dropped: int = 0
+    dropped_by_type: Dict[Optional[int], int] = field(default_factory=dict)
+    blocked: int = 0
+
+
+class ReceiveQueue:
+    """上限付きの受信キュー."""
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        droppable_types: Collection[int] = (),
+    ) -> None:
+        """ReceiveQueueを初期化します.
+
+        Args:
+            maxsize: キューに保持する最大の通知数
+            policy: キューが満杯のときの動作
+            droppable_types: DROP_BY_TYPEで破棄してよい通知タイプ(nType)
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+        self.droppable_types = frozenset(droppable_types)
+        self.stats = QueueStats()
+        self._items: Deque[Notification] = deque()
+        self._condition = asyncio.Condition()
+        self._closed = False
+        self._waiting_putters = 0
+
+    def __len__(self) -> int:
+        """キューにある通知の数を返します."""
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        """キューが閉じられているかどうか."""
+        return self._closed
+
+    @property
+    def is_blocking(self) -> bool:
+        """満杯のため読み取り側が空きを待っているかどうか."""
+        return self._waiting_putters > 0
+
+    async def put(self, item: Notification) -> bool:
+        """通知をキューに入れます.
+
+        Args:
+            item: 受信した通知
+
+        Returns:
+            bool: キューに入れた場合はTrue、破棄した場合はFalse
+        """
+        async with self._condition:
+            while len(self._items) >= self.maxsize:
+                if self._closed:
+                    return False
+                if self.policy == OverflowPolicy.DROP_OLDEST:
+                    self._record_drop(self._items.popleft())
+                    break
+                if self.policy == OverflowPolicy.DROP_BY_TYPE:
+                    if self._drop_queued_by_type():
+                        break
+                    if self._n_type(item) in self.droppable_types:
+                        self._record_drop(item)
+                        return False
+                # BLOCK、または破棄できる通知がない場合は空きを待つ
+                self.stats.blocked += 1
+                self._waiting_putters += 1
+                try:
+                    await self._condition.wait()
+                finally:
+                    self._waiting_putters -= 1
+
+            self._items.append(item)
+            self.stats.enqueued += 1
+            self.stats.depth = len(self._items)
+            self.stats.max_depth = max(self.stats.max_depth, self.stats.depth)
+            self._condition.notify_all()
+            return True
+
+    async def get(self) -> Optional[Notification]:
+        """通知を取り出します.
+
+        Returns:
+            Optional[Notification]: 通知。キューが閉じられ、
+                空になった場合はNone。
+        """
+        async with self._condition:
+            while not self._items:
+                if self._closed:
+                    return None
+                await self._condition.wait()
+
+            item = self._items.popleft()
+            self.stats.dequeued += 1
+            self.stats.depth = len(self._items)
+            self._condition.notify_all()
+            return item
+
+    async def close(self) -> None:
+        """キューを閉じます(残りの通知は取り出し可能)."""
+        async with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self) -> None:
+        """閉じたキューを再び使用可能にします(再接続時に使用)."""
+        self._closed = False
+
+    def _drop_queued_by_type(self) -> bool:
+        """キュー内で最も古い破棄可能な通知を破棄します."""
+        for index, queued in enumerate(self._items):
+            if self._n_type(queued) in self.droppable_types:
+                del self._items[index]
+                self._record_drop(queued)
+                return True
+        return False
+
+    def _record_drop(self, item: Notification) -> None:
+        """破棄した通知を統計に記録します."""
+        n_type = self._n_type(item)
+        self.stats.dropped += 1
+        self.stats.dropped_by_type[n_type] = (
+            self.stats.dropped_by_type.get(n_type, 0) + 1
+        )
+        self.stats.depth = len(self._items)
+
+    @staticmethod
+    def _n_type(item: Notification) -> Optional[int]:
+        """通知タイプを取得します(デコードできない場合はNone)."""
+        try:
+            return item.n_type
+        except ValueError:
+            return None
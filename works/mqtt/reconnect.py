@@ -0,0 +1,234 @@
+"""MQTT reconnect supervision.
+
+再接続の間隔と回数を管理するモジュール。
+
+多数のクライアントが同時に切断されても再接続が一斉に集中しないよう、
+待機時間にはDecorrelated Jitterを使用します。CircuitBreakerを複数の
+クライアントで共有すると、障害が続いている間の接続試行をまとめて
+抑制できます。
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class DowntimeWindow:
+    """接続が切れていた期間.
+
+    Attributes:
+        started_at: 切断を検知した時刻(UNIX時間)
+        ended_at: 再接続した時刻(UNIX時間)
+        attempts: 再接続までの試行回数
+    """
+
+    started_at: float
+    ended_at: float
+    attempts: int
+
+    @property
+    def duration(self) -> float:
+        """切断されていた秒数."""
+        return self.ended_at - self.started_at
+
+
+class DecorrelatedJitter:
+    """Decorrelated Jitterによる待機時間の計算."""
+
+    def __init__(
+        self,
+        base: float,
+        cap: float,
+        rng: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        """DecorrelatedJitterを初期化します.
+
+        Args:
+            base: 最小の待機時間(秒)
+            cap: 最大の待機時間(秒)
+            rng: 範囲内の乱数を返す関数
+        """
+        self.base = base
+        self.cap = max(base, cap)
+        self._rng = rng
+        self._sleep = base
+
+    def next(self) -> float:
+        """次の待機時間を返します."""
+        self._sleep = min(self.cap, self._rng(self.base, self._sleep * 3))
+        return self._sleep
+
+    def reset(self) -> None:
+        """待機時間を初期状態に戻します."""
+        self._sleep = self.base
+
+
+class CircuitBreaker:
+    """連続した接続失敗で接続試行を一時停止するサーキットブレーカー.
+
+    failure_threshold回続けて失敗すると開状態になり、reset_timeout秒の
+    間は接続を試行しません。その後の1回の試行(半開状態)に成功すると
+    閉状態に戻り、失敗すると再び開状態になります。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 10,
+        reset_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """CircuitBreakerを初期化します.
+
+        Args:
+            failure_threshold: 開状態になるまでの連続失敗回数
+            reset_timeout: 開状態を維持する秒数
+            clock: 現在時刻を返す関数(テスト用に差し替え可能)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """状態("closed"、"open"、"half_open")."""
+        if self.opened_at is None:
+            return "closed"
+        if self.remaining() > 0:
+            return "open"
+        return "half_open"
+
+    def remaining(self) -> float:
+        """次の試行が許可されるまでの秒数を返します."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - self._clock())
+
+    def record_success(self) -> None:
+        """接続の成功を記録します."""
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """接続の失敗を記録します."""
+        self.failures += 1
+        if self.opened_at is not None or (
+            self.failures >= self.failure_threshold
+        ):
+            self.opened_at = self._clock()
+
+
+class ReconnectSupervisor:
+    """再接続の待機、回数制限、切断期間の記録を行います.
+
+    ハンドシェイク直後に切断される接続を成功とみなすと、試行回数と
+    サーキットブレーカーが毎回リセットされて再接続が集中するため、
+    接続がmin_uptime秒続くまでは失敗として扱います。
+    """
+
+    def __init__(
+        self,
+        base_delay: float,
+        max_delay: float,
+        max_retries: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        min_uptime: float = 0.0,
+    ) -> None:
+        """ReconnectSupervisorを初期化します.
+
+        Args:
+            base_delay: 最小の再接続間隔(秒)
+            max_delay: 最大の再接続間隔(秒)
+            max_retries: 連続した再接続の最大試行回数。Noneの場合は無制限。
+            breaker: 接続試行を抑制するサーキットブレーカー
+            min_uptime: 接続を成功とみなすまでの接続継続秒数
+        """
+        self.backoff = DecorrelatedJitter(base_delay, max_delay)
+        self.max_retries = max_retries
+        self.breaker = breaker
+        self.min_uptime = min_uptime
+        self.attempts = 0
+        self.last_downtime: Optional[DowntimeWindow] = None
+        self._down_since: Optional[float] = None
+        self._connected_once = False
+        self._connected_at: Optional[float] = None
+        self._stable = False
+
+    def on_connected(self) -> Optional[DowntimeWindow]:
+        """接続に成功したときに呼び出します.
+
+        試行回数とサーキットブレーカーは、接続がmin_uptime秒続いた時点で
+        リセットされます。
+
+        Returns:
+            Optional[DowntimeWindow]: 再接続の場合は切断されていた期間。
+                最初の接続の場合はNone。
+        """
+        window = None
+        if self._down_since is not None:
+            window = DowntimeWindow(
+                started_at=self._down_since,
+                ended_at=time.time(),
+                attempts=self.attempts,
+            )
+            self.last_downtime = window
+
+        self._down_since = None
+        self._connected_once = True
+        self._connected_at = time.monotonic()
+        self._stable = False
+        self.on_alive()
+        return window
+
+    def on_alive(self) -> None:
+        """接続が生きていることを確認したときに呼び出します.
+
+        接続がmin_uptime秒続いていれば成功として記録し、試行回数と
+        待機時間、サーキットブレーカーをリセットします。
+        """
+        if self._stable or self._connected_at is None:
+            return
+        if time.monotonic() - self._connected_at < self.min_uptime:
+            return
+        self._stable = True
+        self.attempts = 0
+        self.backoff.reset()
+        if self.breaker:
+            self.breaker.record_success()
+
+    def on_disconnected(self, failed: bool = False) -> None:
+        """接続が切れたとき、または接続に失敗したときに呼び出します.
+
+        min_uptime秒続かなかった接続は失敗として記録します。
+
+        Args:
+            failed: 接続の確立に失敗した場合はTrue
+        """
+        if self._connected_at is not None:
+            self.on_alive()
+            failed = failed or not self._stable
+            self._connected_at = None
+        if self._connected_once and self._down_since is None:
+            self._down_since = time.time()
+        if failed and self.breaker:
+            self.breaker.record_failure()
+
+    async def wait(self) -> bool:
+        """次の再接続まで待機します.
+
+        Returns:
+            bool: 再接続する場合はTrue、試行回数の上限に達した場合はFalse
+        """
+        self.attempts += 1
+        if self.max_retries is not None and self.attempts > self.max_retries:
+            return False
+
+        delay = self.backoff.next()
+        if self.breaker:
+            delay = max(delay, self.breaker.remaining())
+        await asyncio.sleep(delay)
+        return True
@@ -0,0 +1,202 @@
+"""MQTT session recording.
+
+受信フレームの記録と再生を提供するモジュール。
+
+記録ファイルはマジックナンバーに続けて、以下のレコードを並べた
+長さ付きのバイナリ形式です。
+
+    timestamp_ns (uint64, little endian): time.time_ns()の値(UNIX時間)
+    length (uint32, little endian): フレームのバイト数
+    frame (bytes): 受信したWebSocketフレーム
+
+長さ0のレコードは接続の区切り(再接続)を表します。時刻は単調時計ではなく
+UNIX時間のため、別の実行で同じファイルに追記した記録とも比較できます。
+"""
+
+import mmap
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union, cast
+
+MAGIC = b"WMQTLOG1"
+
+_RECORD = struct.Struct("<QI")
+
+# 書き込みスレッドへの指示
+_FLUSH = object()
+_CLOSE = object()
+
+
+class SessionRecorder:
+    """受信フレームを記録ファイルに追記するクラス.
+
+    ファイルへの書き込みは専用のスレッドで行うため、record()は
+    イベントループを止めません。書き込みスレッドは溜まったレコードを
+    まとめて書き込むたびにOSへ書き出すので、プロセスが異常終了しても
+    直前までの記録が残ります。
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """SessionRecorderを初期化し、記録ファイルを開きます.
+
+        Args:
+            path: 記録ファイルのパス(既存のファイルには追記)
+
+        Raises:
+            ValueError: 既存のファイルが記録ファイルでない場合
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[BinaryIO] = open(self.path, "ab")  # noqa: SIM115
+
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+        else:
+            with open(self.path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    self._file.close()
+                    self._file = None
+                    raise ValueError(f"Not a session log: {self.path}")
+
+        self._queue: queue.SimpleQueue[object] = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            args=(self._file, self._queue),
+            name="mqtt-session-recorder",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def record(self, frame: bytes) -> None:
+        """フレームを現在のUNIX時刻とともに記録します.
+
+        Args:
+            frame: 受信したフレーム
+        """
+        if self._file is None:
+            return
+        self._queue.put((time.time_ns(), frame))
+
+    def mark_boundary(self) -> None:
+        """接続の区切りを記録します."""
+        self.record(b"")
+
+    def flush(self) -> None:
+        """それまでに記録したフレームが書き出されるまで待機します."""
+        if self._file is None:
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait()
+
+    def close(self) -> None:
+        """残りの記録を書き出して記録ファイルを閉じます."""
+        if self._file is None:
+            return
+        self._queue.put(_CLOSE)
+        self._writer.join()
+        self._file.close()
+        self._file = None
+
+    @staticmethod
+    def _write_loop(
+        file: BinaryIO, records: "queue.SimpleQueue[object]"
+    ) -> None:
+        """キューのレコードをまとめてファイルに書き込むループ処理.
+
+        届いているレコードをすべて書き込んでからflushするため、
+        受信が多いときは書き込みがまとめられ、少ないときは
+        1フレームごとに書き出されます。
+        """
+        while True:
+            chunks: List[bytes] = []
+            waiters: List[threading.Event] = []
+            closing = False
+            item = records.get()
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, tuple) and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    timestamp, frame = cast(Tuple[int, bytes], item)
+                    chunks.append(_RECORD.pack(timestamp, len(frame)))
+                    chunks.append(frame)
+                try:
+                    item = records.get_nowait()
+                except queue.Empty:
+                    break
+
+            if chunks:
+                file.write(b"".join(chunks))
+                file.flush()
+            for waiter in waiters:
+                waiter.set()
+            if closing:
+                return
+
+    def __enter__(self) -> "SessionRecorder":
+        """コンテキストマネージャーとして使用します."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """記録ファイルを閉じます."""
+        self.close()
+
+
+class SessionReader:
+    """記録ファイルをメモリマップして読み出すクラス."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """SessionReaderを初期化し、記録ファイルをメモリマップします.
+
+        Args:
+            path: 記録ファイルのパス
+
+        Raises:
+            ValueError: 記録ファイルでない場合
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a session log: {self.path}")
+
+    def __iter__(self) -> Iterator[Tuple[int, memoryview]]:
+        """記録されたフレームを順に返します.
+
+        末尾の書きかけのレコードは無視します。
+
+        Yields:
+            Tuple[int, memoryview]: 記録時のUNIX時刻(ns)とフレーム
+        """
+        buffer = memoryview(self._mmap)
+        size = len(buffer)
+        pos = len(MAGIC)
+        try:
+            while pos + _RECORD.size <= size:
+                timestamp, length = _RECORD.unpack_from(buffer, pos)
+                pos += _RECORD.size
+                if pos + length > size:
+                    break
+                yield timestamp, buffer[pos : pos + length]
+                pos += length
+        finally:
+            buffer.release()
+
+    def close(self) -> None:
+        """メモリマップを閉じます."""
+        self._mmap.close()
+
+    def __enter__(self) -> "SessionReader":
+        """コンテキストマネージャーとして使用します."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """メモリマップを閉じます."""
+        self.close()
@@ -0,0 +1,199 @@
+"""MQTT message sequence tracking.
+
+チャンネルごとのメッセージ番号(messageNo)を追跡し、欠落と順序の
+入れ替わりを検出するモジュール。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class Gap:
+    """欠落したメッセージ番号の範囲.
+
+    Attributes:
+        channel_no: チャンネル番号
+        start: 欠落した最初のメッセージ番号
+        end: 欠落した最後のメッセージ番号(この番号を含む)
+    """
+
+    channel_no: int
+    start: int
+    end: int
+
+    def __len__(self) -> int:
+        """欠落したメッセージ数を返します."""
+        return self.end - self.start + 1
+
+
+@dataclass
+class SequenceStats:
+    """メッセージ番号の追跡に関する統計.
+
+    Attributes:
+        gaps: 検出した欠落の数
+        missing: 欠落したメッセージの合計数
+        reordered: 欠落を埋めた遅れて届いたメッセージの数
+        stale: 既に受信済みの番号のメッセージの数
+        backfilled: 補完により取得したメッセージの数
+    """
+
+    gaps: int = 0
+    missing: int = 0
+    reordered: int = 0
+    stale: int = 0
+    backfilled: int = 0
+
+
+class SequenceTracker:
+    """チャンネルごとの最後のメッセージ番号と欠落範囲を保持します."""
+
+    def __init__(self, max_ranges: int = 32) -> None:
+        """SequenceTrackerを初期化します.
+
+        Args:
+            max_ranges: チャンネルごとに保持する欠落範囲の最大数。
+                超えた場合は古い範囲から破棄します。
+        """
+        self.max_ranges = max_ranges
+        self.stats = SequenceStats()
+        self._last: Dict[int, int] = {}
+        self._missing: Dict[int, List[List[int]]] = {}
+        self._skipped: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        """追跡しているチャンネル数を返します."""
+        return len(self._last)
+
+    def last(self, channel_no: int) -> Optional[int]:
+        """チャンネルで最後に受信したメッセージ番号を返します."""
+        return self._last.get(channel_no)
+
+    def observe(self, channel_no: int, message_no: int) -> Optional[Gap]:
+        """受信したメッセージ番号を記録します.
+
+        Args:
+            channel_no: チャンネル番号
+            message_no: メッセージ番号
+
+        Returns:
+            Optional[Gap]: 新たに欠落を検出した場合はその範囲
+        """
+        last = self._last.get(channel_no)
+        if last is None:
+            self._last[channel_no] = message_no
+            return None
+
+        if message_no > last:
+            self._last[channel_no] = message_no
+            gaps = self._unskipped(Gap(channel_no, last + 1, message_no - 1))
+            if not gaps:
+                return None
+            for gap in gaps:
+                self._add_missing(gap)
+                self.stats.missing += len(gap)
+            self.stats.gaps += 1
+            return Gap(channel_no, gaps[0].start, gaps[-1].end)
+
+        if self.fill(channel_no, message_no):
+            self.stats.reordered += 1
+        else:
+            self.stats.stale += 1
+        return None
+
+    def skip(self, channel_no: int, message_no: int) -> None:
+        """自分が送信したメッセージ番号を欠落として扱わないよう記録します.
+
+        自分の送信は通知として届かないため、記録しないと次に受信した
+        メッセージとの間が欠落として検出されます。
+
+        Args:
+            channel_no: チャンネル番号
+            message_no: 送信したメッセージの番号
+        """
+        if self.fill(channel_no, message_no):
+            return
+        last = self._last.get(channel_no)
+        if last is not None and message_no > last:
+            self._skipped.setdefault(channel_no, set()).add(message_no)
+
+    def fill(self, channel_no: int, message_no: int) -> bool:
+        """欠落範囲からメッセージ番号を取り除きます.
+
+        Args:
+            channel_no: チャンネル番号
+            message_no: 受信または補完したメッセージ番号
+
+        Returns:
+            bool: 欠落範囲に含まれていた場合はTrue
+        """
+        ranges = self._missing.get(channel_no)
+        if not ranges:
+            return False
+
+        for index, (start, end) in enumerate(ranges):
+            if not start <= message_no <= end:
+                continue
+            parts = [
+                [s, e]
+                for s, e in ((start, message_no - 1), (message_no + 1, end))
+                if s <= e
+            ]
+            ranges[index : index + 1] = parts
+            if not ranges:
+                del self._missing[channel_no]
+            return True
+        return False
+
+    def missing(self, gap: Gap) -> List[Gap]:
+        """範囲のうち、まだ欠落しているメッセージ番号の範囲を返します.
+
+        Args:
+            gap: observe()が返した欠落範囲
+
+        Returns:
+            List[Gap]: 欠落したままの範囲
+        """
+        result = []
+        for start, end in self._missing.get(gap.channel_no, ()):
+            start, end = max(start, gap.start), min(end, gap.end)
+            if start <= end:
+                result.append(Gap(gap.channel_no, start, end))
+        return result
+
+    def missing_ranges(self) -> Dict[int, List[Tuple[int, int]]]:
+        """チャンネルごとの欠落範囲を返します."""
+        return {
+            channel_no: [(start, end) for start, end in ranges]
+            for channel_no, ranges in self._missing.items()
+        }
+
+    def _unskipped(self, gap: Gap) -> List[Gap]:
+        """範囲から自分が送信したメッセージ番号を除いた範囲を返します."""
+        skipped = self._skipped.get(gap.channel_no)
+        if not skipped:
+            return [gap] if gap.start <= gap.end else []
+
+        result = []
+        start = gap.start
+        for number in sorted(n for n in skipped if n <= gap.end):
+            if start < number:
+                result.append(Gap(gap.channel_no, start, number - 1))
+            start = max(start, number + 1)
+        if start <= gap.end:
+            result.append(Gap(gap.channel_no, start, gap.end))
+
+        remaining = {n for n in skipped if n > gap.end + 1}
+        if remaining:
+            self._skipped[gap.channel_no] = remaining
+        else:
+            del self._skipped[gap.channel_no]
+        return result
+
+    def _add_missing(self, gap: Gap) -> None:
+        """欠落範囲を追加します."""
+        ranges = self._missing.setdefault(gap.channel_no, [])
+        ranges.append([gap.start, gap.end])
+        if len(ranges) > self.max_ranges:
+            del ranges[0]
@@ -0,0 +1,159 @@
+"""MQTT topic routing.
+
+トピックフィルタによるメッセージの振り分けを提供するモジュール。
+
+トピックフィルタを階層(/区切り)ごとのトライ木に格納するため、
+振り分けのコストは購読数ではなくトピックの階層数に比例します。
+MQTTのワイルドカード(+は1階層、#は以下すべての階層)に対応します。
+"""
+
+from typing import Dict, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def validate_topic_filter(topic_filter: str) -> None:
+    """トピックフィルタの形式を検証する.
+
+    Args:
+        topic_filter: 検証するトピックフィルタ
+
+    Raises:
+        ValueError: MQTTのトピックフィルタとして不正な場合
+    """
+    if not topic_filter:
+        raise ValueError("Topic filter must not be empty")
+
+    levels = topic_filter.split("/")
+    for index, level in enumerate(levels):
+        if "#" in level and (level != "#" or index != len(levels) - 1):
+            raise ValueError(f"Invalid '#' wildcard: {topic_filter}")
+        if "+" in level and level != "+":
+            raise ValueError(f"Invalid '+' wildcard: {topic_filter}")
+
+
+class _Node(Generic[T]):
+    """トライ木のノード."""
+
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node[T]] = {}
+        self.values: List[T] = []
+
+
+class TopicTrie(Generic[T]):
+    """トピックフィルタと値を対応付けるトライ木."""
+
+    def __init__(self) -> None:
+        """TopicTrieを初期化します."""
+        self._root: _Node[T] = _Node()
+        self._filters: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """登録されているトピックフィルタの数を返します."""
+        return len(self._filters)
+
+    def __contains__(self, topic_filter: object) -> bool:
+        """トピックフィルタが登録されているかを返します."""
+        return topic_filter in self._filters
+
+    def filters(self) -> Iterator[str]:
+        """登録されているトピックフィルタを返します."""
+        return iter(self._filters)
+
+    def add(self, topic_filter: str, value: T) -> None:
+        """トピックフィルタに値を登録します.
+
+        Args:
+            topic_filter: トピックフィルタ(ワイルドカード可)
+            value: 登録する値
+
+        Raises:
+            ValueError: トピックフィルタが不正な場合
+        """
+        validate_topic_filter(topic_filter)
+        node = self._root
+        for level in topic_filter.split("/"):
+            node = node.children.setdefault(level, _Node())
+        node.values.append(value)
+        self._filters[topic_filter] = self._filters.get(topic_filter, 0) + 1
+
+    def remove(self, topic_filter: str, value: Optional[T] = None) -> bool:
+        """トピックフィルタから値を削除します.
+
+        Args:
+            topic_filter: トピックフィルタ
+            value: 削除する値。Noneの場合はすべての値を削除。
+
+        Returns:
+            bool: トピックフィルタに値が残っていなければTrue
+        """
+        path = [self._root]
+        levels = topic_filter.split("/")
+        for level in levels:
+            child = path[-1].children.get(level)
+            if child is None:
+                return topic_filter not in self._filters
+            path.append(child)
+
+        node = path[-1]
+        if value is None:
+            node.values.clear()
+        elif value in node.values:
+            node.values.remove(value)
+
+        if node.values:
+            self._filters[topic_filter] = len(node.values)
+            return False
+
+        self._filters.pop(topic_filter, None)
+        # 空になったノードを末端から削除
+        for level, parent in zip(reversed(levels), reversed(path[:-1])):
+            child = parent.children[level]
+            if child.values or child.children:
+                break
+            del parent.children[level]
+        return True
+
+    def match(self, topic: str) -> List[T]:
+        """トピックに一致するすべての値を返します.
+
+        Args:
+            topic: 受信したメッセージのトピック(ワイルドカードなし)
+
+        Returns:
+            List[T]: 一致したトピックフィルタに登録された値
+        """
+        levels = topic.split("/")
+        results: List[T] = []
+        # $で始まるトピックは先頭のワイルドカードに一致させない
+        self._match(self._root, levels, 0, results, topic.startswith("$"))
+        return results
+
+    def _match(
+        self,
+        node: _Node[T],
+        levels: List[str],
+        index: int,
+        results: List[T],
+        system_topic: bool,
+    ) -> None:
+        """トライ木を再帰的にたどり、一致した値を集めます."""
+        wildcard_allowed = not (system_topic and index == 0)
+
+        multi = node.children.get("#")
+        if multi is not None and wildcard_allowed:
+            results.extend(multi.values)
+
+        if index == len(levels):
+            results.extend(node.values)
+            return
+
+        exact = node.children.get(levels[index])
+        if exact is not None:
+            self._match(exact, levels, index + 1, results, system_topic)
+
+        single = node.children.get("+")
+        if single is not None and wildcard_allowed:
+            self._match(single, levels, index + 1, results, system_topic)
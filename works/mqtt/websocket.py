@@ -1,10 +1,17 @@
 """WebSocket handling for MQTT protocol."""
 
-from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+from typing import AsyncGenerator, Optional, Tuple
 
 from works.auth import HeaderManager
 from works.constants import WebSocket
-from works.mqtt.client import MQTTClient
+from works.mqtt.client import (
+    GapFetcher,
+    MQTTClient,
+    MQTTConfig,
+    ReconnectHandler,
+)
+from works.mqtt.notification import Notification
+from works.mqtt.sequence import SequenceTracker
 
 
 async def connect_websocket(
@@ -12,7 +19,10 @@ async def connect_websocket(
     domain_id: str,
     user_no: str,
     polling_interval: int = WebSocket.RETRY_INTERVAL,
-) -> AsyncGenerator[Tuple[bool, Optional[Dict[str, Any]]], None]:
+    gap_fetcher: Optional[GapFetcher] = None,
+    sequences: Optional[SequenceTracker] = None,
+    on_reconnect: Optional[ReconnectHandler] = None,
+) -> AsyncGenerator[Tuple[bool, Optional[Notification]], None]:
     """WebSocket経由でWorksのメッセージを受信する.
 
     Args:
@@ -20,11 +30,23 @@ async def connect_websocket(
         domain_id: ドメインID
         user_no: ユーザー番号
         polling_interval: 再接続間隔（秒）
+        gap_fetcher: messageNoの欠落を補完する関数
+        sequences: messageNoの追跡に使うトラッカー。自分の送信を
+            記録したトラッカーを渡すと、送信分を欠落として扱わない。
+        on_reconnect: 再接続のたびに切断されていた期間
+            (DowntimeWindow)を受け取る非同期関数
 
     Yields:
-        Tuple[bool, Optional[Dict[str, Any]]]: 処理結果とメッセージデータ
+        Tuple[bool, Optional[Notification]]: 処理結果と通知
     """
-    client = MQTTClient(header_manager)
+    client = MQTTClient(
+        header_manager, MQTTConfig(retry_interval=polling_interval)
+    )
+    client.set_gap_fetcher(gap_fetcher)
+    if sequences is not None:
+        client.sequences = sequences
+    if on_reconnect is not None:
+        client.on_reconnect(on_reconnect)
 
     try:
         async for success, message_data in client.connect(domain_id, user_no):
@@ -0,0 +1,305 @@
+"""Rate limiting module.
+
+Provides process-wide token-bucket admission control for logins and
+WebSocket connects, so that many accounts restarting at once are spread
+out instead of hitting the servers simultaneously.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from works.constants import RateLimit
+
+
+class Priority(IntEnum):
+    """Admission priority. Lower values are admitted first."""
+
+    HIGH = 0  # 送信中のリクエストの再ログイン、対話的な返信など
+    NORMAL = 1  # 起動時のログインと接続、通常の送信
+    LOW = 2  # バックグラウンドのセッション更新、一斉送信など
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Attributes:
+        rate (float): Tokens added per second
+        burst (int): Maximum number of stored tokens
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum number of stored tokens
+            clock (Callable[[], float]): Monotonic clock
+        """
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take tokens if available.
+
+        Args:
+            tokens (float): Number of tokens to take
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of
+              seconds until enough tokens are available
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Return the time until tokens are available without taking them.
+
+        Args:
+            tokens (float): Number of tokens needed
+
+        Returns:
+            float: 0 if the tokens are available now, otherwise the number
+              of seconds until they are
+        """
+        with self._lock:
+            available = min(
+                self.burst,
+                self._tokens + (self._clock() - self._updated) * self.rate,
+            )
+            if available >= tokens:
+                return 0.0
+            return (tokens - available) / self.rate
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change the refill rate and capacity.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum number of stored tokens
+        """
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self._tokens = min(self._tokens, burst)
+
+
+@dataclass
+class AdmissionStats:
+    """Queue statistics of an AdmissionScheduler.
+
+    Attributes:
+        admitted (int): Number of admitted requests
+        waiting (int): Number of requests currently queued
+        total_wait (float): Sum of queue wait times in seconds
+        max_wait (float): Longest queue wait time in seconds
+        last_wait (float): Queue wait time of the last admitted request
+        admitted_by_priority (Dict[int, int]): Admitted requests per priority
+    """
+
+    admitted: int = 0
+    waiting: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    last_wait: float = 0.0
+    admitted_by_priority: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def mean_wait(self) -> float:
+        """float: Mean queue wait time in seconds."""
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+
+class AdmissionScheduler:
+    """Admits requests at a fixed rate in priority order.
+
+    Requests wait in a priority queue (FIFO within a priority). Only the
+    head of the queue may take a token, so a burst of low-priority
+    requests cannot starve a later high-priority one. Works from both
+    threads (``acquire_blocking``) and coroutines (``acquire``).
+
+    Attributes:
+        bucket (TokenBucket): Token bucket limiting the admission rate
+        stats (AdmissionStats): Queue statistics
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the AdmissionScheduler.
+
+        Args:
+            rate (float): Admissions per second
+            burst (int): Admissions allowed back to back
+            clock (Callable[[], float]): Monotonic clock
+        """
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.stats = AdmissionStats()
+        self._clock = clock
+        self._queue: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change the admission rate.
+
+        Args:
+            rate (float): Admissions per second
+            burst (int): Admissions allowed back to back
+        """
+        self.bucket.configure(rate, burst)
+
+    async def acquire(self, priority: int = Priority.NORMAL) -> float:
+        """Wait until admitted.
+
+        Args:
+            priority (int): Admission priority
+
+        Returns:
+            float: Seconds spent waiting in the queue
+        """
+        ticket, started = self._enqueue(priority)
+        try:
+            while True:
+                delay = self._try_admit(ticket, started)
+                if delay is None:
+                    return self.stats.last_wait
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    def acquire_blocking(self, priority: int = Priority.NORMAL) -> float:
+        """Block the current thread until admitted.
+
+        Args:
+            priority (int): Admission priority
+
+        Returns:
+            float: Seconds spent waiting in the queue
+        """
+        ticket, started = self._enqueue(priority)
+        try:
+            while True:
+                delay = self._try_admit(ticket, started)
+                if delay is None:
+                    return self.stats.last_wait
+                time.sleep(delay)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    def _enqueue(self, priority: int) -> Tuple[Tuple[int, int], float]:
+        """Add a request to the queue."""
+        ticket = (int(priority), next(self._counter))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            self.stats.waiting = len(self._queue)
+        return ticket, self._clock()
+
+    def _dequeue(self, ticket: Tuple[int, int]) -> None:
+        """Remove a cancelled request from the queue."""
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self.stats.waiting = len(self._queue)
+
+    def _try_admit(
+        self, ticket: Tuple[int, int], started: float
+    ) -> Optional[float]:
+        """Admit the request if it is at the head and a token is free.
+
+        Returns:
+            Optional[float]: None if admitted, otherwise seconds to wait
+              before trying again
+        """
+        with self._lock:
+            interval = 1 / self.bucket.rate
+            if self._queue[0] != ticket:
+                return interval
+            delay = self.bucket.try_acquire()
+            if delay:
+                return delay
+            heapq.heappop(self._queue)
+            wait = self._clock() - started
+            stats = self.stats
+            stats.waiting = len(self._queue)
+            stats.admitted += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            stats.last_wait = wait
+            stats.admitted_by_priority[ticket[0]] = (
+                stats.admitted_by_priority.get(ticket[0], 0) + 1
+            )
+            return None
+
+
+_schedulers: Dict[str, AdmissionScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str, rate: float, burst: int) -> AdmissionScheduler:
+    """Return the process-wide scheduler with the given name.
+
+    The rate and burst are only used when the scheduler is first created;
+    use ``AdmissionScheduler.configure`` to change them later.
+
+    Args:
+        name (str): Scheduler name
+        rate (float): Admissions per second
+        burst (int): Admissions allowed back to back
+
+    Returns:
+        AdmissionScheduler: Shared scheduler
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            scheduler = _schedulers[name] = AdmissionScheduler(rate, burst)
+        return scheduler
+
+
+def login_scheduler() -> AdmissionScheduler:
+    """Return the process-wide scheduler for logins.
+
+    Returns:
+        AdmissionScheduler: Scheduler admitting ``loginProcessV2`` requests
+    """
+    return get_scheduler("login", RateLimit.LOGIN_RATE, RateLimit.LOGIN_BURST)
+
+
+def connect_scheduler() -> AdmissionScheduler:
+    """Return the process-wide scheduler for WebSocket connects.
+
+    Returns:
+        AdmissionScheduler: Scheduler admitting MQTT connection attempts
+    """
+    return get_scheduler(
+        "connect", RateLimit.CONNECT_RATE, RateLimit.CONNECT_BURST
+    )
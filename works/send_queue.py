@@ -0,0 +1,405 @@
+"""Outbound send queue module.
+
+Puts flow control in front of ``MessageSender``: every send waits for a
+per-channel and a per-account token, interactive sends are dispatched
+ahead of bulk ones, and channels within a priority are served round-robin
+so one busy channel cannot hold up the others.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from works.constants import RateLimit
+from works.ratelimit import Priority, TokenBucket
+
+SendFactory = Callable[[], Awaitable[Dict[str, str]]]
+
+
+@dataclass
+class SendStats:
+    """Statistics of a SendQueue.
+
+    Latency is measured from ``submit`` until the request is handed to
+    the sender, i.e. the time spent waiting for rate limits and for
+    other channels and priorities.
+
+    Attributes:
+        enqueued (int): Number of submitted sends
+        sent (int): Number of sends that completed successfully
+        failed (int): Number of sends that failed or raised
+        pending (int): Number of sends waiting in the queue
+        in_flight (int): Number of sends currently being transmitted
+        total_latency (float): Sum of enqueue-to-send latencies in seconds
+        max_latency (float): Longest enqueue-to-send latency in seconds
+        last_latency (float): Enqueue-to-send latency of the last send
+        sent_by_priority (Dict[int, int]): Dispatched sends per priority
+        recent (Deque[float]): Latencies of the most recent sends
+    """
+
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0
+    pending: int = 0
+    in_flight: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+    sent_by_priority: Dict[int, int] = field(default_factory=dict)
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    @property
+    def dispatched(self) -> int:
+        """int: Number of sends handed to the sender."""
+        return sum(self.sent_by_priority.values())
+
+    @property
+    def mean_latency(self) -> float:
+        """float: Mean enqueue-to-send latency in seconds."""
+        dispatched = self.dispatched
+        return self.total_latency / dispatched if dispatched else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Return a latency percentile over the most recent sends.
+
+        Args:
+            p (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, or 0 if nothing was sent yet
+        """
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+    def record(self, priority: int, latency: float) -> None:
+        """Record a dispatched send.
+
+        Args:
+            priority (int): Priority of the send
+            latency (float): Enqueue-to-send latency in seconds
+        """
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_latency = latency
+        self.recent.append(latency)
+        self.sent_by_priority[priority] = (
+            self.sent_by_priority.get(priority, 0) + 1
+        )
+
+
+@dataclass
+class _Job:
+    """A send waiting in the queue."""
+
+    factory: SendFactory
+    future: "asyncio.Future[Dict[str, str]]"
+    enqueued_at: float
+
+
+class SendQueue:
+    """Rate-limited, prioritized dispatcher for outbound sends.
+
+    Sends are queued per (priority, channel). The dispatcher always
+    serves the highest priority that has a channel with a free token, and
+    rotates through the channels of that priority. A channel that is out
+    of tokens is skipped, so lower priorities and other channels keep
+    flowing while it refills.
+
+    Must be used from a single event loop. The dispatcher task starts
+    with the first ``submit`` and is stopped by ``close``.
+
+    Attributes:
+        account_bucket (TokenBucket): Token bucket shared by all channels
+        stats (SendStats): Queue statistics
+    """
+
+    def __init__(
+        self,
+        channel_rate: float = RateLimit.SEND_CHANNEL_RATE,
+        channel_burst: int = RateLimit.SEND_CHANNEL_BURST,
+        account_rate: float = RateLimit.SEND_ACCOUNT_RATE,
+        account_burst: int = RateLimit.SEND_ACCOUNT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the SendQueue.
+
+        Args:
+            channel_rate (float): Sends per second to a single channel
+            channel_burst (int): Sends to a channel allowed back to back
+            account_rate (float): Sends per second across all channels
+            account_burst (int): Sends allowed back to back in total
+            clock (Callable[[], float]): Monotonic clock
+        """
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.account_bucket = TokenBucket(account_rate, account_burst, clock)
+        self.stats = SendStats()
+        self._clock = clock
+        self._channel_buckets: Dict[str, TokenBucket] = {}
+        self._jobs: Dict[Tuple[int, str], Deque[_Job]] = {}
+        self._rings: Dict[int, Deque[str]] = {}
+        self._priorities: List[int] = []
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._dispatcher: Optional[asyncio.Task[None]] = None
+        self._closed = False
+        # Prune channel buckets about as often as they take to refill
+        self._prune_interval = max(1.0, channel_burst / channel_rate)
+        self._pruned_at = clock()
+
+    async def __aenter__(self) -> "SendQueue":
+        """Use the queue as an async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Drain and close the queue on exit."""
+        await self.close()
+
+    def submit(
+        self,
+        channel_no: str,
+        factory: SendFactory,
+        priority: int = Priority.NORMAL,
+    ) -> "asyncio.Future[Dict[str, str]]":
+        """Queue a send.
+
+        Args:
+            channel_no (str): Destination channel, used for rate limiting
+              and round-robin
+            factory (SendFactory): Called without arguments when the send
+              is dispatched; returns the sender coroutine
+            priority (int): Dispatch priority; lower values go first
+
+        Returns:
+            asyncio.Future[Dict[str, str]]: Resolves to the send result
+
+        Raises:
+            RuntimeError: If the queue has been closed
+        """
+        if self._closed:
+            raise RuntimeError("SendQueue is closed")
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Dict[str, str]] = loop.create_future()
+        priority = int(priority)
+        key = (priority, str(channel_no))
+        jobs = self._jobs.get(key)
+        if jobs is None:
+            jobs = self._jobs[key] = deque()
+            ring = self._rings.get(priority)
+            if ring is None:
+                ring = self._rings[priority] = deque()
+                bisect.insort(self._priorities, priority)
+            ring.append(key[1])
+        jobs.append(_Job(factory, future, self._clock()))
+        self.stats.enqueued += 1
+        self.stats.pending += 1
+        self._idle.clear()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch_loop())
+        return future
+
+    async def send(
+        self,
+        channel_no: str,
+        factory: SendFactory,
+        priority: int = Priority.NORMAL,
+    ) -> Dict[str, str]:
+        """Queue a send and wait for its result.
+
+        Args:
+            channel_no (str): Destination channel
+            factory (SendFactory): Returns the sender coroutine
+            priority (int): Dispatch priority; lower values go first
+
+        Returns:
+            Dict[str, str]: Send result
+        """
+        return await self.submit(channel_no, factory, priority)
+
+    async def join(self) -> None:
+        """Wait until every queued send has completed."""
+        await self._idle.wait()
+
+    async def close(self, drain: bool = True) -> None:
+        """Stop accepting sends and stop the dispatcher.
+
+        Args:
+            drain (bool): Wait for queued sends to complete. Otherwise
+              queued sends are cancelled; sends in flight always finish.
+        """
+        self._closed = True
+        if drain:
+            await self.join()
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+        for jobs in self._jobs.values():
+            for job in jobs:
+                job.future.cancel()
+        self._jobs.clear()
+        self._rings.clear()
+        self._priorities.clear()
+        self.stats.pending = 0
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._idle.set()
+
+    def _channel_bucket(self, channel_no: str) -> TokenBucket:
+        """Return the token bucket of a channel."""
+        bucket = self._channel_buckets.get(channel_no)
+        if bucket is None:
+            bucket = self._channel_buckets[channel_no] = TokenBucket(
+                self.channel_rate, self.channel_burst, self._clock
+            )
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        """Drop the buckets of idle channels that have refilled.
+
+        A full bucket is the same as a new one, so dropping it loses no
+        rate limit state and keeps one bucket per recently used channel.
+        """
+        self._pruned_at = self._clock()
+        busy = {channel_no for _, channel_no in self._jobs}
+        for channel_no, bucket in list(self._channel_buckets.items()):
+            if channel_no not in busy and not bucket.wait_time(bucket.burst):
+                del self._channel_buckets[channel_no]
+
+    def _next_job(self) -> Tuple[Optional[Tuple[int, _Job]], float]:
+        """Take the next job that may be sent now.
+
+        Cancelled jobs are dropped before any token is taken for them.
+
+        Returns:
+            Tuple[Optional[Tuple[int, _Job]], float]: The priority and job
+              to send, or None and the seconds to wait before a channel
+              has a token again
+        """
+        delay = self.account_bucket.wait_time()
+        if delay:
+            return None, delay
+        for priority in list(self._priorities):
+            ring = self._rings[priority]
+            for _ in range(len(ring)):
+                if not ring:
+                    break
+                channel_no = ring[0]
+                ring.rotate(-1)
+                key = (priority, channel_no)
+                if not self._drop_cancelled(key):
+                    continue
+                wait = self._channel_bucket(channel_no).try_acquire()
+                if wait:
+                    delay = min(delay, wait) if delay else wait
+                    continue
+                self.account_bucket.try_acquire()
+                jobs = self._jobs[key]
+                job = jobs.popleft()
+                if not jobs:
+                    self._remove_channel(key)
+                self.stats.pending -= 1
+                return (priority, job), 0.0
+        return None, delay
+
+    def _drop_cancelled(self, key: Tuple[int, str]) -> bool:
+        """Drop cancelled jobs from the front of a channel's queue.
+
+        Args:
+            key (Tuple[int, str]): Priority and channel of the queue
+
+        Returns:
+            bool: Whether the channel still has a job to send
+        """
+        jobs = self._jobs[key]
+        while jobs and jobs[0].future.cancelled():
+            jobs.popleft()
+            self.stats.pending -= 1
+        if jobs:
+            return True
+        self._remove_channel(key)
+        self._check_idle()
+        return False
+
+    def _remove_channel(self, key: Tuple[int, str]) -> None:
+        """Remove a channel whose queue is empty from the rotation."""
+        priority, channel_no = key
+        del self._jobs[key]
+        ring = self._rings[priority]
+        ring.remove(channel_no)
+        if not ring:
+            del self._rings[priority]
+            self._priorities.remove(priority)
+
+    async def _dispatch_loop(self) -> None:
+        """Hand queued sends to the sender as tokens become available."""
+        while True:
+            self._wakeup.clear()
+            if self._clock() - self._pruned_at >= self._prune_interval:
+                self._prune_buckets()
+            if not self._priorities:
+                # Wake up now and then to prune buckets while idle
+                timeout = (
+                    self._prune_interval if self._channel_buckets else None
+                )
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                continue
+            item, delay = self._next_job()
+            if item is None:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+            priority, job = item
+            self.stats.record(priority, self._clock() - job.enqueued_at)
+            self.stats.in_flight += 1
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: _Job) -> None:
+        """Send a job and resolve its future."""
+        try:
+            result = await job.factory()
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self.stats.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if result.get("success") == str(True):
+                self.stats.sent += 1
+            else:
+                self.stats.failed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.stats.in_flight -= 1
+            self._check_idle()
+
+    def _check_idle(self) -> None:
+        """Signal ``join`` when nothing is queued or in flight."""
+        if not self.stats.pending and not self.stats.in_flight:
+            self._idle.set()
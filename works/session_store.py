@@ -0,0 +1,186 @@
+"""session store module.
+
+Keeps the login sessions of all accounts in one SQLite database instead of
+one cookie file per account. The database runs in WAL mode so several
+worker processes can read and write it at the same time.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+class SessionStore:
+    """SQLite-backed store for account cookies and their verification state.
+
+    Each thread gets its own connection. Writes are single-statement upserts
+    in autocommit mode, so they are atomic across threads and processes.
+
+    Attributes:
+        db_path (Path): Path to the SQLite database
+    """
+
+    def __init__(
+        self, db_path: Union[str, Path], busy_timeout: float = 30.0
+    ) -> None:
+        """Open the store and create the table if needed.
+
+        Args:
+            db_path (Union[str, Path]): Path to the SQLite database
+            busy_timeout (float): Seconds to wait for a lock held by
+              another process. Defaults to 30.
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                input_id TEXT PRIMARY KEY,
+                cookies TEXT NOT NULL,
+                verified_at REAL NOT NULL DEFAULT 0,
+                expires_at REAL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection for the current thread.
+
+        Returns:
+            sqlite3.Connection: Connection in autocommit mode
+        """
+        conn: Optional[sqlite3.Connection] = getattr(
+            self._local, "conn", None
+        )
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def save(
+        self,
+        input_id: str,
+        cookies: Dict[str, str],
+        verified_at: float = 0,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Insert or replace the session of an account.
+
+        Args:
+            input_id (str): User ID of the account
+            cookies (Dict[str, str]): Cookies of the session
+            verified_at (float): Time the cookies were last verified
+            expires_at (Optional[float]): Time the session expires
+        """
+        self._connect().execute(
+            """
+            INSERT INTO sessions
+                (input_id, cookies, verified_at, expires_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(input_id) DO UPDATE SET
+                cookies = excluded.cookies,
+                verified_at = excluded.verified_at,
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+            """,
+            (
+                input_id,
+                json.dumps(cookies, ensure_ascii=False),
+                verified_at,
+                expires_at,
+                time.time(),
+            ),
+        )
+
+    def load(self, input_id: str) -> Optional[Dict[str, Any]]:
+        """Load the session of an account.
+
+        Args:
+            input_id (str): User ID of the account
+
+        Returns:
+            Optional[Dict[str, Any]]: Dictionary with ``cookies``,
+              ``verified_at`` and ``expires_at``, or None if not stored
+        """
+        row = (
+            self._connect()
+            .execute(
+                "SELECT cookies, verified_at, expires_at FROM sessions"
+                " WHERE input_id = ?",
+                (input_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        try:
+            cookies = json.loads(row[0])
+        except json.JSONDecodeError:
+            self.delete(input_id)
+            return None
+        return {
+            "cookies": cookies,
+            "verified_at": row[1],
+            "expires_at": row[2],
+        }
+
+    def mark_stale(self, input_id: str) -> None:
+        """Force verification of an account's cookies on its next login.
+
+        Args:
+            input_id (str): User ID of the account
+        """
+        self._connect().execute(
+            "UPDATE sessions SET verified_at = 0, updated_at = ?"
+            " WHERE input_id = ?",
+            (time.time(), input_id),
+        )
+
+    def delete(self, input_id: str) -> None:
+        """Delete the session of an account.
+
+        Args:
+            input_id (str): User ID of the account
+        """
+        self._connect().execute(
+            "DELETE FROM sessions WHERE input_id = ?", (input_id,)
+        )
+
+    def input_ids(self) -> List[str]:
+        """Return the user IDs of all stored accounts.
+
+        Returns:
+            List[str]: Stored user IDs
+        """
+        rows = self._connect().execute(
+            "SELECT input_id FROM sessions ORDER BY input_id"
+        )
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,220 @@
+"""TLS設定を共有するモジュール.
+
+CAストアの読み込みは負荷が高いため、プロセス内で1つのSSLContextを
+作成し、WebSocket接続とHTTPリクエストで共有します。共有コンテキストは
+接続先のホストごとに直近のTLSセッションを保持し、再接続時に
+セッションを再開してハンドシェイクを短縮します。
+"""
+
+import ssl
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+from requests import PreparedRequest
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+
+
+class _SessionSavingSSLSocket(ssl.SSLSocket):
+    """TLSセッションをコンテキストに保存するSSLSocket.
+
+    ハンドシェイクの完了時に保存し、TLS 1.3のセッションチケットは
+    ハンドシェイク後に届くため、閉じる前にもう一度保存します。
+    """
+
+    def do_handshake(self, block: bool = False) -> None:
+        """ハンドシェイクを行い、確立したセッションを保存します."""
+        super().do_handshake(block)
+        self._save_session()
+
+    def close(self) -> None:
+        """受信済みのセッションチケットを保存してから閉じます."""
+        self._save_session()
+        super().close()
+
+    def _save_session(self) -> None:
+        """接続のセッションをコンテキストに保存します."""
+        context = self.context
+        if isinstance(context, ResumingSSLContext) and self.server_hostname:
+            context._save(self.server_hostname, self)
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """ホストごとにTLSセッションを再利用するSSLContext.
+
+    asyncio(websockets、aiohttp)はwrap_bio()、requestsはwrap_socket()で
+    接続を開始するため、両方で直前の接続のセッションを引き継ぎます。
+    """
+
+    sslsocket_class = _SessionSavingSSLSocket
+
+    def __new__(
+        cls, protocol: int = ssl.PROTOCOL_TLS_CLIENT
+    ) -> "ResumingSSLContext":
+        """指定したプロトコルのSSLContextを生成します.
+
+        Args:
+            protocol: TLSのプロトコル
+        """
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT) -> None:
+        """ResumingSSLContextを初期化します.
+
+        Args:
+            protocol: TLSのプロトコル(__new__()で設定済み)
+        """
+        super().__init__()
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, ssl.SSLSession] = {}
+        self._objects: Dict[str, ssl.SSLObject] = {}
+        self.resumed = 0
+
+    def wrap_bio(  # type: ignore[override]
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLObject:
+        """SSLObjectを生成し、保持しているセッションを設定します."""
+        if session is None and not server_side:
+            session = self._session_for(server_hostname)
+        tls = super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        if server_hostname and not server_side:
+            # TLS 1.3のセッションチケットはハンドシェイク後に届くため、
+            # 次の接続の開始時にセッションを取り出す
+            with self._lock:
+                self._objects[server_hostname] = tls
+        return tls
+
+    def wrap_socket(  # type: ignore[override]
+        self,
+        sock: Any,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLSocket:
+        """SSLSocketを生成し、保持しているセッションを設定します."""
+        if session is None and not server_side:
+            session = self._session_for(server_hostname)
+        return super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
+    def _session_for(
+        self, server_hostname: Optional[str]
+    ) -> Optional[ssl.SSLSession]:
+        """ホストの直前の接続で確立したセッションを返します."""
+        if not server_hostname:
+            return None
+        with self._lock:
+            previous = self._objects.pop(server_hostname, None)
+        if previous is not None:
+            self._save(server_hostname, previous)
+
+        with self._lock:
+            session = self._sessions.get(server_hostname)
+        if session is not None:
+            self.resumed += 1
+        return session
+
+    def _save(
+        self,
+        server_hostname: str,
+        tls: Union[ssl.SSLObject, ssl.SSLSocket],
+    ) -> None:
+        """接続のセッションを再開可能であれば保存します."""
+        try:
+            session = tls.session
+        except (AttributeError, ValueError, ssl.SSLError):
+            return
+        if session is None or (not session.has_ticket and not session.id):
+            return
+        with self._lock:
+            self._sessions[server_hostname] = session
+
+
+_context: Optional[ResumingSSLContext] = None
+_context_lock = threading.Lock()
+
+
+def get_ssl_context() -> ResumingSSLContext:
+    """プロセスで共有するSSLContextを取得します.
+
+    最初の呼び出しでOSのCAストアとrequestsのCAバンドルを読み込み、
+    以降は同じコンテキストを返します。
+
+    Returns:
+        ResumingSSLContext: 証明書とホスト名を検証するSSLContext
+    """
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+                context.check_hostname = True
+                context.verify_mode = ssl.CERT_REQUIRED
+                context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+                # requestsのverify=Trueと同じCAバンドルでも検証する
+                context.load_verify_locations(DEFAULT_CA_BUNDLE_PATH)
+                _context = context
+    return _context
+
+
+class TLSAdapter(HTTPAdapter):
+    """共有SSLContextを使用するrequestsのアダプター.
+
+    verify=Trueのリクエストは、CAバンドルを読み込み済みの共有SSLContextを
+    使用します。接続ごとにCAバンドルを読み込み直したり、共有の設定を
+    書き換えたりしないよう、requestsが設定するca_certsは取り除きます。
+    verifyにCAバンドルのパスやFalseを指定した場合と、クライアント証明書を
+    指定した場合は、urllib3が接続ごとに作成するSSLContextを使用します。
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """共有SSLContextを使用してプールを初期化します."""
+        kwargs["ssl_context"] = get_ssl_context()
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy: str, **proxy_kwargs: Any) -> Any:
+        """共有SSLContextを使用してプロキシ用のプールを生成します."""
+        proxy_kwargs["ssl_context"] = get_ssl_context()
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+    def build_connection_pool_key_attributes(
+        self, request: PreparedRequest, verify: Any, cert: Any = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """共有SSLContextを使わないリクエストでは設定から取り除きます."""
+        host_params, pool_kwargs = (
+            super().build_connection_pool_key_attributes(request, verify, cert)
+        )
+        if not _uses_shared_context(verify, cert):
+            pool_kwargs["ssl_context"] = None
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn: Any, url: str, verify: Any, cert: Any) -> None:
+        """共有SSLContextを使う接続ではCAバンドルを読み込ませません."""
+        super().cert_verify(conn, url, verify, cert)
+        if _uses_shared_context(verify, cert):
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+def _uses_shared_context(verify: Any, cert: Any) -> bool:
+    """リクエストが共有SSLContextを使用するかどうかを返します."""
+    return verify is True and not cert